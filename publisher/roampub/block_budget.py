@@ -0,0 +1,133 @@
+""" per-block budgets; bound the worst-case cost of a single (e.g. adversarial) block, so that it can't stall a build
+
+markdown-it is super-linear on some inputs (e.g. thousands of nested emphasis delimiters, or of unclosed link labels),
+and a regex can't be interrupted; so a ``BlockBudget`` has three parts:
+
+- ``max_size``: content longer than this isn't normalized or parsed at all
+- ``max_delimiters``: an inline run with more emphasis delimiters than this isn't parsed (pairing them is quadratic)
+- ``max_seconds``: optional (off by default, as it depends on the host's load, and so would make a build's output
+  nondeterministic); a parse is abandoned, at the next rule, once this has elapsed; a normalization is checked when it
+  returns
+
+Over budget, the block's content is treated as literal text, and its uid is reported (logged, as a warning).
+
+Classes:
+
+    BlockBudget
+    BlockBudgetExceeded
+
+
+Functions:
+
+    check_size(str, BlockBudget) -> None
+    check_elapsed(float, BlockBudget) -> None
+    budget_env(BlockBudget) -> dict[str, Any]
+    budget_plugin(MarkdownIt) -> None
+
+"""
+from typing import Any, Optional, Final, NamedTuple
+import logging
+import time
+
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+from markdown_it.rules_inline import StateInline
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_SIZE: Final[int] = 100_000
+DEFAULT_MAX_DELIMITERS: Final[int] = 2_000
+
+# the key, in the ``env`` passed to ``MarkdownIt.parse``, of the deadline (a ``time.perf_counter()``, or ``None``) and
+# budget
+BUDGET_ENV_KEY: Final[str] = 'roampub_block_budget'
+
+
+class BlockBudget(NamedTuple):
+    max_size: int = DEFAULT_MAX_SIZE
+    """in chars"""
+    max_seconds: Optional[float] = None
+    """``None`` for no time limit"""
+    max_delimiters: int = DEFAULT_MAX_DELIMITERS
+
+
+DEFAULT_BLOCK_BUDGET: Final[BlockBudget] = BlockBudget()
+
+
+class BlockBudgetExceeded(Exception):
+    """raised out of ``MarkdownIt.parse``, by ``budget_plugin``; the message says which budget"""
+    pass
+
+
+def check_size(content: str, budget: BlockBudget) -> None:
+    """
+    Raises:
+        BlockBudgetExceeded: if ``content`` is longer than ``budget.max_size``
+    """
+    if len(content) > budget.max_size:
+        raise BlockBudgetExceeded(f"len(content): {len(content)} > max_size: {budget.max_size}")
+
+
+def check_elapsed(start: float, budget: BlockBudget) -> None:
+    """
+    Args:
+        start (float): a ``time.perf_counter()``
+
+    Raises:
+        BlockBudgetExceeded: if more than ``budget.max_seconds`` (if any) have elapsed since ``start``
+    """
+    if budget.max_seconds is None:
+        return
+    elapsed: float = time.perf_counter() - start
+    if elapsed > budget.max_seconds:
+        raise BlockBudgetExceeded(f"elapsed: {elapsed:.3f}s > max_seconds: {budget.max_seconds}")
+
+
+def budget_env(budget: BlockBudget) -> dict[str, Any]:
+    """the ``env`` for one ``MarkdownIt.parse``, by a parser that uses ``budget_plugin``; starts the clock"""
+    if any(arg is None for arg in [budget]):
+        raise ValueError("missing required arg")
+    if not isinstance(budget, BlockBudget):
+        raise TypeError(f"is not instanceof {BlockBudget}; budget: {budget}")
+
+    deadline: Optional[float] = None if budget.max_seconds is None else time.perf_counter() + budget.max_seconds
+    return {BUDGET_ENV_KEY: (deadline, budget)}
+
+
+def _check_deadline(env: Any) -> None:
+    entry: Any = env.get(BUDGET_ENV_KEY) if isinstance(env, dict) else None
+    if entry is not None and entry[0] is not None and time.perf_counter() > entry[0]:
+        raise BlockBudgetExceeded(f"max_seconds: {entry[1].max_seconds}")
+
+
+def _block_budget(state: StateBlock, startLine: int, endLine: int, silent: bool) -> bool:
+    _check_deadline(state.env)
+    return False
+
+
+def _inline_budget(state: StateInline, silent: bool) -> bool:
+    _check_deadline(state.env)
+    return False
+
+
+def _delimiter_budget(state: StateInline) -> None:
+    entry: Any = state.env.get(BUDGET_ENV_KEY) if isinstance(state.env, dict) else None
+    if entry is None:
+        return
+    if len(state.delimiters) > entry[1].max_delimiters:
+        raise BlockBudgetExceeded(
+            f"len(delimiters): {len(state.delimiters)} > max_delimiters: {entry[1].max_delimiters}"
+        )
+    _check_deadline(state.env)
+
+
+def budget_plugin(md: MarkdownIt) -> None:
+    """
+    use: ``MarkdownIt(...).use(budget_plugin)``; then ``parse(content, budget_env(budget))``. Without a budget in the
+    ``env``, the rules do nothing.
+    """
+    # first in each chain, so checked at every block line, and inline position, that the other rules are tried at
+    md.block.ruler.before(md.block.ruler.get_all_rules()[0], 'block_budget', _block_budget)
+    md.inline.ruler.before(md.inline.ruler.get_all_rules()[0], 'inline_budget', _inline_budget)
+    md.inline.ruler2.before('balance_pairs', 'delimiter_budget', _delimiter_budget)
@@ -8,19 +8,27 @@ Types:
     
 Classes:
 
+    FusedNormalization
     NormalizationRule
+    NormalizationPipeline
+    NormalizationCache
 
     
 Functions:
 
-    normalize_block_content(str) -> str
+    normalize_block_content(str, NormalizationCache, BlockBudget, Uid) -> str
 
 """
-from typing import NamedTuple, TypeAlias, Callable, Final
+from typing import Any, Optional, NamedTuple, TypeAlias, Callable, Sequence, Final, cast
+from collections import OrderedDict
+import hashlib
 import logging
 import re
+import threading
+import time
 
 from common.log import TRACE
+from roampub.block_budget import BlockBudget, BlockBudgetExceeded, check_size, check_elapsed
 
 logger = logging.getLogger(__name__)
 
@@ -37,10 +45,34 @@ NormalizationResult = NamedTuple(
 Normalization: TypeAlias = Callable[['NormalizationRule', str], NormalizationResult]
 
 
+class FusedNormalization(NamedTuple):
+    """
+    The form of a ``NormalizationRule`` that ``NormalizationPipeline`` can merge with the other rules' into one scan.
+    The rule: is skipped, along with all of the rules after it, if ``consumes(content)``; otherwise, if ``applies`` is
+    ``None`` or ``applies(content)``, strips the content (if ``strip``), then replaces each match of ``pattern`` with 
+    ``rewrite(matched text)``.
+
+    The predicates are evaluated on the block's original content; so they must give the same answer on the content 
+    as rewritten by the rules ahead of this one (as with prefix checks, like the rules here).
+    """
+    consumes: Optional[Callable[[str], bool]] = None
+    applies: Optional[Callable[[str], bool]] = None
+    strip: bool = False
+    pattern: Optional[Callable[[Optional[str]], str]] = None
+    """
+    returns the regex source, with no capturing groups. Its arg is ``None``, or the alternation of the patterns of the 
+    applicable rules ahead of this one; a match must not span a match of those (which, run sequentially, would already 
+    have been rewritten), so ``pattern`` excludes it from any repetition that could.
+    """
+    rewrite: Optional[Callable[[str], str]] = None
+
+
 class NormalizationRule(NamedTuple):
     name: str
     description: str
     impl: Normalization
+    fused: Optional[FusedNormalization] = None
+    """``None`` if the rule can only be run on its own; see ``NormalizationPipeline``"""
 
 
     def normalize(self, content: str) -> NormalizationResult: 
@@ -55,6 +87,11 @@ PARA_BREAK_PATTERN: re.Pattern = re.compile(r"[\r?\n]{2,}(?=\S)")
 ROAM_ITALIC_PATTERN: re.Pattern = re.compile(r"__([^_\r\n]+)__")
 
 
+def _excluding(char_class: str, excluded: Optional[str]) -> str:
+    """``char_class``, but not at the start of a match of ``excluded``"""
+    return char_class if excluded is None else f"(?:(?!{excluded}){char_class})"
+
+
 def normalize_block_quote(rule: NormalizationRule, content: str) -> NormalizationResult:
     logger.log(TRACE, f"rule: {rule}, content: {content}")
 
@@ -72,7 +109,13 @@ BLOCK_QUOTE_RULE: Final[NormalizationRule] = NormalizationRule(
         "a BlockContentNode that starts `>` is treated as one big block quote, spanning any number of blank lines." +
         "so additional `>` chars are added at paragraph boundaries"
     ), 
-    normalize_block_quote
+    normalize_block_quote,
+    FusedNormalization(
+        applies=lambda content: content.startswith('>'),
+        strip=True,
+        pattern=lambda excluded: _excluding(r"[\r?\n]", excluded) + r"{2,}(?=\S)",
+        rewrite=lambda matched: "\n>\n>"
+    )
 )
 
 def normalize_code_block(rule: NormalizationRule, content: str) -> NormalizationResult:
@@ -88,7 +131,8 @@ CODE_BLOCK_RULE: Final[NormalizationRule] = NormalizationRule(
         "Right now, there are no transformations applied by this normalization, but the rule will" +
         "`consume` the block, preventing any other rules from applying"
     ), 
-    normalize_code_block
+    normalize_code_block,
+    FusedNormalization(consumes=lambda content: is_code_block(content.strip()))
 )
 
 def normalize_italics(rule: NormalizationRule, content: str) -> NormalizationResult:
@@ -103,7 +147,11 @@ ITALICS_RULE: Final[NormalizationRule] = NormalizationRule(
         "In CommonMark, *emphasis* | _emphasis_, and **strong emphasis** | __strong emphasis__" +
         "This rule follows `Markua` conventions: __italic__ -> *emphasis*; **bold** -> **strong emphasis**"
     ), 
-    normalize_italics
+    normalize_italics,
+    FusedNormalization(
+        pattern=lambda excluded: "__" + _excluding(r"[^_\r\n]", excluded) + "+__",
+        rewrite=lambda matched: f"*{matched[2:-2]}*"
+    )
 )
 
 
@@ -115,11 +163,9 @@ ALL_RULES: Final[list[NormalizationRule]] = [
 ]
 
 
-def normalize_block_content(content: str) -> str:
-    logging.debug(f"content: {content}")
-
+def _normalize_sequentially(rules: Sequence[NormalizationRule], content: str) -> str:
     normalized_content: str = content
-    for rule in ALL_RULES:
+    for rule in rules:
         rule_result: NormalizationResult = rule.normalize(normalized_content)
         normalized_content = rule_result.normalized_content
         if rule_result.did_consume:
@@ -128,6 +174,236 @@ def normalize_block_content(content: str) -> str:
     return normalized_content
 
 
+class NormalizationPipeline:
+    """
+    ``rules``, compiled: the predicates of all of the rules are checked up front, then the content is stripped (at 
+    most) once, and the patterns of all of the applicable rules are matched in a single scan; the result is identical 
+    to running each rule in turn. If any rule has no ``FusedNormalization``, the rules are run in turn.
+    """
+
+    def __init__(self: Any, rules: Sequence[NormalizationRule]):
+        if any(arg is None for arg in [rules]):
+            raise ValueError("missing required arg")
+
+        self._rules: tuple[NormalizationRule, ...] = tuple(rules)
+        self._is_fused: bool = all(rule.fused is not None for rule in self._rules)
+        # one scanner per combination of applicable rules (e.g. block quote or not), compiled on first use
+        self._scanners: dict[tuple[int, ...], tuple[re.Pattern, tuple[Callable[[str], str], ...]]] = {}
+
+
+    @property
+    def rules(self) -> tuple[NormalizationRule, ...]:
+        """is read-only"""
+        return self._rules
+
+
+    @property
+    def is_fused(self) -> bool:
+        """is read-only"""
+        return self._is_fused
+
+
+    def _scanner(self, rule_indexes: tuple[int, ...]) -> tuple[re.Pattern, tuple[Callable[[str], str], ...]]:
+        scanner: Optional[tuple[re.Pattern, tuple[Callable[[str], str], ...]]] = self._scanners.get(rule_indexes)
+        if scanner is None:
+            sources: list[str] = []
+            for index in rule_indexes:
+                fused: FusedNormalization = cast(FusedNormalization, self._rules[index].fused)
+                excluded: Optional[str] = '|'.join(f"(?:{source})" for source in sources) if sources else None
+                sources.append(cast(Callable[[Optional[str]], str], fused.pattern)(excluded))
+            # one group per rule, in rule order; so ``lastindex`` identifies the rule that matched
+            pattern: re.Pattern = re.compile('|'.join(f"({source})" for source in sources))
+            rewrites: tuple[Callable[[str], str], ...] = tuple(
+                cast(Callable[[str], str], cast(FusedNormalization, self._rules[index].fused).rewrite) 
+                for index in rule_indexes
+            )
+            logger.debug(f"rule_indexes: {rule_indexes}, pattern: {pattern.pattern}")
+            scanner = (pattern, rewrites)
+            self._scanners[rule_indexes] = scanner
+        return scanner
+
+
+    def normalize(self, content: str) -> str:
+        if not isinstance(content, str):
+            raise TypeError()
+        if not self._is_fused:
+            return _normalize_sequentially(self._rules, content)
+
+        strip: bool = False
+        rule_indexes: list[int] = []
+        for index, rule in enumerate(self._rules):
+            fused: FusedNormalization = cast(FusedNormalization, rule.fused)
+            if fused.consumes is not None and fused.consumes(content):
+                break
+            if fused.applies is not None and not fused.applies(content):
+                continue
+            strip = strip or fused.strip
+            if fused.pattern is not None:
+                rule_indexes.append(index)
+
+        normalized_content: str = content.strip() if strip else content
+        if not rule_indexes:
+            return normalized_content
+        pattern, rewrites = self._scanner(tuple(rule_indexes))
+        return pattern.sub(lambda match: rewrites[cast(int, match.lastindex) - 1](match.group()), normalized_content)
+
+
+DEFAULT_MAX_NORMALIZED_ENTRIES: Final[int] = 10_000
+
+
+class NormalizationCache:
+    """
+    Memoizes ``normalize_block_content``; embeds and repeated boilerplate mean the same content is normalized over and 
+    over. Entries are keyed by a digest of the content; the whole cache is dropped whenever it is used with a different 
+    ``ALL_RULES`` than it was filled with. Bounded: the least recently used entry is evicted. Thread safe.
+
+    N.B. for callers of ``normalize_block_content``; ``page_dump_tokenize`` doesn't normalize (``roam_plugin`` parses 
+    the Roam syntax instead), so it doesn't use this.
+    """
+
+    def __init__(self: Any, max_entries: int = DEFAULT_MAX_NORMALIZED_ENTRIES):
+        if any(arg is None for arg in [max_entries]):
+            raise ValueError("missing required arg")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive; max_entries: {max_entries}")
+
+        self._max_entries: int = max_entries
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        # the rules the entries were normalized with
+        self._rules: tuple[NormalizationRule, ...] = ()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._invalidations: int = 0
+
+
+    @property
+    def max_entries(self) -> int:
+        """is read-only"""
+        return self._max_entries
+
+
+    @property
+    def hits(self) -> int:
+        """is read-only"""
+        return self._hits
+
+
+    @property
+    def misses(self) -> int:
+        """is read-only"""
+        return self._misses
+
+
+    @property
+    def invalidations(self) -> int:
+        """is read-only; the number of times the entries were dropped, because ``ALL_RULES`` changed"""
+        return self._invalidations
+
+
+    @property
+    def hit_rate(self) -> float:
+        """is read-only; 0.0 if there have been no lookups"""
+        lookups: int = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def normalize(self, content: str, pipeline: NormalizationPipeline) -> str:
+        """``pipeline.normalize(content)``, or the memoized result"""
+        if not isinstance(content, str):
+            raise TypeError()
+
+        with self._lock:
+            if self._rules is not pipeline.rules:
+                if self._entries and (len(self._rules) != len(pipeline.rules) or any(
+                    a is not b for a, b in zip(self._rules, pipeline.rules)
+                )):
+                    logger.debug("ALL_RULES changed; dropping normalized entries")
+                    self._entries.clear()
+                    self._invalidations += 1
+                self._rules = pipeline.rules
+            rules: tuple[NormalizationRule, ...] = self._rules
+            key: bytes = hashlib.sha256(content.encode('utf-8', 'surrogatepass')).digest()
+            normalized_content: Optional[str] = self._entries.get(key)
+            if normalized_content is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return normalized_content
+            self._misses += 1
+
+        normalized_content = pipeline.normalize(content)
+        with self._lock:
+            # unless the rules changed in the meantime
+            if self._rules is rules:
+                self._entries[key] = normalized_content
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return normalized_content
+
+
+    def clear(self) -> None:
+        """empties the cache, and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._invalidations = 0
+
+
+    def __repr__(self):
+        clsname: str = type(self).__name__
+        return (
+            f"{clsname}(entries: {len(self._entries)}/{self._max_entries}, hits: {self._hits}, "
+            f"misses: {self._misses}, invalidations: {self._invalidations})"
+        )
+
+
+_pipeline: NormalizationPipeline = NormalizationPipeline(ALL_RULES)
+
+
+def normalize_block_content(
+        content: str, cache: Optional[NormalizationCache] = None, budget: Optional[BlockBudget] = None, 
+        uid: Optional[str] = None
+    ) -> str:
+    """
+    Runs the ``ALL_RULES`` as a ``NormalizationPipeline``, which is recompiled whenever ``ALL_RULES`` has changed
+
+    Args:
+        cache (NormalizationCache): if given, the result is memoized there
+        budget (BlockBudget): if given, content over ``budget.max_size``, or whose normalization takes over 
+            ``budget.max_seconds``, is returned as is (i.e. as literal text)
+        uid (str): of the block whose ``content`` this is; only to report it, if it is over ``budget``
+    """
+    # N.B. not the content itself; this is called once per block
+    logger.log(TRACE, f"len(content): {len(content)}")
+    global _pipeline
+    if cache is not None and not isinstance(cache, NormalizationCache):
+        raise TypeError(f"is not instanceof {NormalizationCache}; cache: {cache}")
+    if budget is not None and not isinstance(budget, BlockBudget):
+        raise TypeError(f"is not instanceof {BlockBudget}; budget: {budget}")
+
+    if len(_pipeline.rules) != len(ALL_RULES) or any(a is not b for a, b in zip(_pipeline.rules, ALL_RULES)):
+        logger.debug("ALL_RULES changed; rebuilding pipeline")
+        _pipeline = NormalizationPipeline(ALL_RULES)
+    if budget is None:
+        return _pipeline.normalize(content) if cache is None else cache.normalize(content, _pipeline)
+
+    # a regex can't be interrupted; so the size is checked up front, and the time afterwards
+    try:
+        check_size(content, budget)
+        start: float = time.perf_counter()
+        normalized_content: str = (
+            _pipeline.normalize(content) if cache is None else cache.normalize(content, _pipeline)
+        )
+        check_elapsed(start, budget)
+    except BlockBudgetExceeded as e:
+        logger.warning(f"block over budget; left as literal text; uid: {uid}, budget: {e}")
+        return content
+    return normalized_content
+
+
 def is_code_block(content: str) -> bool:
     return content.startswith("```")
 
@@ -0,0 +1,328 @@
+""" compact, immutable variants of the ``roam_model`` vertex classes
+
+The ``roam_model`` classes carry a per-instance ``__dict__``, and their ``children``/``references`` are mutable lists.
+The ``Frozen*`` classes here use ``__slots__`` (no ``__dict__``), store links as ``tuple``s, reject attribute
+assignment, and cache their hash; so they are smaller, hashable, and safe to share between threads. Each is registered
+as a virtual subclass of its ``roam_model`` counterpart, so ``isinstance(FrozenPageNode(...), PageNode)`` is ``True``
+and the exporter, tokenizer and validators accept them unchanged.
+
+
+Classes:
+
+    FrozenRoamVertex
+    FrozenRoamNode
+    FrozenPageNode
+    FrozenBlockHeadingNode
+    FrozenBlockContentNode
+    FrozenFileVertex
+
+
+Functions:
+
+    freeze_vertex(RoamVertex) -> FrozenRoamVertex
+    freeze_vertex_map(VertexMap) -> VertexMap
+
+"""
+from typing import Any, Optional, Iterable, Final, cast
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import logging
+
+from common.types import Url
+from roampub.roam_model import (
+    Uid, VertexType, MediaType, VertexMap, RoamVertex, RoamNode, PageNode, BlockHeadingNode, BlockContentNode,
+    FileVertex, ReferenceSpan, is_vertex_map, scan_references
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenRoamVertex(ABC):
+    """
+    see ``RoamVertex``
+    """
+    __slots__ = ('_uid', '_media_type', '_hash')
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType):
+        if any(arg is None for arg in (uid, media_type)):
+            raise ValueError("missing required arg")
+        if not isinstance(media_type, MediaType):
+            raise TypeError(f"is not instanceof {MediaType}; media_type: {media_type}")
+
+        object.__setattr__(self, '_uid', uid)
+        object.__setattr__(self, '_media_type', media_type)
+        object.__setattr__(self, '_hash', hash(self._key()))
+
+
+    @property
+    def uid(self) -> Uid:
+        """is read-only"""
+        return self._uid
+
+
+    @property
+    def media_type(self) -> MediaType:
+        """is read-only"""
+        return self._media_type
+
+
+    @property
+    @abstractmethod
+    def vertex_type(self) -> VertexType:
+        """is read-only"""
+        pass
+
+
+    def _init_args(self) -> tuple:
+        """the positional args that recreate this vertex"""
+        return (self._uid, self._media_type)
+
+
+    def _key(self) -> tuple:
+        return (type(self), *self._init_args())
+
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable; name: {name}")
+
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable; name: {name}")
+
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenRoamVertex):
+            return NotImplemented
+        return self._hash == other._hash and self._key() == other._key()
+
+
+    def __hash__(self) -> int:
+        return self._hash
+
+
+    def __reduce__(self):
+        # ``__setattr__`` is disabled, so the default slot-by-slot unpickling can't be used
+        return (type(self), self._init_args())
+
+
+    __repr__ = RoamVertex.__repr__
+
+
+# the default ``children``/``references``: empty, rather than ``None``; as with ``roam_model.RoamNode``
+_NO_LINKS: Final[tuple[Uid, ...]] = ()
+
+
+def _freeze_links(links: Optional[Iterable[Uid]]) -> Optional[tuple[Uid, ...]]:
+    return None if links is None else tuple(links)
+
+
+class FrozenRoamNode(FrozenRoamVertex):
+    """
+    see ``RoamNode``; ``children`` and ``references`` are ``tuple``s
+    """
+    __slots__ = ('_children', '_references')
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType, children: Optional[Iterable[Uid]] = _NO_LINKS,
+                 references: Optional[Iterable[Uid]] = _NO_LINKS):
+        object.__setattr__(self, '_children', _freeze_links(children))
+        object.__setattr__(self, '_references', _freeze_links(references))
+        super().__init__(uid, media_type)
+
+
+    @property
+    def children(self) -> Optional[tuple[Uid, ...]]:
+        """is read-only"""
+        return self._children
+
+
+    @property
+    def references(self) -> Optional[tuple[Uid, ...]]:
+        """is read-only"""
+        return self._references
+
+
+    def _init_args(self) -> tuple:
+        return (self._uid, self._media_type, self._children, self._references)
+
+
+class FrozenPageNode(FrozenRoamNode):
+    __slots__ = ('_title',)
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType, title: str,
+                 children: Optional[Iterable[Uid]] = _NO_LINKS, references: Optional[Iterable[Uid]] = _NO_LINKS):
+        if title is None:
+            raise ValueError("missing required arg")
+
+        object.__setattr__(self, '_title', title)
+        super().__init__(uid, media_type, children, references)
+
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+
+    @property
+    def vertex_type(self) -> VertexType:
+        return VertexType.ROAM_PAGE
+
+
+    def _init_args(self) -> tuple:
+        return (self._uid, self._media_type, self._title, self._children, self._references)
+
+
+class FrozenBlockHeadingNode(FrozenRoamNode):
+    __slots__ = ('_heading', '_level')
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType, heading: str, level: int,
+                 children: Optional[Iterable[Uid]] = _NO_LINKS, references: Optional[Iterable[Uid]] = _NO_LINKS):
+        if any(arg is None for arg in (heading, level)):
+            raise ValueError("missing required arg")
+
+        object.__setattr__(self, '_heading', heading)
+        object.__setattr__(self, '_level', level)
+        super().__init__(uid, media_type, children, references)
+
+
+    @property
+    def heading(self) -> str:
+        return self._heading
+
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+
+    @property
+    def vertex_type(self) -> VertexType:
+        return VertexType.ROAM_BLOCK_HEADING
+
+
+    def _init_args(self) -> tuple:
+        return (self._uid, self._media_type, self._heading, self._level, self._children, self._references)
+
+
+class FrozenBlockContentNode(FrozenRoamNode):
+    __slots__ = ('_content', '_reference_spans')
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType, content: str,
+                 children: Optional[Iterable[Uid]] = _NO_LINKS, references: Optional[Iterable[Uid]] = _NO_LINKS):
+        object.__setattr__(self, '_content', content)
+        super().__init__(uid, media_type, children, references)
+
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+
+    def reference_spans(self) -> tuple[ReferenceSpan, ...]:
+        """see ``BlockContentNode.reference_spans``; ``content`` can't change, so the cache never goes stale"""
+        try:
+            return self._reference_spans
+        except AttributeError:
+            spans: tuple[ReferenceSpan, ...] = tuple(scan_references(self._content))
+            object.__setattr__(self, '_reference_spans', spans)
+            return spans
+
+
+    @property
+    def vertex_type(self) -> VertexType:
+        return VertexType.ROAM_BLOCK_CONTENT
+
+
+    def _init_args(self) -> tuple:
+        return (self._uid, self._media_type, self._content, self._children, self._references)
+
+
+class FrozenFileVertex(FrozenRoamVertex):
+    __slots__ = ('_file_name', '_source')
+
+
+    def __init__(self: Any, uid: Uid, media_type: MediaType, file_name: str, source: Url):
+        if any(arg is None for arg in (file_name, source)):
+            raise ValueError("missing required arg")
+
+        object.__setattr__(self, '_file_name', file_name)
+        object.__setattr__(self, '_source', source)
+        super().__init__(uid, media_type)
+
+
+    @property
+    def file_name(self) -> str:
+        return self._file_name
+
+
+    @property
+    def source(self) -> Url:
+        return self._source
+
+
+    @property
+    def vertex_type(self) -> VertexType:
+        return VertexType.ROAM_FILE
+
+
+    def _init_args(self) -> tuple:
+        return (self._uid, self._media_type, self._file_name, self._source)
+
+
+# virtual subclassing (``ABCMeta.register``) gives ``isinstance`` compatibility without inheriting the ``__dict__``
+PageNode.register(FrozenPageNode)
+BlockHeadingNode.register(FrozenBlockHeadingNode)
+BlockContentNode.register(FrozenBlockContentNode)
+FileVertex.register(FrozenFileVertex)
+
+
+def freeze_vertex(vertex: RoamVertex) -> FrozenRoamVertex:
+    """
+    Returns:
+        ``vertex`` itself, if it is already frozen; otherwise, the equivalent ``Frozen*`` vertex
+    """
+    logger.debug(f"vertex: {vertex}")
+    if any(arg is None for arg in [vertex]):
+        raise ValueError("missing required arg")
+    if isinstance(vertex, FrozenRoamVertex):
+        return vertex
+    if not isinstance(vertex, RoamVertex):
+        raise TypeError(f"is not instanceof {RoamVertex}; vertex: {vertex}")
+
+    match vertex.vertex_type:
+        case VertexType.ROAM_PAGE:
+            page_node: PageNode = cast(PageNode, vertex)
+            return FrozenPageNode(
+                page_node.uid, page_node.media_type, page_node.title, page_node.children, page_node.references
+            )
+        case VertexType.ROAM_BLOCK_HEADING:
+            heading_node: BlockHeadingNode = cast(BlockHeadingNode, vertex)
+            return FrozenBlockHeadingNode(
+                heading_node.uid, heading_node.media_type, heading_node.heading, heading_node.level,
+                heading_node.children, heading_node.references
+            )
+        case VertexType.ROAM_BLOCK_CONTENT:
+            content_node: BlockContentNode = cast(BlockContentNode, vertex)
+            return FrozenBlockContentNode(
+                content_node.uid, content_node.media_type, content_node.content, content_node.children,
+                content_node.references
+            )
+        case VertexType.ROAM_FILE:
+            file_vertex: FileVertex = cast(FileVertex, vertex)
+            return FrozenFileVertex(file_vertex.uid, file_vertex.media_type, file_vertex.file_name, file_vertex.source)
+        case _:
+            raise ValueError(f"unrecognized vertex_type: {vertex.vertex_type}")
+
+
+def freeze_vertex_map(graph: VertexMap) -> VertexMap:
+    logger.debug(f"graph: {graph}")
+    if any(arg is None for arg in [graph]):
+        raise ValueError("missing required arg")
+    if not is_vertex_map(graph):
+        raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+
+    return OrderedDict((uid, cast(RoamVertex, freeze_vertex(vertex))) for uid, vertex in graph.items())
@@ -1,5 +1,10 @@
 """ class to read PageDump generated .zip archives -- the output of PageDump.js
  
+Enums:
+
+    ValidationMode
+
+
 Classes:
 
     PageDump
@@ -14,7 +19,9 @@ Functions:
 
     load_json_dump(Path) -> VertexMap
     read_page_dump_json(Path) -> list[dict[str, Any]]
-    create_vertex_map(list[dict[str, Any]]) -> VertexMap
+    iter_page_dump_json(TextIO) -> Iterator[dict[str, Any]]
+    create_vertex_map(Iterable[dict[str, Any]]) -> VertexMap
+    create_vertex_store(Iterable[dict[str, Any]]) -> VertexStore
     create_roam_vertex(dict[str, Any]) -> RoamVertex
     create_page_node(dict[str, Any]) -> PageNode
     create_block_heading_node(dict[str, Any]) -> BlockHeadingNode
@@ -24,36 +31,109 @@ Functions:
 
 """
 
-from typing import Any, TextIO, Union, Tuple
+from typing import Any, TextIO, Union, Tuple, Iterator, Iterable, Optional, Final
 import logging
+import re
+from enum import StrEnum, unique
+from io import TextIOWrapper
 from pathlib import Path, PurePath
-from json import load, loads
+from json import load, JSONDecoder, JSONDecodeError
 from zipfile import ZipFile, ZipInfo
 
 from common.collect import get_first_value
 from roampub.roam_model import *
+from roampub.vertex_store import VertexStore
+from roampub.vertex_map_cache import (
+    CachedVertexMap, cache_key, sidecar_path, load_cached_vertex_map, store_cached_vertex_map
+)
 
 logger = logging.getLogger(__name__)
 
 
+@unique
+class ValidationMode(StrEnum):
+    """
+    When (and whether) ``PageDump`` runs ``roam_model.validate`` over its graph
+    """
+    EAGER = 'eager'
+    """parse and validate during construction"""
+    LAZY = 'lazy'
+    """parse and validate on first access to the graph (``vertex_map``, ``root_page``, ``[]``, ...)"""
+    TRUSTED = 'trusted'
+    """parse on first access to the graph; only validate when ``PageDump.validate()`` is called explicitly"""
+
+    def __str__(self):
+        return f"{self.__class__.__name__}.{self._name_}"
+
+
 class PageDump:
-    def __init__(self: Any, zip_path: Path): 
-        if any(arg is None for arg in [zip_path]):
+    def __init__(self: Any, zip_path: Path, cache_dir: Optional[Path] = None, 
+                 validation_mode: ValidationMode = ValidationMode.EAGER, columnar: bool = False): 
+        """
+        Args:
+            cache_dir (Path): if given, the built ``VertexMap`` and its validation verdict are read from (and written 
+            to) a sidecar file in this directory, keyed by the CRC/size/mtime of the PageDump.json zip member. See 
+            ``vertex_map_cache.py``
+            validation_mode (ValidationMode): ``TRUSTED`` is for dumps that were already validated upstream
+            columnar (bool): back ``vertex_map`` with a compact, read-only ``VertexStore`` instead of an 
+            ``OrderedDict`` of vertex objects. See ``vertex_store.py``
+
+        Raises:
+            BadPageDump: only in ``ValidationMode.EAGER``; see ``validate()`` for the other modes
+        """
+        if any(arg is None for arg in [zip_path, validation_mode, columnar]):
             raise ValueError("missing required arg")
         if not isinstance(zip_path, Path):
             raise TypeError(f"is not instanceof {Path}; zip_path: {zip_path}")
+        if cache_dir is not None and not isinstance(cache_dir, Path):
+            raise TypeError(f"is not instanceof {Path}; cache_dir: {cache_dir}")
+        if not isinstance(validation_mode, ValidationMode):
+            raise TypeError(f"is not instanceof {ValidationMode}; validation_mode: {validation_mode}")
         
         # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
         self._zip_file: ZipFile = ZipFile(zip_path, "r")
         _validate_zip_file(self._zip_file)
 
-        self._vertex_map_json: str = None
+        self._cache_dir: Optional[Path] = cache_dir
+        self._validation_mode: ValidationMode = validation_mode
+        self._columnar: bool = columnar
         self._vertex_map: VertexMap = None
+        self._is_validated: bool = False
+        self._validation_result: ValidationResult = None
+
+        if validation_mode is ValidationMode.EAGER:
+            self.validate()
 
-        validation_result: ValidationResult = validate(self.vertex_map)
-        logger.debug(f"validation_result: {validation_result}")
-        if validation_result is not None:
-            raise BadPageDump(validation_result)
+
+    def validate(self) -> None:
+        """
+        Parses the graph (if that hasn't happened yet) and checks it with ``roam_model.validate``. The verdict is 
+        remembered, so only the first call does any work.
+
+        Raises:
+            BadPageDump: if the graph has any ``ValidationFailure``s
+        """
+        self._load_vertex_map()
+        if not self._is_validated:
+            self._validation_result = validate(self._vertex_map)
+            self._is_validated = True
+            self._store_cached()
+
+        logger.debug(f"validation_result: {self._validation_result}")
+        if self._validation_result is not None:
+            raise BadPageDump(self._validation_result)
+
+
+    @property
+    def validation_mode(self) -> ValidationMode:
+        """is read-only"""
+        return self._validation_mode
+
+
+    @property
+    def is_validated(self) -> bool:
+        """is read-only; ``True`` once a validation verdict (pass or fail) is known"""
+        return self._is_validated
 
 
     @property
@@ -70,29 +150,24 @@ class PageDump:
 
     @property
     def vertex_map_json(self) -> str:
-        """is read-only"""
-        if self._vertex_map_json is not None:
-            return self._vertex_map_json
-        
-
-        json_path: PurePath = PurePath(f"{self.dump_name}", f"{self.dump_name}.json")
-        logger.debug(f"json_path: {json_path}")
-        json_zipinfo: ZipInfo = self._zip_file.getinfo(json_path.as_posix())
-        logger.debug(f"json_zipinfo: {json_zipinfo}")
-        self._vertex_map_json: str = self._zip_file.read(json_zipinfo).decode(encoding="utf-8")
-        logger.log(TRACE, f"_vertex_map_json: {self._vertex_map_json}")
-
-        return self._vertex_map_json
+        """
+        is read-only. The entire ``PageDump.json`` member, decoded into a single ``str``. This is read fresh from the 
+        zip archive on every access, and is *not* used to build ``vertex_map`` (which is parsed from a stream).
+        """
+        json_zipinfo: ZipInfo = self._json_zipinfo()
+        return self._zip_file.read(json_zipinfo).decode(encoding="utf-8")
     
 
     @property
     def vertex_map(self) -> VertexMap:
-        if self._vertex_map is not None:
-            return self._vertex_map
-        
-        json_objs: list[dict[str, Any]]  = loads(self.vertex_map_json)
-        logger.log(TRACE, f"json_objs: {json_objs}")
-        self._vertex_map = create_vertex_map(json_objs)
+        """
+        Raises:
+            BadPageDump: in ``ValidationMode.LAZY``, on first access, if the graph fails validation
+        """
+        if self._validation_mode is ValidationMode.LAZY:
+            self.validate()
+        else:
+            self._load_vertex_map()
 
         return self._vertex_map
 
@@ -151,6 +226,65 @@ class PageDump:
         return zip_info
 
 
+    def _json_zipinfo(self) -> ZipInfo:
+        json_path: PurePath = PurePath(f"{self.dump_name}", f"{self.dump_name}.json")
+        logger.debug(f"json_path: {json_path}")
+        json_zipinfo: ZipInfo = self._zip_file.getinfo(json_path.as_posix())
+        logger.debug(f"json_zipinfo: {json_zipinfo}")
+        return json_zipinfo
+
+
+    def _open_json_reader(self) -> TextIO:
+        return TextIOWrapper(self._zip_file.open(self._json_zipinfo(), "r"), encoding="utf-8")
+
+
+    def _load_vertex_map(self) -> None:
+        if self._vertex_map is not None:
+            return
+
+        cached: Optional[CachedVertexMap] = self._load_cached()
+        if cached is not None:
+            self._vertex_map = cached.vertex_map
+            self._is_validated = cached.is_validated
+            self._validation_result = cached.validation_result
+            return
+
+        # N.B. the vertices are parsed one at a time, straight from the (decompressing) zip member stream, so that the 
+        # whole JSON document is never held in memory (neither as a ``str``, nor as a list of ``dict``)
+        with self._open_json_reader() as json_reader:
+            source: Iterator[dict[str, Any]] = iter_page_dump_json(json_reader)
+            self._vertex_map = (
+                cast(VertexMap, create_vertex_store(source)) if self._columnar else create_vertex_map(source)
+            )
+        logger.debug(f"len(_vertex_map): {len(self._vertex_map)}")
+
+        # otherwise, ``validate()`` is about to store it along with the verdict
+        if self._validation_mode is ValidationMode.TRUSTED:
+            self._store_cached()
+
+
+    def _load_cached(self) -> Optional[CachedVertexMap]:
+        if self._cache_dir is None:
+            return None
+
+        cached: Optional[CachedVertexMap] = (
+            load_cached_vertex_map(sidecar_path(self.zip_path, self._cache_dir), cache_key(self._json_zipinfo()))
+        )
+        if cached is not None and isinstance(cached.vertex_map, VertexStore) != self._columnar:
+            # sidecar was written with the other backing
+            cached = None
+        logger.debug(f"cache hit: {cached is not None}")
+        return cached
+
+
+    def _store_cached(self) -> None:
+        if self._cache_dir is None:
+            return
+
+        cached: CachedVertexMap = CachedVertexMap(self._vertex_map, self._is_validated, self._validation_result)
+        store_cached_vertex_map(sidecar_path(self.zip_path, self._cache_dir), cache_key(self._json_zipinfo()), cached)
+
+
     def _vertex_type_counts(self) -> dict[str, int]:
         vertex_type_map: VertexTypeMap = to_vertex_type_map(self.vertex_map)
 
@@ -194,13 +328,117 @@ def read_page_dump_json(file_path: Path) -> list[dict[str, Any]]:
     return load(jsonFile)
 
 
-def create_vertex_map(source: list[dict[str, Any]]) -> VertexMap: 
+JSON_READ_CHUNK_SIZE: Final[int] = 64 * 1024
+"""
+number of characters ``iter_page_dump_json`` requests from its reader at a time
+"""
+
+_JSON_WHITESPACE_PATTERN: Final[re.Pattern] = re.compile(r"[ \t\n\r]*")
+
+
+def iter_page_dump_json(reader: TextIO, chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    """
+    Incrementally parses the top-level JSON array of a PageDump.json stream, yielding each element (one ``dict`` per 
+    vertex) as soon as it has been decoded. Only the current chunk, plus the element being decoded, is ever held in 
+    memory-- never the whole document.
+
+    Args:
+        reader (TextIO): positioned at the start of a JSON document whose top-level value is an array
+        chunk_size (int): number of characters to request from ``reader`` at a time
+
+    Raises:
+        JSONDecodeError: if the stream is not a well-formed JSON array
+    """
+    logger.debug(f"reader: {reader}, chunk_size: {chunk_size}")
+    if any(arg is None for arg in [reader, chunk_size]):
+        raise ValueError("missing required arg")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive; chunk_size: {chunk_size}")
+
+    decoder: JSONDecoder = JSONDecoder()
+    buffer: str = ''
+    pos: int = 0
+    at_eof: bool = False
+
+    def read_more(min_size: int) -> bool:
+        """appends the next chunk to ``buffer``, discarding everything before ``pos``"""
+        nonlocal buffer, pos, at_eof
+        if at_eof:
+            return False
+        # grow geometrically, so that decoding an element larger than ``chunk_size`` stays linear
+        chunk: str = reader.read(max(chunk_size, min_size))
+        if not chunk:
+            at_eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek() -> str:
+        """skips whitespace, and returns the next significant char; '' at end of stream"""
+        nonlocal pos
+        while True:
+            pos = _JSON_WHITESPACE_PATTERN.match(buffer, pos).end()  # type: ignore
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more(0):
+                return ''
+
+    if peek() != '[':
+        raise JSONDecodeError("Expecting '['", buffer, pos)
+    pos += 1
+    if peek() == ']':
+        return
+
+    while True:
+        peek()
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except JSONDecodeError:
+                # element is (most likely) split across chunks
+                if not read_more(len(buffer) - pos):
+                    raise
+                continue
+            # a scalar that ends exactly at the end of the buffer might continue in the next chunk
+            if end == len(buffer) and read_more(len(buffer) - pos):
+                continue
+            break
+
+        pos = end
+        yield element
+
+        match peek():
+            case ',':
+                pos += 1
+            case ']':
+                return
+            case _:
+                raise JSONDecodeError("Expecting ',' delimiter or ']'", buffer, pos)
+
+
+def create_vertex_map(source: Iterable[dict[str, Any]]) -> VertexMap: 
+    """
+    ``source`` is consumed lazily, so passing in an ``Iterator`` (e.g. from ``iter_page_dump_json``) means only the 
+    finished ``VertexMap`` is retained; not the source ``dict``s.
+    """
+    logger.debug(f"source: {source}")
+    if any(arg is None for arg in [source]):
+        raise ValueError("missing required arg")
+    
+    return OrderedDict((v.uid, v) for v in map(create_roam_vertex, source))
+
+
+def create_vertex_store(source: Iterable[dict[str, Any]]) -> VertexStore: 
+    """
+    As with ``create_vertex_map``, ``source`` is consumed lazily; each ``RoamVertex`` is discarded as soon as it has 
+    been copied into the store.
+    """
     logger.debug(f"source: {source}")
-    if any(arg is None for arg in (source)):
+    if any(arg is None for arg in [source]):
         raise ValueError("missing required arg")
     
-    vertices: list[RoamVertex] = [create_roam_vertex(json_obj) for json_obj in source]
-    return OrderedDict([(v.uid, v) for v in vertices])
+    return VertexStore(map(create_roam_vertex, source))
 
 
 def load_json_dump(json_path: Path) ->  VertexMap:
@@ -208,9 +446,8 @@ def load_json_dump(json_path: Path) ->  VertexMap:
     if not json_path:
         raise ValueError("missing required arg")
     
-    json_objs: list[dict[str, Any]] = read_page_dump_json(json_path)
-    logger.debug(f"json_objs: {json_objs}")
-    return create_vertex_map(json_objs)
+    with open(json_path, encoding="utf-8") as json_reader:
+        return create_vertex_map(iter_page_dump_json(json_reader))
 
 
 def create_roam_vertex(source: dict[str, Any]) -> RoamVertex: 
@@ -9,18 +9,23 @@ Types:
 
 Functions:
 
+    export_node(RoamNode, VertexMap, TextIO) -> None
     export_node_str(RoamNode, VertexMap) -> str
     export_page_node_str(RoamNode, VertexMap) -> str
     export_block_heading_node_str(RoamNode, VertexMap) -> str
     export_block_content_node_str(RoamNode, VertexMap) -> str
 
 """
-from typing import TypeAlias, Callable, cast
+from typing import TypeAlias, Callable, TextIO, cast
+from io import StringIO
 import logging
 
 from common.log import TRACE
 
-from roampub.roam_model import VertexType, RoamNode, PageNode, BlockHeadingNode, BlockContentNode, VertexMap
+from roampub.roam_model import (
+    VertexType, RoamVertex, RoamNode, PageNode, BlockHeadingNode, BlockContentNode, VertexMap, TraversalEvent, 
+    is_vertex_map, walk
+)
 
 
 logger = logging.getLogger(__name__)
@@ -29,26 +34,65 @@ logger = logging.getLogger(__name__)
 Exportation: TypeAlias = Callable[[RoamNode, VertexMap], str]
 
 
+def _node_str(node: RoamVertex) -> str:
+    """the export of ``node`` itself, without its children"""
+    match node.vertex_type:
+        case VertexType.ROAM_PAGE:
+            return f"# {cast(PageNode, node).title.strip()}"
+        case VertexType.ROAM_BLOCK_HEADING:
+            block_heading_node: BlockHeadingNode = cast(BlockHeadingNode, node)
+            return f"{'#'*block_heading_node.level} {block_heading_node.heading.strip()}"
+        case VertexType.ROAM_BLOCK_CONTENT:
+            return cast(BlockContentNode, node).content.strip()
+        case _:
+            raise ValueError(f"unrecognized vertex_type: {node.vertex_type}")
+
+
+def _export_tree(node: RoamNode, graph: VertexMap, out: TextIO) -> None:
+    """
+    Each node's export is followed by its children's, separated by a blank line. Iterative (see ``walk``), so deeply
+    nested outlines don't hit the recursion limit; and each node is written to ``out`` as it is visited.
+    """
+    is_first: bool = True
+    for step in walk(node, graph):
+        if step.event is TraversalEvent.ENTER:
+            if not is_first:
+                out.write('\n\n')
+            out.write(_node_str(step.node))
+            is_first = False
+        elif step.node.vertex_type is VertexType.ROAM_PAGE and cast(PageNode, step.node).children:
+            # add a single newline to end of document
+            out.write('\n')
+
+
+def _export_tree_str(node: RoamNode, graph: VertexMap) -> str:
+    out: StringIO = StringIO()
+    _export_tree(node, graph, out)
+    return out.getvalue()
+
+
+def export_node(node: RoamNode, graph: VertexMap, out: TextIO) -> None:
+    """
+    Writes the same MarkDown as ``export_node_str`` to ``out``, one node at a time; so only a single block's export is
+    held in memory, however large the tree.
+    """
+    logger.log(TRACE, f"node: {node}")
+    if any(arg is None for arg in [node, graph, out]):
+        raise ValueError("missing required arg")
+    if not isinstance(node, RoamNode):
+        raise TypeError(f"is not instanceof {RoamNode}; node: {node}")    
+    if not is_vertex_map(graph):
+        raise TypeError(f"is not instanceof {VertexMap}; node: {graph}")    
+
+    _export_tree(node, graph, out)
+
+
 def export_page_node_str(node: RoamNode, graph: VertexMap) -> str:
     logger.log(TRACE, f"node: {node}")
     if not isinstance(node, PageNode):
         raise TypeError(f"is not instanceof {PageNode}; node: {node}")
     
-    page_node: PageNode = cast(PageNode, node)
-    heading: str = f"# {page_node.title.strip()}"
-
-    if not page_node.children:
-        return heading
-    
-    children_exports: list[str] = (
-        [export_node_str(cast(RoamNode, graph[c_uid]), graph) for c_uid in page_node.children]
-    )
-    logger.log(TRACE, f"children_exports: {children_exports}")
-    
-    nodes_content: str = '\n\n'.join(([heading]+children_exports))
-    # add a single newline to end of document
-    nodes_content += '\n'
-    return nodes_content
+    return _export_tree_str(node, graph)
 
 
 def export_block_heading_node_str(node: RoamNode, graph: VertexMap) -> str:
@@ -56,18 +100,7 @@ def export_block_heading_node_str(node: RoamNode, graph: VertexMap) -> str:
     if not isinstance(node, BlockHeadingNode):
         raise TypeError(f"is not instanceof {BlockHeadingNode}; node: {node}")
     
-    block_heading_node: BlockHeadingNode = cast(BlockHeadingNode, node)
-    heading: str = f"{'#'*block_heading_node.level} {block_heading_node.heading.strip()}"
-
-    if not block_heading_node.children:
-        return heading
-    
-    children_exports: list[str] = (
-        [export_node_str(cast(RoamNode, graph[c_uid]), graph) for c_uid in block_heading_node.children]
-    )
-    logger.log(TRACE, f"children_exports: {children_exports}")
-    
-    return '\n\n'.join(([heading]+children_exports))
+    return _export_tree_str(node, graph)
 
 
 def export_block_content_node_str(node: RoamNode, graph: VertexMap) -> str:
@@ -75,18 +108,7 @@ def export_block_content_node_str(node: RoamNode, graph: VertexMap) -> str:
     if not isinstance(node, BlockContentNode):
         raise TypeError(f"is not instanceof {BlockContentNode}; node: {node}")
     
-    block_content_node: BlockContentNode = cast(BlockContentNode, node)
-    content: str = block_content_node.content.strip()
-
-    if not block_content_node.children:
-        return content
-    
-    children_exports: list[str] = (
-        [export_node_str(cast(RoamNode, graph[c_uid]), graph) for c_uid in block_content_node.children]
-    )
-    logger.log(TRACE, f"children_exports: {children_exports}")
-    
-    return '\n\n'.join(([content]+children_exports))
+    return _export_tree_str(node, graph)
 
 
 def export_node_str(node: RoamNode, graph: VertexMap)-> str:
@@ -95,7 +117,7 @@ def export_node_str(node: RoamNode, graph: VertexMap)-> str:
         raise ValueError("missing required arg")
     if not isinstance(node, RoamNode):
         raise TypeError(f"is not instanceof {RoamNode}; node: {node}")    
-    if not isinstance(graph, VertexMap.__origin__):  # type: ignore
+    if not is_vertex_map(graph):
         raise TypeError(f"is not instanceof {VertexMap}; node: {graph}")    
     
     return STR_EXPORTATION_MAP[node.vertex_type](node, graph)
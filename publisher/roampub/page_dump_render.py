@@ -1,13 +1,243 @@
 """ functions to render PageDump as xhtml
- 
 
-Exceptions:
+Renders the token stream of ``page_dump_tokenize.iter_tokens`` (the lazy form of ``tokenize_node``) as one XHTML
+chapter document, written incrementally with lxml's ``etree.xmlfile``. Only the stack of currently open elements is
+held; no DOM is built, and each node is only tokenized as the writer reaches it. So the memory used is flat, however
+long the page.
 
+Types:
+
+    ReferenceHref
 
-Functions:
 
+Functions:
 
+    render_tokens(Iterable[Token], BinaryIO | Path, str, bool, ReferenceHref) -> None
+    render_node(RoamNode, VertexMap, BinaryIO | Path, bool, ParserConfig, TokenCache, ReferenceHref) -> None
 
 """
-from typing import Any, TextIO
+from typing import Any, Optional, Iterable, Callable, BinaryIO, ContextManager, TypeAlias, Final, cast
+from pathlib import Path
 import logging
+import re
+
+from lxml import etree
+from markdown_it.token import Token
+
+from common.log import TRACE
+from roampub.roam_model import Uid, ReferenceKind, RoamNode, PageNode, BlockHeadingNode, VertexType, VertexMap
+from roampub.page_dump_tokenize import ParserConfig, DEFAULT_PARSER_CONFIG, iter_tokens
+from roampub.roam_markdown import REFERENCE_KIND_META, REFERENCE_UID_META
+from roampub.token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+
+XHTML_NAMESPACE: Final[str] = 'http://www.w3.org/1999/xhtml'
+XHTML_DOCTYPE: Final[str] = '<!DOCTYPE html>'
+
+# neither in text, nor in attribute values, can XML 1.0 represent these
+_XML_INVALID_CHARS_PATTERN: Final[re.Pattern] = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+ReferenceHref: TypeAlias = Callable[[ReferenceKind, Uid], Optional[str]]
+"""
+the href of a Roam reference (e.g. to the chapter, or anchor, of a page or block); ``None`` renders it as plain text
+"""
+
+
+def _xml_text(text: str) -> str:
+    return _XML_INVALID_CHARS_PATTERN.sub('\ufffd', text)
+
+
+def _attrs(token: Token) -> dict[str, str]:
+    return {name: _xml_text(str(value)) for name, value in token.attrs.items()}
+
+
+def _inline_text(tokens: Optional[list[Token]]) -> str:
+    """the plain text of ``tokens``; e.g. an image's alt text, which markdown-it parses as inline children"""
+    if not tokens:
+        return ''
+    return ''.join(
+        token.content if token.type in ('text', 'code_inline') else
+        '\n' if token.type in ('softbreak', 'hardbreak') else
+        _inline_text(token.children)
+        for token in tokens
+    )
+
+
+class _TokenWriter:
+    """
+    Writes tokens to an open ``etree.xmlfile``; holds only the stack of open elements (as the ``etree.xmlfile``
+    context managers, which write the end tags when exited).
+    """
+
+    def __init__(self: Any, xf: Any, breaks: bool, reference_href: Optional[ReferenceHref]):
+        self._xf: Any = xf
+        self._breaks: bool = breaks
+        self._reference_href: Optional[ReferenceHref] = reference_href
+        self._open_elements: list[ContextManager] = []
+
+
+    def _open(self, tag: str, attrs: dict[str, str]) -> None:
+        element: ContextManager = self._xf.element(tag, attrs)
+        element.__enter__()
+        self._open_elements.append(element)
+
+
+    def _close(self) -> None:
+        self._open_elements.pop().__exit__(None, None, None)
+
+
+    def _write_empty(self, tag: str, attrs: dict[str, str]) -> None:
+        # unqualified, as are all of the elements; so it inherits the root's default (XHTML) namespace
+        self._xf.write(etree.Element(tag, attrs))
+
+
+    def _write_code(self, token: Token) -> None:
+        """``fence`` and ``code_block``"""
+        info: str = token.info.strip()
+        self._open('pre', {})
+        self._open('code', {'class': f"language-{_xml_text(info.split()[0])}"} if info else {})
+        self._xf.write(_xml_text(token.content))
+        self._close()
+        self._close()
+
+
+    def _write_text(self, token: Token) -> None:
+        kind: Optional[ReferenceKind] = token.meta.get(REFERENCE_KIND_META) if token.meta else None
+        href: Optional[str] = None
+        if kind is not None and self._reference_href is not None:
+            href = self._reference_href(kind, token.meta[REFERENCE_UID_META])
+        if href is None:
+            self._xf.write(_xml_text(token.content))
+            return
+        self._open('a', {'href': _xml_text(href)})
+        self._xf.write(_xml_text(token.content))
+        self._close()
+
+
+    def write(self, token: Token) -> None:
+        if token.hidden:
+            # e.g. the paragraphs of a tight list; their inline content is still rendered
+            if token.type == 'inline':
+                self.write_all(cast(list[Token], token.children))
+            return
+        if token.nesting == 1:
+            self._open(token.tag, _attrs(token))
+            return
+        if token.nesting == -1:
+            self._close()
+            if token.block:
+                self._xf.write('\n')
+            return
+
+        match token.type:
+            case 'inline':
+                self.write_all(cast(list[Token], token.children))
+            case 'text':
+                self._write_text(token)
+            case 'softbreak':
+                if self._breaks:
+                    self._write_empty('br', {})
+                self._xf.write('\n')
+            case 'hardbreak':
+                self._write_empty('br', {})
+                self._xf.write('\n')
+            case 'code_inline':
+                self._open('code', {})
+                self._xf.write(_xml_text(token.content))
+                self._close()
+            case 'fence' | 'code_block':
+                self._write_code(token)
+                self._xf.write('\n')
+            case 'hr':
+                self._write_empty('hr', {})
+                self._xf.write('\n')
+            case 'image':
+                attrs: dict[str, str] = _attrs(token)
+                attrs['alt'] = _xml_text(_inline_text(token.children))
+                self._write_empty('img', attrs)
+            case _:
+                # e.g. ``html_inline``/``html_block`` (only if the parser allows raw HTML); written as text, so that
+                # the document stays well-formed
+                logger.log(TRACE, f"rendering as text; token.type: {token.type}")
+                self._xf.write(_xml_text(token.content))
+
+
+    def write_all(self, tokens: Iterable[Token]) -> None:
+        for token in tokens:
+            self.write(token)
+
+
+    def close_all(self) -> None:
+        while self._open_elements:
+            self._close()
+
+
+def render_tokens(
+        tokens: Iterable[Token], out: BinaryIO | Path, title: str, breaks: bool = False,
+        reference_href: Optional[ReferenceHref] = None
+    ) -> None:
+    """
+    Writes ``tokens`` as the body of an XHTML document, consuming them one at a time; ``tokens`` may be a lazy stream
+    (e.g. ``iter_tokens``).
+
+    Args:
+        out (BinaryIO | Path): the document is written, UTF-8 encoded, to this file
+        breaks (bool): as with the ``MarkdownIt`` option; render ``softbreak``s as ``<br/>``
+        reference_href (ReferenceHref): if given, the Roam references (see ``roam_markdown``) that it returns an
+            href for are rendered as links
+    """
+    if any(arg is None for arg in [tokens, out, title]):
+        raise ValueError("missing required arg")
+    if not isinstance(out, Path) and not hasattr(out, 'write'):
+        raise TypeError(f"is not instanceof {Path} or {BinaryIO}; out: {out}")
+
+    xf: Any
+    with etree.xmlfile(str(out) if isinstance(out, Path) else out, encoding='utf-8') as xf:
+        xf.write_declaration()
+        xf.write_doctype(XHTML_DOCTYPE)
+        # N.B. the namespace is declared as a plain attribute, and all of the elements are unqualified; so it is
+        # declared once, on the root, rather than on every element that ``etree.xmlfile`` writes whole
+        with xf.element('html', {'xmlns': XHTML_NAMESPACE}):
+            xf.write('\n')
+            with xf.element('head'):
+                with xf.element('title'):
+                    xf.write(_xml_text(title))
+            xf.write('\n')
+            with xf.element('body'):
+                xf.write('\n')
+                writer: _TokenWriter = _TokenWriter(xf, breaks, reference_href)
+                writer.write_all(tokens)
+                writer.close_all()
+            xf.write('\n')
+
+
+def render_node(
+        node: RoamNode, graph: VertexMap, out: BinaryIO | Path, normalize_to_cm: bool = True,
+        config: ParserConfig = DEFAULT_PARSER_CONFIG, cache: Optional[TokenCache] = None,
+        reference_href: Optional[ReferenceHref] = None
+    ) -> None:
+    """
+    Renders the tree rooted at ``node`` as one XHTML chapter; see ``render_tokens``. The title is the page title (or
+    heading) of ``node``.
+
+    Args:
+        normalize_to_cm (bool): see ``iter_tokens``
+    """
+    if any(arg is None for arg in [node, graph, out]):
+        raise ValueError("missing required arg")
+    # N.B. log the uid, not the node; formatting a page formats all of its ``children``, which is O(page)
+    logger.log(TRACE, f"node.uid: {node.uid}, normalize_to_cm: {normalize_to_cm}")
+
+    title: str
+    match node.vertex_type:
+        case VertexType.ROAM_PAGE:
+            title = cast(PageNode, node).title.strip()
+        case VertexType.ROAM_BLOCK_HEADING:
+            title = cast(BlockHeadingNode, node).heading.strip()
+        case _:
+            title = node.uid
+    breaks: bool = bool(dict(config.options).get('breaks', False))
+    render_tokens(iter_tokens(node, graph, normalize_to_cm, config, cache), out, title, breaks, reference_href)
@@ -1,28 +1,108 @@
 """ functions to convert PageDump to a stream of markdown_it ``Token``s
  
 
-Types:
+Classes:
+
+    ParserConfig
 
 Functions:
 
+    get_parser(ParserConfig) -> MarkdownIt
+    tokenize_page_node(PageNode) -> list[Token]
+    tokenize_block_heading_node(BlockHeadingNode) -> list[Token]
+    tokenize_block_content_node(BlockContentNode, bool, ParserConfig, TokenCache) -> list[Token]
+    tokenize_block_content_nodes(Iterable[BlockContentNode], bool, ParserConfig, TokenCache) -> list[list[Token]]
+    iter_tokens(RoamNode, VertexMap, bool, ParserConfig, TokenCache) -> Iterator[Token]
+    tokenize_node(RoamNode, VertexMap, bool, ParserConfig, TokenCache, Executor, int) -> list[Token]
+    tokenize_node_to_buffer(RoamNode, VertexMap, bool, ParserConfig, TokenCache) -> TokenBuffer
+
 """
 import logging
-from typing import cast
-from functools import reduce
+import os
+import re
+import threading
+from concurrent.futures import Executor
+from itertools import chain, repeat
+from typing import Any, Optional, Callable, Iterable, Iterator, Sequence, NamedTuple, Final, cast
 
+import markdown_it
 from markdown_it import MarkdownIt
 from markdown_it.token import Token
 
 from common.log import TRACE
-from roampub.roam_model import VertexType, RoamNode, PageNode, BlockHeadingNode, BlockContentNode, VertexMap
-import roampub.commonmark_normalize as norm
+from roampub.roam_model import (
+    Uid, VertexType, RoamVertex, RoamNode, PageNode, BlockHeadingNode, BlockContentNode, VertexMap, ReferenceSpan,
+    is_vertex_map, iter_preorder
+)
+from roampub.token_buffer import TokenBuffer
+from roampub.token_cache import (
+    TokenCache, TokenCacheKey, EncodedToken, TOKENIZER_VERSION, token_cache_key, encode_tokens, decode_tokens
+)
+from roampub.roam_markdown import roam_plugin, reference_spans_env
+from roampub.block_budget import (
+    BlockBudget, BlockBudgetExceeded, DEFAULT_BLOCK_BUDGET, budget_plugin, budget_env, check_size
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+class ParserConfig(NamedTuple):
+    """
+    The args to ``MarkdownIt(preset, options)``, the plugins to ``use``, and the per-block budget (if any). Hashable 
+    (``options`` is a tuple of (name, value) pairs), so that it can key the parser cache; see ``get_parser``.
+    """
+    preset: str
+    options: tuple[tuple[str, Any], ...]
+    plugins: tuple[Callable[[MarkdownIt], None], ...] = ()
+    budget: Optional[BlockBudget] = None
+    """a block over budget is tokenized as literal text; see ``block_budget``"""
+
+
+    def create_parser(self) -> MarkdownIt:
+        parser: MarkdownIt = MarkdownIt(self.preset, dict(self.options))
+        for plugin in self.plugins:
+            parser.use(plugin)
+        if self.budget is not None:
+            parser.use(budget_plugin)
+        return parser
+
+
+DEFAULT_PARSER_CONFIG: Final[ParserConfig] = ParserConfig(
+    'commonmark', (('breaks', True), ('html', False), ('xhtmlOut', True)), budget=DEFAULT_BLOCK_BUDGET
+)
+
+
+# each thread gets its own parsers; ``MarkdownIt`` instances are configured once, but aren't designed to be shared
+_thread_local: threading.local = threading.local()
+
+
+def get_parser(config: ParserConfig = DEFAULT_PARSER_CONFIG) -> MarkdownIt:
+    """
+    Returns:
+        this thread's ``MarkdownIt`` for ``config``; created on first use, and then reused, since building the rule 
+        chains costs far more than parsing a typical block
+    """
+    if any(arg is None for arg in [config]):
+        raise ValueError("missing required arg")
+    if not isinstance(config, ParserConfig):
+        raise TypeError(f"is not instanceof {ParserConfig}; config: {config}")
+
+    parsers: Optional[dict[ParserConfig, MarkdownIt]] = getattr(_thread_local, 'parsers', None)
+    if parsers is None:
+        parsers = {}
+        _thread_local.parsers = parsers
+
+    parser: Optional[MarkdownIt] = parsers.get(config)
+    if parser is None:
+        logger.debug(f"creating parser; config: {config}")
+        parser = config.create_parser()
+        parsers[config] = parser
+    return parser
+
+
 def tokenize_page_node(node: PageNode) -> list[Token]:
-    logger.log(TRACE, f"node: {node}")
+    logger.log(TRACE, f"node.uid: {node.uid}")
     
     content: str = node.title.strip()
     tokens: list[Token] = [
@@ -36,7 +116,7 @@ def tokenize_page_node(node: PageNode) -> list[Token]:
 
 
 def tokenize_block_heading_node(node: BlockHeadingNode) -> list[Token]:
-    logger.log(TRACE, f"node: {node}")
+    logger.log(TRACE, f"node.uid: {node.uid}")
     
     tag: str = f"h{node.level}"
     markup: str = '#'*node.level
@@ -52,48 +132,307 @@ def tokenize_block_heading_node(node: BlockHeadingNode) -> list[Token]:
     return tokens
 
 
-def tokenize_block_content_node(node: BlockContentNode, normalize_to_cm: bool = False) -> list[Token]:
-    logger.log(TRACE, f"node: {node}, normalize_to_cm: {normalize_to_cm}")
-    
-    block_content: str = norm.normalize_block_content(node.content) if normalize_to_cm else node.content
-    parser: MarkdownIt = MarkdownIt('commonmark' ,{'breaks':True,'html':False,'xhtmlOut': True})
-    return parser.parse(block_content)
+# a single line, starting with a letter, that contains none of markdown-it's inline "terminator" chars (nor tabs, nor
+# trailing whitespace); so no block rule but ``paragraph``, and no inline rule but ``text``, can match any part of it
+PLAIN_BLOCK_PATTERN: Final[re.Pattern] = re.compile(r"[^\W\d_](?:[^\s\0!#$%&*+\-:<=@\[\\\]^_`{}~]| )*(?<! )")
+
+# the plain-text shortcut only holds for parsers whose rule chains are (a subset of) these; e.g. not with linkify, or
+# typographer replacements
+_PLAIN_SAFE_CORE_RULES: Final[frozenset[str]] = frozenset((
+    'normalize', 'block', 'inline', 'roam_references', 'text_join'
+))
+_PLAIN_SAFE_INLINE_RULES: Final[frozenset[str]] = frozenset((
+    'inline_budget', 'delimiter_budget', 'roam_italic', 'text', 'newline', 'escape', 'backticks', 'strikethrough', 
+    'emphasis', 'link', 'image', 'autolink', 'html_inline', 'entity', 'balance_pairs', 'text_collapse', 'fragments_join'
+))
+
+_plain_safe_configs: dict[ParserConfig, bool] = {}
 
 
-def tokenize_node(node: RoamNode, graph: VertexMap, normalize_to_cm: bool = False)-> list[Token]:
+def _is_plain_safe(config: ParserConfig) -> bool:
+    is_plain_safe: Optional[bool] = _plain_safe_configs.get(config)
+    if is_plain_safe is None:
+        parser: MarkdownIt = get_parser(config)
+        is_plain_safe = (
+            set(parser.core.ruler.get_active_rules()) <= _PLAIN_SAFE_CORE_RULES 
+            and set(parser.inline.ruler.get_active_rules()) <= _PLAIN_SAFE_INLINE_RULES
+            and set(parser.inline.ruler2.get_active_rules()) <= _PLAIN_SAFE_INLINE_RULES
+        )
+        _plain_safe_configs[config] = is_plain_safe
+    return is_plain_safe
+
+
+def _plain_paragraph_tokens(content: str) -> list[Token]:
+    """
+    exactly the tokens that ``MarkdownIt.parse`` produces for ``content``, if it matches ``PLAIN_BLOCK_PATTERN``; 
+    otherwise, ``content`` as literal text
+    """
+    line_count: int = content.count('\n') + 1
+    return [
+        Token(type='paragraph_open', tag='p', nesting=1, map=[0, line_count], level=0, block=True),
+        Token(type='inline', tag='', nesting=0, map=[0, line_count], level=1, content=content, block=True, children=[
+            Token(type='text', tag='', nesting=0, level=0, content=content)
+        ]),
+        Token(type='paragraph_close', tag='p', nesting=-1, level=0, block=True),
+    ]
+
+
+def _parse_block_content(
+        content: str, config: ParserConfig, reference_spans: Optional[Callable[[], Sequence[ReferenceSpan]]] = None
+    ) -> list[Token]:
+    """``reference_spans``: optional; ``content``'s cached spans, for ``roam_plugin``; see ``reference_spans_env``"""
+    # most Roam blocks are one line of plain text; building their tokens directly skips the parser's per-parse setup.
+    # (``PLAIN_BLOCK_PATTERN`` allows ``((``, which ``roam_references`` would split out)
+    if config.budget is not None:
+        check_size(content, config.budget)
+    if PLAIN_BLOCK_PATTERN.fullmatch(content) and '((' not in content and _is_plain_safe(config):
+        return _plain_paragraph_tokens(content)
+    env: dict[str, Any] = {} if config.budget is None else budget_env(config.budget)
+    if reference_spans is not None and roam_plugin in config.plugins:
+        env.update(reference_spans_env(content, reference_spans))
+    return get_parser(config).parse(content, env)
+
+
+def _report_over_budget(uid: Optional[Uid], error: BlockBudgetExceeded) -> None:
+    logger.warning(f"block over budget; tokenized as literal text; uid: {uid}, budget: {error}")
+
+
+def _roam_config(normalize_to_cm: bool, config: ParserConfig) -> ParserConfig:
+    """``config``, plus ``roam_plugin`` if ``normalize_to_cm``; which parses the Roam syntax in the one pass"""
+    if not normalize_to_cm or roam_plugin in config.plugins:
+        return config
+    return config._replace(plugins=config.plugins + (roam_plugin,))
+
+
+def _token_cache_options(normalize_to_cm: bool, config: ParserConfig) -> str:
+    """everything, besides the content, that determines a ``BlockContentNode``'s tokens; see ``token_cache_key``"""
+    # plugins by name; a function's repr includes its (per-process) address
+    plugin_names: tuple[str, ...] = tuple(
+        f"{plugin.__module__}.{plugin.__qualname__}" for plugin in _roam_config(normalize_to_cm, config).plugins
+    )
+    return repr((TOKENIZER_VERSION, markdown_it.__version__, config.preset, config.options, plugin_names))
+
+
+def tokenize_block_content_node(
+        node: BlockContentNode, normalize_to_cm: bool = False, config: ParserConfig = DEFAULT_PARSER_CONFIG,
+        cache: Optional[TokenCache] = None
+    ) -> list[Token]:
     """
     Args:
-        normalize_to_cm (bool): The input MarkDown, contained in the tree of `RoamNode`s rooted in `node`, will
-        first be normalized from RoamPub flavor of Markdown to CommonMark, using the `Rule`s in 
-        `commonmark_normalize.py`, before being tokenized.
+        cache (TokenCache): if given, the tokens are looked up there (by content), and only parsed on a miss
 
+    Returns:
+        if ``node`` is over ``config.budget``, one paragraph of its content as literal text; which isn't cached
     """
-    logger.log(TRACE, f"node: {node}, normalize_to_cm: {normalize_to_cm}")
-    if any(arg is None for arg in [node, graph]):
+    logger.log(TRACE, f"node.uid: {node.uid}, normalize_to_cm: {normalize_to_cm}")
+    return _tokenize_content(node.content, normalize_to_cm, config, cache, node.uid, node.reference_spans)
+
+
+def _tokenize_content(
+        content: str, normalize_to_cm: bool, config: ParserConfig, cache: Optional[TokenCache], uid: Optional[Uid],
+        reference_spans: Optional[Callable[[], Sequence[ReferenceSpan]]] = None
+    ) -> list[Token]:
+    key: Optional[TokenCacheKey] = None
+    if cache is not None:
+        key = token_cache_key(content, _token_cache_options(normalize_to_cm, config))
+        cached_tokens: Optional[list[Token]] = cache.get(key)
+        if cached_tokens is not None:
+            return cached_tokens
+
+    try:
+        tokens: list[Token] = _parse_block_content(content, _roam_config(normalize_to_cm, config), reference_spans)
+    except BlockBudgetExceeded as e:
+        _report_over_budget(uid, e)
+        return _plain_paragraph_tokens(content)
+    if cache is not None:
+        cache.put(cast(TokenCacheKey, key), tokens)
+    return tokens
+
+
+def _copy_tokens(tokens: list[Token]) -> list[Token]:
+    return [Token.from_dict(token.as_dict()) for token in tokens]
+
+
+def tokenize_block_content_nodes(
+        nodes: Iterable[BlockContentNode], normalize_to_cm: bool = False, 
+        config: ParserConfig = DEFAULT_PARSER_CONFIG, cache: Optional[TokenCache] = None
+    ) -> list[list[Token]]:
+    """
+    Batch form of ``tokenize_block_content_node``. markdown-it can't parse several documents in one call, and joining
+    blocks with a delimiter isn't safe in CommonMark (lazy continuation lines, document-wide link reference 
+    definitions, unclosed fences all leak across it); so instead, each distinct content in the batch is tokenized 
+    once, and repeats get copies.
+
+    Returns:
+        one token list per node, in order; each identical to ``tokenize_block_content_node``'s, and not shared with 
+        any other
+    """
+    if any(arg is None for arg in [nodes]):
         raise ValueError("missing required arg")
-    if not isinstance(node, RoamNode):
-        raise TypeError(f"is not instanceof {RoamNode}; node: {node}")
-    if not isinstance(graph, VertexMap.__origin__):  # type: ignore
-        raise TypeError(f"is not instanceof {VertexMap}; node: {graph}")
     
-    node_tokens: list[Token]
+    tokens_by_content: dict[str, list[Token]] = {}
+    node_tokens: list[list[Token]] = []
+    for node in nodes:
+        if not isinstance(node, BlockContentNode):
+            raise TypeError(f"is not instanceof {BlockContentNode}; node: {node}")
+        tokens: Optional[list[Token]] = tokens_by_content.get(node.content)
+        if tokens is None:
+            # N.B. not via ``tokenize_block_content_node``, whose per-node (repr) logging can cost more than the parse 
+            tokens = _tokenize_content(node.content, normalize_to_cm, config, cache, node.uid, node.reference_spans)
+            tokens_by_content[node.content] = tokens
+            node_tokens.append(tokens)
+        else:
+            node_tokens.append(_copy_tokens(tokens))
+    logger.log(TRACE, f"len(node_tokens): {len(node_tokens)}, len(tokens_by_content): {len(tokens_by_content)}")
+    return node_tokens
+
+
+def _tokenize_single_node(
+        node: RoamVertex, normalize_to_cm: bool, config: ParserConfig, cache: Optional[TokenCache]
+    ) -> list[Token]:
+    """the tokens of ``node`` itself, without its children"""
     match node.vertex_type:
         case VertexType.ROAM_PAGE:
-            node_tokens = tokenize_page_node(cast(PageNode, node))
+            return tokenize_page_node(cast(PageNode, node))
         case VertexType.ROAM_BLOCK_HEADING:
-            node_tokens = tokenize_block_heading_node(cast(BlockHeadingNode, node))
+            return tokenize_block_heading_node(cast(BlockHeadingNode, node))
         case VertexType.ROAM_BLOCK_CONTENT:
-            node_tokens = tokenize_block_content_node(cast(BlockContentNode, node), normalize_to_cm)
+            return tokenize_block_content_node(cast(BlockContentNode, node), normalize_to_cm, config, cache)
         case _:
             raise ValueError(f"unrecognized vertex_type: {node.vertex_type}")
 
-    if not node.children:
-        return node_tokens
+
+def iter_tokens(
+        node: RoamNode, graph: VertexMap, normalize_to_cm: bool = False, 
+        config: ParserConfig = DEFAULT_PARSER_CONFIG, cache: Optional[TokenCache] = None
+    ) -> Iterator[Token]:
+    """
+    Each node's tokens are followed by its children's (pre-order). Lazy: a node is only tokenized when the consumer 
+    reaches its tokens, so only one node's tokens are held at a time. Iterative (see ``iter_preorder``), so deeply 
+    nested outlines don't hit the recursion limit.
+
+    Args:
+        normalize_to_cm (bool): The input MarkDown, contained in the tree of `RoamNode`s rooted in `node`, is 
+        RoamPub flavor of Markdown; its Roam syntax is tokenized as CommonMark (as with the `Rule`s in 
+        `commonmark_normalize.py`), by `roam_markdown.roam_plugin`.
+        config (ParserConfig): the ``MarkdownIt`` preset and options for ``BlockContentNode``s
+        cache (TokenCache): if given, ``BlockContentNode`` tokens are looked up there; see 
+        ``tokenize_block_content_node``
+
+    Raises:
+        KeyError: (lazily) if a ``children`` ``Uid`` is not in ``graph``
+    """
+    if any(arg is None for arg in [node, graph]):
+        raise ValueError("missing required arg")
+    # N.B. log the uid, not the node; formatting a page formats all of its ``children``, which is O(page)
+    logger.log(TRACE, f"node.uid: {node.uid}, normalize_to_cm: {normalize_to_cm}")
+    if not isinstance(node, RoamNode):
+        raise TypeError(f"is not instanceof {RoamNode}; node: {node}")
+    if not is_vertex_map(graph):
+        raise TypeError(f"is not instanceof {VertexMap}; node: {graph}")
     
-    children_tokens: list[list[Token]] = (
-        [tokenize_node(cast(RoamNode, graph[c_uid]), graph, normalize_to_cm) for c_uid in node.children]
+    return chain.from_iterable(
+        _tokenize_single_node(tree_node, normalize_to_cm, config, cache) 
+        for tree_node, _ in iter_preorder(node, graph)
     )
-    logger.log(TRACE, f"children_tokens: {children_tokens}")
-    children_flat_tokens: list[Token] = list(reduce(lambda accum, iter_val: accum + iter_val, children_tokens, [])) 
-    logger.log(TRACE, f"children_flat_tokens: {children_flat_tokens}")
-    return node_tokens if not children_flat_tokens else (node_tokens + children_flat_tokens)
\ No newline at end of file
+
+
+def tokenize_node(
+        node: RoamNode, graph: VertexMap, normalize_to_cm: bool = False, 
+        config: ParserConfig = DEFAULT_PARSER_CONFIG, cache: Optional[TokenCache] = None, 
+        executor: Optional[Executor] = None, shard_count: Optional[int] = None
+    )-> list[Token]:
+    """
+    Args:
+        executor (Executor): if given, the ``BlockContentNode``s (that miss ``cache``) are split into ``shard_count``
+            contiguous shards, which ``executor`` (e.g. a ``ProcessPoolExecutor``) tokenizes in parallel. Only the 
+            contents are sent to the workers, and the tokens come back compactly encoded (in the same format as 
+            ``TokenCache`` entries; see ``token_cache.encode_tokens``); they are decoded, and reassembled in document 
+            order, here.
+        shard_count (int): defaults to ``os.cpu_count()``
+
+    Returns:
+        all of the tokens of ``iter_tokens``, as a list; e.g. for ``MDRenderer.render``
+    """
+    if executor is None:
+        return list(iter_tokens(node, graph, normalize_to_cm, config, cache))
+    
+    shard_count = shard_count if shard_count is not None else (os.cpu_count() or 1)
+    if shard_count < 1:
+        raise ValueError(f"shard_count must be >= 1; shard_count: {shard_count}")
+
+    tree_nodes: list[RoamNode] = [tree_node for tree_node, _ in iter_preorder(node, graph)]
+    node_tokens: list[list[Token]] = [[] for _ in tree_nodes]
+    # the blocks that the workers must tokenize, as parallel lists
+    pending_indexes: list[int] = []
+    pending_contents: list[str] = []
+    pending_keys: list[TokenCacheKey] = []
+    cache_options: str = _token_cache_options(normalize_to_cm, config)
+    for index, tree_node in enumerate(tree_nodes):
+        if tree_node.vertex_type is not VertexType.ROAM_BLOCK_CONTENT:
+            node_tokens[index] = _tokenize_single_node(tree_node, normalize_to_cm, config, None)
+            continue
+        content: str = cast(BlockContentNode, tree_node).content
+        if cache is not None:
+            key: TokenCacheKey = token_cache_key(content, cache_options)
+            cached_tokens: Optional[list[Token]] = cache.get(key)
+            if cached_tokens is not None:
+                node_tokens[index] = cached_tokens
+                continue
+            pending_keys.append(key)
+        pending_indexes.append(index)
+        pending_contents.append(content)
+
+    shard_size: int = max(1, -(-len(pending_contents) // shard_count))
+    logger.debug(f"len(tree_nodes): {len(tree_nodes)}, len(pending_contents): {len(pending_contents)}, "
+                 f"shard_count: {shard_count}, shard_size: {shard_size}")
+    shards: list[list[str]] = [
+        pending_contents[start:start + shard_size] for start in range(0, len(pending_contents), shard_size)
+    ]
+    encoded_shards: Iterator[list[list[EncodedToken] | BlockBudgetExceeded]] = executor.map(
+        _tokenize_shard, shards, repeat(normalize_to_cm), repeat(config)
+    )
+    for pending_index, encoded_tokens in enumerate(chain.from_iterable(encoded_shards)):
+        if isinstance(encoded_tokens, BlockBudgetExceeded):
+            pending_node: RoamNode = tree_nodes[pending_indexes[pending_index]]
+            _report_over_budget(pending_node.uid, encoded_tokens)
+            node_tokens[pending_indexes[pending_index]] = _plain_paragraph_tokens(pending_contents[pending_index])
+            continue
+        tokens: list[Token] = decode_tokens(encoded_tokens)
+        node_tokens[pending_indexes[pending_index]] = tokens
+        if cache is not None:
+            cache.put(pending_keys[pending_index], tokens)
+
+    return list(chain.from_iterable(node_tokens))
+
+
+def tokenize_node_to_buffer(
+        node: RoamNode, graph: VertexMap, normalize_to_cm: bool = False, 
+        config: ParserConfig = DEFAULT_PARSER_CONFIG, cache: Optional[TokenCache] = None
+    ) -> TokenBuffer:
+    """
+    Returns:
+        the tokens of ``iter_tokens``, streamed into a ``TokenBuffer``; so the full stream is never held as ``Token``s
+    """
+    return TokenBuffer(iter_tokens(node, graph, normalize_to_cm, config, cache))
+
+
+def _tokenize_shard(
+        contents: list[str], normalize_to_cm: bool, config: ParserConfig
+    ) -> list[list[EncodedToken] | BlockBudgetExceeded]:
+    """
+    runs in a worker; repeated contents share one encoding, which pickle then sends only once. A content over 
+    ``config.budget`` gets the ``BlockBudgetExceeded`` instead; the caller, which knows the uids, reports it.
+    """
+    encoded_by_content: dict[str, list[EncodedToken] | BlockBudgetExceeded] = {}
+    shard_tokens: list[list[EncodedToken] | BlockBudgetExceeded] = []
+    for content in contents:
+        encoded_tokens: Optional[list[EncodedToken] | BlockBudgetExceeded] = encoded_by_content.get(content)
+        if encoded_tokens is None:
+            try:
+                encoded_tokens = encode_tokens(_parse_block_content(content, _roam_config(normalize_to_cm, config)))
+            except BlockBudgetExceeded as e:
+                encoded_tokens = e
+            encoded_by_content[content] = encoded_tokens
+        shard_tokens.append(encoded_tokens)
+    return shard_tokens
@@ -0,0 +1,230 @@
+""" markdown-it plugin for RoamPub flavored MarkDown; recognizes, while parsing, the Roam syntax that
+``commonmark_normalize`` rewrites to CommonMark before parsing
+
+- ``__italic__`` is emphasis (``em``, with ``*`` markup, as ``commonmark_normalize.ITALICS_RULE`` rewrites it)
+- ``[[uid]]``, ``((uid))`` and ``<<uid>>`` are split out of the surrounding text into ``text`` tokens of their own,
+  whose ``meta`` holds the ``ReferenceKind`` (``REFERENCE_KIND_META``) and ``Uid`` (``REFERENCE_UID_META``); so any
+  renderer that doesn't know about references renders them, unchanged, as text. A text token that is the whole of a
+  ``BlockContentNode``'s content reuses the node's cached ``reference_spans()``, when passed in ``env`` (see 
+  ``reference_spans_env``), rather than rescanning it
+- a block that starts with ``>`` is one block quote, spanning all of its paragraphs (as with
+  ``commonmark_normalize.BLOCK_QUOTE_RULE``)
+
+Functions:
+
+    reference_spans_env(str, Callable[[], Sequence[ReferenceSpan]]) -> dict[str, Any]
+    roam_plugin(MarkdownIt) -> None
+
+"""
+from typing import Any, Optional, Callable, Sequence, Final, Iterator
+import logging
+
+from markdown_it import MarkdownIt
+from markdown_it.common.utils import isWhiteSpace, isPunctChar, isMdAsciiPunct
+from markdown_it.rules_block import StateBlock
+from markdown_it.rules_core import StateCore
+from markdown_it.rules_inline import StateInline
+from markdown_it.token import Token
+
+from common.log import TRACE
+from roampub.roam_model import ReferenceSpan, scan_references
+from roampub.commonmark_normalize import ROAM_ITALIC_PATTERN
+
+logger = logging.getLogger(__name__)
+
+
+REFERENCE_KIND_META: Final[str] = 'reference_kind'
+REFERENCE_UID_META: Final[str] = 'reference_uid'
+
+REFERENCE_SPANS_ENV_KEY: Final[str] = 'roam_reference_spans'
+
+_REFERENCE_OPENERS: Final[tuple[str, ...]] = ('[[', '((', '<<')
+
+
+def _is_punct(code: int) -> bool:
+    return isMdAsciiPunct(code) or isPunctChar(chr(code))
+
+
+def _roam_italic(state: StateInline, silent: bool) -> bool:
+    start: int = state.pos
+    if not state.src.startswith('__', start):
+        return False
+    match = ROAM_ITALIC_PATTERN.match(state.src, start, state.posMax)
+    if match is None:
+        return False
+    end: int = match.end()
+
+    # only where the ``*`` that ``ITALICS_RULE`` would rewrite ``__`` to could open, and close, emphasis; see
+    # ``StateInline.scanDelims``
+    before: int = ord(state.src[start - 1]) if start > 0 else 0x20
+    first: int = ord(state.src[start + 2])
+    last: int = ord(state.src[end - 3])
+    after: int = ord(state.src[end]) if end < state.posMax else 0x20
+    can_open: bool = not isWhiteSpace(first) and (not _is_punct(first) or isWhiteSpace(before) or _is_punct(before))
+    can_close: bool = not isWhiteSpace(last) and (not _is_punct(last) or isWhiteSpace(after) or _is_punct(after))
+    if not (can_open and can_close):
+        return False
+
+    if not silent:
+        old_pos_max: int = state.posMax
+        state.pos = start + 2
+        state.posMax = end - 2
+        token: Token = state.push('em_open', 'em', 1)
+        token.markup = '*'
+        state.md.inline.tokenize(state)
+        token = state.push('em_close', 'em', -1)
+        token.markup = '*'
+        state.posMax = old_pos_max
+    state.pos = end
+    return True
+
+
+def reference_spans_env(content: str, reference_spans: Callable[[], Sequence[ReferenceSpan]]) -> dict[str, Any]:
+    """
+    the ``env`` entry for one ``MarkdownIt.parse`` of ``content``, by a parser that uses ``roam_plugin``; 
+    ``reference_spans`` (e.g. ``BlockContentNode.reference_spans``) must return ``scan_references(content)``, and is 
+    only called if a ``text`` token is all of ``content``
+    """
+    if any(arg is None for arg in [content, reference_spans]):
+        raise ValueError("missing required arg")
+
+    return {REFERENCE_SPANS_ENV_KEY: (content, reference_spans)}
+
+
+def _split_references(token: Token, spans: Sequence[ReferenceSpan]) -> Iterator[Token]:
+    """
+    ``token`` (a ``text`` token), as alternating text and reference tokens, given the ``spans`` of its content; the 
+    outermost of nested references wins
+    """
+    text_start: int = 0
+    span: ReferenceSpan
+    for span in spans:
+        if span.start < text_start:
+            continue
+        if span.start > text_start:
+            yield Token('text', '', 0, level=token.level, content=token.content[text_start:span.start])
+        yield Token(
+            'text', '', 0, level=token.level, content=token.content[span.start:span.end],
+            meta={REFERENCE_KIND_META: span.kind, REFERENCE_UID_META: span.uid}
+        )
+        text_start = span.end
+    if text_start < len(token.content):
+        yield Token('text', '', 0, level=token.level, content=token.content[text_start:])
+
+
+def _roam_references(state: StateCore) -> None:
+    known_spans: Optional[tuple[str, Callable[[], Sequence[ReferenceSpan]]]] = (
+        state.env.get(REFERENCE_SPANS_ENV_KEY) if isinstance(state.env, dict) else None
+    )
+    for block_token in state.tokens:
+        if block_token.type != 'inline' or not block_token.children:
+            continue
+        if not any(opener in block_token.content for opener in _REFERENCE_OPENERS):
+            continue
+        children: list[Token] = []
+        for child in block_token.children:
+            if child.type == 'text' and any(opener in child.content for opener in _REFERENCE_OPENERS):
+                spans: Sequence[ReferenceSpan] = (
+                    known_spans[1]() if known_spans is not None and child.content == known_spans[0] 
+                    else scan_references(child.content)
+                )
+                children.extend(_split_references(child, spans))
+            else:
+                children.append(child)
+        block_token.children = children
+
+
+_LineMarks = tuple[int, int, int, int]
+
+
+def _strip_marker(state: StateBlock, line: int) -> _LineMarks:
+    """
+    Skips the ``>`` that ``line`` starts with, and one optional space (or a tab's worth of it); as ``blockquote`` does
+    for each line. Returns the line's old marks, to be restored.
+    """
+    old_line_marks: _LineMarks = (state.bMarks[line], state.tShift[line], state.sCount[line], state.bsCount[line])
+    pos: int = state.bMarks[line] + state.tShift[line] + 1
+    line_end: int = state.eMarks[line]
+    initial: int = state.sCount[line] + 1
+    offset: int = initial
+    adjust_tab: bool = False
+    space_after_marker: bool = False
+    if pos < line_end and state.src[pos] == ' ':
+        pos += 1
+        initial += 1
+        offset += 1
+        space_after_marker = True
+    elif pos < line_end and state.src[pos] == '\t':
+        space_after_marker = True
+        if (state.bsCount[line] + offset) % 4 == 3:
+            pos += 1
+            initial += 1
+            offset += 1
+        else:
+            adjust_tab = True
+
+    state.bMarks[line] = pos
+    while pos < line_end and state.src[pos] in ' \t':
+        if state.src[pos] == '\t':
+            offset += 4 - (offset + state.bsCount[line] + (1 if adjust_tab else 0)) % 4
+        else:
+            offset += 1
+        pos += 1
+    state.bsCount[line] = state.sCount[line] + 1 + (1 if space_after_marker else 0)
+    state.sCount[line] = offset - initial
+    state.tShift[line] = pos - state.bMarks[line]
+    return old_line_marks
+
+
+def _starts_with_marker(state: StateBlock, line: int) -> bool:
+    # N.B. however indented; as ``blockquote`` does for the lines after the first
+    pos: int = state.bMarks[line] + state.tShift[line]
+    return pos < state.eMarks[line] and state.src[pos] == '>'
+
+
+def _roam_blockquote(state: StateBlock, startLine: int, endLine: int, silent: bool) -> bool:
+    # only a whole block, whose first line starts (unindented) with ``>``; anything else is left to ``blockquote``
+    if startLine != 0 or state.parentType != 'root' or state.sCount[startLine] != 0:
+        return False
+    if not _starts_with_marker(state, startLine):
+        return False
+    if silent:
+        return True
+    logger.log(TRACE, f"startLine: {startLine}, endLine: {endLine}")
+
+    # the ``>`` of every line that has one is skipped; the lines that don't (e.g. after a blank line) are in the quote
+    # too, rather than lazy continuations, or the end of it
+    old_line_marks: dict[int, _LineMarks] = {
+        line: _strip_marker(state, line) for line in range(startLine, endLine) if _starts_with_marker(state, line)
+    }
+
+    old_parent_type: str = state.parentType
+    state.parentType = 'blockquote'
+    open_token: Token = state.push('blockquote_open', 'blockquote', 1)
+    open_token.markup = '>'
+    open_token.map = [startLine, endLine]
+    # every line of the block, blank or not, is in the quote; but not the trailing blank lines (they add nothing),
+    # as a last line that is blank only once its marker is skipped starts at ``len(src)``, and so (in markdown-it's own
+    # ``blockquote`` too) breaks the terminator rules that read the char at the start of a line
+    content_end: int = endLine
+    while content_end > startLine + 1 and state.isEmpty(content_end - 1):
+        content_end -= 1
+    old_line_max: int = state.lineMax
+    state.lineMax = content_end
+    state.md.block.tokenize(state, startLine, content_end)
+    close_token: Token = state.push('blockquote_close', 'blockquote', -1)
+    close_token.markup = '>'
+
+    state.lineMax = old_line_max
+    state.parentType = old_parent_type
+    for line, line_marks in old_line_marks.items():
+        (state.bMarks[line], state.tShift[line], state.sCount[line], state.bsCount[line]) = line_marks
+    state.line = endLine
+    return True
+
+
+def roam_plugin(md: MarkdownIt) -> None:
+    """use: ``MarkdownIt(...).use(roam_plugin)``"""
+    md.block.ruler.before('blockquote', 'roam_blockquote', _roam_blockquote)
+    md.inline.ruler.before('emphasis', 'roam_italic', _roam_italic)
+    md.core.ruler.after('inline', 'roam_references', _roam_references)
@@ -4,15 +4,19 @@ Types:
 
     Uid
     VertexMap
+    VertexMapping
     ValidationFailure
     ValidationResult
     Validation
+    FusedValidation
 
     
 Enums:
 
     VertexType
     MediaType
+    ReferenceKind
+    TraversalEvent
 
     
 Classes:
@@ -23,20 +27,37 @@ Classes:
     BlockHeadingNode
     BlockContentNode
     FileVertex
+    LinkIndex
+    ValidationFacts
     ValidationRule
+    IncrementalValidator
+    ReferenceSpan
+    TraversalStep
 
     
 Functions:
 
-    validate(VertexMap) -> ValidationResult
+    is_vertex_map(Any) -> bool
+    walk(RoamNode, VertexMap) -> Iterator[TraversalStep]
+    iter_preorder(RoamNode, VertexMap) -> Iterator[tuple[RoamNode, int]]
+    iter_postorder(RoamNode, VertexMap) -> Iterator[tuple[RoamNode, int]]
+    iter_links(str, VertexMap) -> Iterator[tuple[Uid, Uid]]
+    iter_linked_uids(str, VertexMap) -> Iterator[Uid]
+    all_linked_uids(str, VertexMap) -> list[Uid]
+    scan_references(str) -> list[ReferenceSpan]
+    validate(VertexMap, Optional[int]) -> ValidationResult
 
 """
 
-from typing import TypeAlias, Any, Optional, Callable, Iterable, Final, NamedTuple, DefaultDict, cast
+from typing import TypeAlias, Any, Optional, Callable, Iterable, Iterator, Final, NamedTuple, DefaultDict, cast
 from abc import ABC, abstractmethod
 from enum import StrEnum, unique
-from collections import OrderedDict, Counter, defaultdict
-from functools import reduce, partial
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import re
 import logging
 
 from common.types import Url
@@ -138,17 +159,36 @@ class RoamVertex(ABC):
 VertexMap: TypeAlias = OrderedDict[Uid, RoamVertex]
 """
 The ``VertexMap`` preserves the item order from the PageDump.json file.
+
+Functions that only read a graph also accept a ``VertexMapping`` (e.g. ``vertex_store.VertexStore``) in place of a 
+``VertexMap``; see ``is_vertex_map``.
 """
 
+
+class VertexMapping(Mapping[Uid, RoamVertex]):
+    """
+    Base for read-only, alternative backings of a ``VertexMap``. Subclasses must iterate in PageDump.json order.
+    """
+    pass
+
+
+def is_vertex_map(graph: Any) -> bool:
+    """``True`` for a ``VertexMap`` (``OrderedDict``) or a ``VertexMapping``; ``False`` for e.g. a plain ``dict``"""
+    return isinstance(graph, (VertexMap.__origin__, VertexMapping))  # type: ignore
+
 VertexTypeMap: TypeAlias = dict[VertexType, list[RoamVertex]]
 
 
+# the default ``children``/``references`` (empty, rather than ``None``); never stored, each node gets a new list
+_NO_LINKS: Final[list[Uid]] = []
+
+
 class RoamNode(RoamVertex):
 
-    def __init__(self: Any, uid: Uid, media_type: MediaType, children: Optional[list[Uid]] =[], 
-                 references: Optional[list[Uid]] =[]): 
-        self._children= children
-        self._references= references
+    def __init__(self: Any, uid: Uid, media_type: MediaType, children: Optional[list[Uid]] = _NO_LINKS, 
+                 references: Optional[list[Uid]] = _NO_LINKS): 
+        self._children= [] if children is _NO_LINKS else children
+        self._references= [] if references is _NO_LINKS else references
         super().__init__(uid, media_type)
 
     @property
@@ -164,8 +204,8 @@ class RoamNode(RoamVertex):
 
 class PageNode(RoamNode):
 
-    def __init__(self: Any, uid: Uid, media_type: MediaType, title: str, children: Optional[list[Uid]] =[], 
-                 references: Optional[list[Uid]] =[]): 
+    def __init__(self: Any, uid: Uid, media_type: MediaType, title: str, children: Optional[list[Uid]] = _NO_LINKS, 
+                 references: Optional[list[Uid]] = _NO_LINKS): 
         if any(arg is None for arg in (title)):
             raise ValueError("missing required arg")
 
@@ -185,7 +225,7 @@ class PageNode(RoamNode):
 class BlockHeadingNode(RoamNode):
 
     def __init__(self: Any, uid: Uid, media_type: MediaType, heading: str, level: int, 
-                 children: Optional[list[Uid]] =[], references: Optional[list[Uid]] =[]): 
+                 children: Optional[list[Uid]] = _NO_LINKS, references: Optional[list[Uid]] = _NO_LINKS): 
         if any(arg is None for arg in (heading, level)):
             raise ValueError("missing required arg")
 
@@ -207,15 +247,39 @@ class BlockHeadingNode(RoamNode):
 
 
 class BlockContentNode(RoamNode):
+    # (content, spans) as of the last ``reference_spans()``; a class default, so that subclasses get it too
+    _reference_spans_cache: Optional[tuple[str, tuple['ReferenceSpan', ...]]] = None
 
-    def __init__(self: Any, uid: Uid, media_type: MediaType, content: str, children: Optional[list[Uid]] =[], 
-                 references: Optional[list[Uid]] =[]): 
+    def __init__(self: Any, uid: Uid, media_type: MediaType, content: str, children: Optional[list[Uid]] = _NO_LINKS, 
+                 references: Optional[list[Uid]] = _NO_LINKS): 
         self._content = content
         super().__init__(uid, media_type, children, references)
 
     @property
     def content(self) -> str:
         return self._content
+
+
+    def reference_spans(self) -> tuple['ReferenceSpan', ...]:
+        """
+        The references (``[[uid]]``, ``((uid))``, ``<<uid>>``) in ``content``, with their offsets; see 
+        ``scan_references``. Computed on first call, and cached until ``content`` changes.
+        """
+        content: str = self.content
+        cached: Optional[tuple[str, tuple[ReferenceSpan, ...]]] = self._reference_spans_cache
+        if cached is not None and cached[0] is content:
+            return cached[1]
+
+        spans: tuple[ReferenceSpan, ...] = tuple(scan_references(content))
+        self._reference_spans_cache = (content, spans)
+        return spans
+
+
+    def __getstate__(self):
+        # the spans are cheap to recompute; don't pickle them (e.g. into ``vertex_map_cache`` sidecars)
+        state: dict[str, Any] = self.__dict__.copy()
+        state.pop('_reference_spans_cache', None)
+        return state
     
 
     @property
@@ -246,27 +310,132 @@ class FileVertex(RoamVertex):
         return VertexType.ROAM_FILE
 
 
-def all_linked_uids(link_name: str, graph: VertexMap) -> list[Uid]:
+@unique
+class TraversalEvent(StrEnum):
+    ENTER = 'enter'
+    EXIT = 'exit'
+
+    def __str__(self):
+        return f"{self.__class__.__name__}.{self._name_}"
+
+
+class TraversalStep(NamedTuple):
+    event: TraversalEvent
+    node: RoamVertex
+    """a ``RoamNode``; or, in an invalid graph, whatever vertex appears in a ``children`` list"""
+    depth: int
+    """0 for the node that the walk started from"""
+
+
+def walk(node: RoamNode, graph: VertexMap) -> Iterator[TraversalStep]:
+    """
+    Depth-first walk of the tree rooted at ``node``, following ``children`` in order. Each node is ENTERed before, and
+    EXITed after, all of its descendants. Uses an explicit stack, so the depth of the tree is not limited by the 
+    interpreter's recursion limit.
+
+    Raises:
+        KeyError: (lazily) if a ``children`` ``Uid`` is not in ``graph``
+        ValueError: (lazily) if a node is its own descendant
+    """
+    if any(arg is None for arg in [node, graph]):
+        raise ValueError("missing required arg")
+    if not isinstance(node, RoamNode):
+        raise TypeError(f"is not instanceof {RoamNode}; node: {node}")
+    if not is_vertex_map(graph):
+        raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+
+    return _walk(node, graph)
+
+
+def _walk(node: RoamNode, graph: VertexMap) -> Iterator[TraversalStep]:
+    yield TraversalStep(TraversalEvent.ENTER, node, 0)
+    # (node, iterator over its remaining children) for each node on the current path
+    stack: list[tuple[RoamVertex, Iterator[Uid]]] = [(node, iter(node.children or ()))]
+    on_path: set[Uid] = {node.uid}
+    while stack:
+        parent, children = stack[-1]
+        child_uid: Optional[Uid] = next(children, None)
+        if child_uid is None:
+            stack.pop()
+            on_path.discard(parent.uid)
+            yield TraversalStep(TraversalEvent.EXIT, parent, len(stack))
+            continue
+
+        if child_uid in on_path:
+            raise ValueError(f"cycle in ``children``; uid: {child_uid}")
+        child: RoamVertex = graph[child_uid]
+        yield TraversalStep(TraversalEvent.ENTER, child, len(stack))
+        stack.append((child, iter(getattr(child, 'children', None) or ())))
+        on_path.add(child_uid)
+
+
+def iter_preorder(node: RoamNode, graph: VertexMap) -> Iterator[tuple[RoamNode, int]]:
+    """
+    Returns:
+        (node, depth) for each node of the tree rooted at ``node``, parents before children; see ``walk``
+    """
+    return ((cast(RoamNode, step.node), step.depth) for step in walk(node, graph) if step.event is TraversalEvent.ENTER)
+
+
+def iter_postorder(node: RoamNode, graph: VertexMap) -> Iterator[tuple[RoamNode, int]]:
+    """
+    Returns:
+        (node, depth) for each node of the tree rooted at ``node``, children before parents; see ``walk``
+    """
+    return ((cast(RoamNode, step.node), step.depth) for step in walk(node, graph) if step.event is TraversalEvent.EXIT)
+
+
+def iter_links(link_name: str, graph: VertexMap) -> Iterator[tuple[Uid, Uid]]:
     """
     there are 2 kinds of ``link``s amongst RoamNodes: ``children`` and ``references``
+
+    Returns:
+        an iterator over every ``link_name`` edge in ``graph``, as (source ``Uid``, target ``Uid``), in graph order; 
+        each edge is visited once, with no intermediate lists
+    """
+    if any(arg is None for arg in (link_name, graph)):
+        raise ValueError("missing required arg")
+    if not is_vertex_map(graph):
+        raise TypeError()
+    # N.B. log the size, not the graph; formatting a large graph costs far more than iterating it
+    logger.log(TRACE, f"link_name: {link_name}, len(graph): {len(graph)}")
+
+    return ((node.uid, uid) for node in _iter_link_carriers(link_name, graph) for uid in getattr(node, link_name))
+
+
+def iter_linked_uids(link_name: str, graph: VertexMap) -> Iterator[Uid]:
+    """
+    Returns:
+        an iterator over the target ``Uid`` of every ``link_name`` edge in ``graph``; see ``iter_links``
     """
-    logger.log(TRACE, f"link_name: {link_name}, graph: {graph}")
     if any(arg is None for arg in (link_name, graph)):
         raise ValueError("missing required arg")
-    if not isinstance(graph, VertexMap.__origin__): # type: ignore
+    if not is_vertex_map(graph):
         raise TypeError()
-    if len(graph) == 0: 
-        return []
-            
-    accumulate_func: Callable[[list[Uid], RoamVertex], list[Uid]] = partial(_accumulate_linked_uids, link_name)
-    return list(reduce(accumulate_func, graph.values(), []))
+    logger.log(TRACE, f"link_name: {link_name}, len(graph): {len(graph)}")
+
+    return chain.from_iterable(getattr(node, link_name) for node in _iter_link_carriers(link_name, graph))
+
+
+def _iter_link_carriers(link_name: str, graph: VertexMap) -> Iterator[RoamNode]:
+    """the ``RoamNode``s in ``graph`` that have a non-empty ``link_name``"""
+    for vertex in graph.values():
+        if isinstance(vertex, RoamNode) and getattr(vertex, link_name):
+            yield cast(RoamNode, vertex)
+
+
+def all_linked_uids(link_name: str, graph: VertexMap) -> list[Uid]:
+    """
+    there are 2 kinds of ``link``s amongst RoamNodes: ``children`` and ``references``
+    """
+    return list(iter_linked_uids(link_name, graph))
 
 
 def to_vertex_type_map(graph: VertexMap) -> VertexTypeMap:
     logger.debug(f"graph: {graph}")
     if any(arg is None for arg in [graph]):
         raise ValueError("missing required arg")
-    if not isinstance(graph, VertexMap.__origin__): # type: ignore
+    if not is_vertex_map(graph):
         raise TypeError()
 
     vertex_type_map: DefaultDict[VertexType, list[RoamVertex]] = defaultdict(list) 
@@ -276,33 +445,370 @@ def to_vertex_type_map(graph: VertexMap) -> VertexTypeMap:
     return vertex_type_map
 
 
-def _accumulate_linked_uids(link_name: str, accumulator: list[Uid], vertex: RoamVertex) -> list[Uid]:
+LINK_NAMES: Final[tuple[str, ...]] = ('children', 'references')
+"""
+the 2 kinds of ``link``s amongst RoamNodes
+"""
+
+
+class LinkIndex:
     """
-    there are 2 kinds of ``link``s amongst RoamNodes: ``children`` and ``references``
+    Reverse-adjacency index of a graph: for each ``Uid``, the ``Uid``s of the nodes that link *to* it (inbound 
+    ``children`` edges are parents, inbound ``references`` edges are backlinks), and the in/out degree of each link kind.
+
+    Built in a single pass over ``graph``, after which every lookup is O(1). The index is a snapshot: it does not see 
+    later changes to ``graph`` or to its nodes' ``children``/``references``, unless they are applied with 
+    ``add_links``/``remove_links`` (as ``IncrementalValidator`` does).
+
+    Inbound ``Uid``s are listed in ``graph`` order; a ``Uid`` that is linked but is not a vertex of ``graph`` (i.e. 
+    dangling) is still indexed.
+
+    ``link_names`` optionally limits the index to those link kinds (e.g. ``('children',)``, for parents only); 
+    looking up any other kind raises ``ValueError``.
     """
-    logger.log(TRACE, f"link_name: {link_name}, accumulator: {accumulator}, vertex: {vertex}")
-    if any(arg is None for arg in (link_name, accumulator, vertex)):
-        raise ValueError("missing required arg")
-    if not isinstance(vertex, RoamNode):
-        return accumulator
-    
-    node: RoamNode = cast(RoamNode, vertex)
-    linked: Optional[list[Uid]] = getattr(node, link_name)
-    if not linked:
-        return accumulator
 
-    return accumulator + linked
+    def __init__(self: Any, graph: VertexMap, link_names: Iterable[str] = LINK_NAMES):
+        if any(arg is None for arg in [graph, link_names]):
+            raise ValueError("missing required arg")
+        if not is_vertex_map(graph):
+            raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+        link_names = tuple(link_names)
+        for link_name in link_names:
+            if link_name not in LINK_NAMES:
+                raise ValueError(f"unrecognized link_name: {link_name}")
+        logger.debug(f"len(graph): {len(graph)}, link_names: {link_names}")
+
+        # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
+        # link_name -> target uid -> source uids, with target uids in order of first appearance
+        self._inbound: dict[str, dict[Uid, list[Uid]]] = {link_name: {} for link_name in link_names}
+        # link_name -> source uid -> len(links); absent for nodes with no (or empty) ``link_name``
+        self._out_degrees: dict[str, dict[Uid, int]] = {link_name: {} for link_name in link_names}
+
+        for link_name in link_names:
+            inbound: dict[Uid, list[Uid]] = self._inbound[link_name]
+            out_degrees: dict[Uid, int] = self._out_degrees[link_name]
+            for source, target in iter_links(link_name, graph):
+                sources: Optional[list[Uid]] = inbound.get(target)
+                if sources is None:
+                    inbound[target] = [source]
+                else:
+                    sources.append(source)
+                out_degrees[source] = out_degrees.get(source, 0) + 1
+
+        logger.debug(f"self: {self}")
+
+
+    def add_links(self, link_name: str, source: Uid, targets: Iterable[Uid]) -> None:
+        """indexes ``link_name`` links from ``source`` to each of ``targets``"""
+        if any(arg is None for arg in [link_name, source, targets]):
+            raise ValueError("missing required arg")
+
+        inbound: dict[Uid, list[Uid]] = self._inbound_of(link_name)
+        out_degrees: dict[Uid, int] = self._out_degrees[link_name]
+        for target in targets:
+            inbound.setdefault(target, []).append(source)
+            out_degrees[source] = out_degrees.get(source, 0) + 1
+
+
+    def remove_links(self, link_name: str, source: Uid, targets: Iterable[Uid]) -> None:
+        """
+        un-indexes ``link_name`` links from ``source`` to each of ``targets``; ``targets`` must have been added, e.g. 
+        they are ``source``'s links as of the last time it was indexed
+        """
+        if any(arg is None for arg in [link_name, source, targets]):
+            raise ValueError("missing required arg")
+
+        inbound: dict[Uid, list[Uid]] = self._inbound_of(link_name)
+        out_degrees: dict[Uid, int] = self._out_degrees[link_name]
+        for target in targets:
+            sources: list[Uid] = inbound[target]
+            sources.remove(source)
+            if not sources:
+                del inbound[target]
+            out_degrees[source] -= 1
+            if not out_degrees[source]:
+                del out_degrees[source]
+
+
+    def _inbound_of(self, link_name: str) -> dict[Uid, list[Uid]]:
+        inbound: Optional[dict[Uid, list[Uid]]] = self._inbound.get(link_name)
+        if inbound is None:
+            if link_name in LINK_NAMES:
+                raise ValueError(f"link_name is not indexed; link_name: {link_name}")
+            raise ValueError(f"unrecognized link_name: {link_name}")
+        return inbound
+
+
+    def parents(self, uid: Uid) -> list[Uid]:
+        """
+        Returns:
+            the ``Uid``s of the nodes that have ``uid`` in their ``children``; ``[]`` for e.g. the root ``PageNode``. 
+            In a valid graph, a block has exactly 1 parent.
+        """
+        return list(self._inbound_of('children').get(uid, ()))
+
+
+    def parent(self, uid: Uid) -> Optional[Uid]:
+        """
+        Returns:
+            the ``Uid`` of the node that has ``uid`` in its ``children``; ``None`` if there is no such node
+
+        Raises:
+            ValueError: if ``uid`` has more than 1 parent (see ``BLOCK_PARENTS_EXIST_RULE``)
+        """
+        parents: Optional[list[Uid]] = self._inbound_of('children').get(uid)
+        if not parents:
+            return None
+        if len(parents) > 1:
+            raise ValueError(f"more than 1 parent; uid: {uid}, parents: {parents}")
+        return parents[0]
+
+
+    def backlinks(self, uid: Uid) -> list[Uid]:
+        """
+        Returns:
+            the ``Uid``s of the nodes that have ``uid`` in their ``references``
+        """
+        return list(self._inbound_of('references').get(uid, ()))
+
+
+    def in_degree(self, link_name: str, uid: Uid) -> int:
+        """number of ``link_name`` links to ``uid``; repeated links are counted"""
+        return len(self._inbound_of(link_name).get(uid, ()))
+
+
+    def out_degree(self, link_name: str, uid: Uid) -> int:
+        """number of ``link_name`` links from ``uid``; 0 if ``uid`` does not carry ``link_name``"""
+        # raises if ``link_name`` isn't indexed
+        self._inbound_of(link_name)
+        return self._out_degrees[link_name].get(uid, 0)
+
+
+    def in_degrees(self, link_name: str) -> dict[Uid, int]:
+        """
+        Returns:
+            ``in_degree`` of every ``Uid`` that is linked at least once, in order of first appearance as a link
+        """
+        return {uid: len(sources) for uid, sources in self._inbound_of(link_name).items()}
+
+
+    def __repr__(self):
+        clsname: str = type(self).__name__
+        counts: dict[str, int] = {link_name: len(inbound) for link_name, inbound in self._inbound.items()}
+        return f"{clsname}(linked uids: {counts})"
 
 
 ValidationFailure = NamedTuple("ValidationFailure", [('rule', 'ValidationRule'), ('failure_message', str)])
 ValidationResult: TypeAlias = Optional[list[ValidationFailure]]
 Validation: TypeAlias = Callable[['ValidationRule', VertexMap], ValidationResult]
+FusedValidation: TypeAlias = Callable[['ValidationRule', 'ValidationFacts'], ValidationResult]
+
+BLOCK_VERTEX_TYPES: Final[tuple[VertexType, ...]] = (VertexType.ROAM_BLOCK_HEADING, VertexType.ROAM_BLOCK_CONTENT)
+
+
+class ValidationFacts:
+    """
+    The facts about a graph that the ``ALL_RULES`` validations are computed from, gathered in a single pass over the 
+    graph. Used by ``validate`` so that each rule doesn't rescan the graph (see ``ValidationRule.fused_impl``).
+
+    All lists are in graph order, and so are in the same order that the per-rule scans would produce. Facts that only 
+    depend on a single vertex (e.g. carrier types, references in content) are checked during the pass.
+
+    ``uids`` optionally limits the pass to those vertices of ``graph`` (e.g. a shard of it); links are still checked 
+    against the whole ``graph``.
+    """
+
+    def __init__(self: Any, graph: VertexMap, uids: Optional[Iterable[Uid]] = None):
+        if any(arg is None for arg in [graph]):
+            raise ValueError("missing required arg")
+        if not is_vertex_map(graph):
+            raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+        logger.debug(f"len(graph): {len(graph)}")
+
+        # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
+        self._graph: VertexMap = graph
+        self._first_vertex: Optional[RoamVertex] = None
+        self._block_uids: set[Uid] = set()
+        # link_name -> target uid of every link
+        self._linked_uids: dict[str, list[Uid]] = {link_name: [] for link_name in LINK_NAMES}
+        # child uid -> number of ``children`` lists it appears in; in order of first appearance
+        self._child_counts: dict[Uid, int] = {}
+        # vertex_type -> concatenated ``children`` of the nodes of that type
+        self._children_by_parent_type: DefaultDict[VertexType, list[Uid]] = defaultdict(list)
+        # link_name -> uids of the vertices that have a (not ``None``) link_name attribute, but may not carry it
+        self._invalid_carriers: dict[str, list[Uid]] = {link_name: [] for link_name in LINK_NAMES}
+        # BlockContentNode uid -> its references that don't appear in its content
+        self._reference_danglers: dict[Uid, list[Uid]] = {}
+
+        vertices: Iterable[RoamVertex] = graph.values() if uids is None else map(graph.__getitem__, uids)
+        for vertex in vertices:
+            self._add_vertex(vertex)
+
+
+    def _add_vertex(self, vertex: RoamVertex) -> None:
+        if self._first_vertex is None:
+            self._first_vertex = vertex
+        vertex_type: VertexType = vertex.vertex_type
+        if vertex_type in BLOCK_VERTEX_TYPES:
+            self._block_uids.add(vertex.uid)
+
+        children: Optional[Iterable[Uid]] = getattr(vertex, 'children', None)
+        if children is not None:
+            if vertex_type not in CHILDREN_VALID_CARRIER_TYPES:
+                self._invalid_carriers['children'].append(vertex.uid)
+            self._linked_uids['children'].extend(children)
+            self._children_by_parent_type[vertex_type].extend(children)
+            child_counts: dict[Uid, int] = self._child_counts
+            for uid in children:
+                child_counts[uid] = child_counts.get(uid, 0) + 1
+
+        references: Optional[Iterable[Uid]] = getattr(vertex, 'references', None)
+        if references is not None:
+            if vertex_type not in REFERENCES_VALID_CARRIER_TYPES:
+                self._invalid_carriers['references'].append(vertex.uid)
+            self._linked_uids['references'].extend(references)
+            if isinstance(vertex, BlockContentNode):
+                dangling_refs: Optional[list[Uid]] = dangling_references(vertex)
+                if dangling_refs is not None:
+                    self._reference_danglers[vertex.uid] = dangling_refs
+
+
+    @property
+    def graph(self) -> VertexMap:
+        """is read-only"""
+        return self._graph
+
+
+    @property
+    def first_vertex(self) -> Optional[RoamVertex]:
+        """is read-only; ``None`` if the graph is empty"""
+        return self._first_vertex
+
+
+    @property
+    def block_uids(self) -> set[Uid]:
+        """is read-only; the ``Uid``s of all (BlockHeadingNode | BlockContentNode)"""
+        return self._block_uids
+
+
+    @property
+    def child_counts(self) -> dict[Uid, int]:
+        """is read-only; number of ``children`` lists that each ``Uid`` appears in"""
+        return self._child_counts
+
+
+    @property
+    def reference_danglers(self) -> dict[Uid, list[Uid]]:
+        """is read-only; for each BlockContentNode, the ``references`` that don't appear in its ``content``"""
+        return self._reference_danglers
+
+
+    def linked_uids(self, link_name: str) -> list[Uid]:
+        """same as ``all_linked_uids(link_name, graph)``"""
+        return self._linked_uids[link_name]
+
+
+    def children_of_type(self, vertex_type: VertexType) -> list[Uid]:
+        """the concatenated ``children`` of all of the nodes of ``vertex_type``"""
+        return self._children_by_parent_type.get(vertex_type, [])
+
+
+    def invalid_carriers(self, attribute_name: str) -> list[Uid]:
+        """
+        the ``Uid``s of the vertices that have a (not ``None``) ``attribute_name``, but are not one of its valid 
+        carrier types; ``attribute_name`` is a link name
+        """
+        return self._invalid_carriers[attribute_name]
+
+
+    def _to_shard_facts(self) -> '_ShardFacts':
+        # a child that is a block of the graph can only fail ``BLOCK_PARENTS_EXIST_RULE``, so only its count is kept
+        graph: VertexMap = self._graph
+        is_block: dict[Uid, bool] = {
+            uid: uid in graph and graph[uid].vertex_type in BLOCK_VERTEX_TYPES for uid in self._child_counts
+        }
+        return _ShardFacts(
+            {uid: count for uid, count in self._child_counts.items() if is_block[uid]},
+            [uid for uid in self._linked_uids['children'] if not is_block[uid]],
+            [uid for uid in self._linked_uids['references'] if uid not in graph],
+            {
+                vertex_type: [uid for uid in children if not is_block[uid]]
+                for vertex_type, children in self._children_by_parent_type.items()
+            },
+            self._invalid_carriers,
+            self._reference_danglers
+        )
+
+
+    @classmethod
+    def _of_shards(cls, graph: VertexMap, shards: Iterable['_ShardFacts']) -> 'ValidationFacts':
+        """
+        merges the ``_ShardFacts`` of consecutive shards of ``graph``, in order. N.B. only for ``validate``: the 
+        children that are blocks of the graph appear in neither ``linked_uids`` nor ``children_of_type``, and 
+        ``block_uids`` is only the blocks that are children
+        """
+        facts: ValidationFacts = cls(graph, ())
+        facts._first_vertex = next(iter(graph.values()), None)
+        child_counts: dict[Uid, int] = facts._child_counts
+        for shard in shards:
+            for uid, count in shard.block_child_counts.items():
+                child_counts[uid] = child_counts.get(uid, 0) + count
+            facts._linked_uids['children'].extend(shard.other_children)
+            facts._linked_uids['references'].extend(shard.dangling_references)
+            for vertex_type, children in shard.other_children_by_parent_type.items():
+                facts._children_by_parent_type[vertex_type].extend(children)
+            for link_name, carriers in shard.invalid_carriers.items():
+                facts._invalid_carriers[link_name].extend(carriers)
+            facts._reference_danglers.update(shard.reference_danglers)
+        facts._block_uids = set(child_counts)
+        return facts
+
+
+class _ShardFacts(NamedTuple):
+    """the ``ValidationFacts`` of a shard of a graph that can fail a rule; small, so cheap to send between processes"""
+    block_child_counts: dict[Uid, int]
+    other_children: list[Uid]
+    dangling_references: list[Uid]
+    other_children_by_parent_type: dict[VertexType, list[Uid]]
+    invalid_carriers: dict[str, list[Uid]]
+    reference_danglers: dict[Uid, list[Uid]]
+
+
+# the graph that ``validate``'s worker processes inherit (by fork), so that the vertices are never pickled
+_fork_graph: Optional[VertexMap] = None
+
+
+def _set_fork_graph(graph: VertexMap) -> None:
+    global _fork_graph
+    _fork_graph = graph
+
+
+def _shard_facts(start: int, stop: int) -> _ShardFacts:
+    """runs in a worker; the facts of the vertices of the inherited graph at positions [start, stop)"""
+    graph: VertexMap = cast(VertexMap, _fork_graph)
+    return ValidationFacts(graph, islice(graph, start, stop))._to_shard_facts()
+
+
+def _sharded_facts(graph: VertexMap, processes: int) -> ValidationFacts:
+    bounds: list[int] = [len(graph) * i // processes for i in range(processes + 1)]
+    logger.debug(f"bounds: {bounds}")
+    with ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context('fork'), initializer=_set_fork_graph, 
+            initargs=(graph,)
+        ) as executor:
+        shards: list[_ShardFacts] = list(executor.map(_shard_facts, bounds[:-1], bounds[1:]))
+    return ValidationFacts._of_shards(graph, shards)
 
 
 class ValidationRule(NamedTuple):
     name: str
     description: str
     impl: Validation
+    fused_impl: Optional[FusedValidation] = None
+    """
+    optional; computes the same ``ValidationResult`` as ``impl``, but from ``ValidationFacts`` rather than by scanning
+    the graph
+    """
 
 
     def validate(self, graph: VertexMap) -> ValidationResult: 
@@ -310,120 +816,140 @@ class ValidationRule(NamedTuple):
         if graph is None: 
             return None
     
-        if not isinstance(graph, VertexMap.__origin__): # type: ignore
+        if not is_vertex_map(graph):
             raise TypeError()
     
         return self.impl(self, graph)
 
 
-def validate_root_page(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    first_vertex: RoamVertex = list(graph.items())[0][1]
-    logger.debug(f"first_node: {first_vertex}")
+    def validate_facts(self, facts: 'ValidationFacts') -> ValidationResult:
+        """uses ``fused_impl``, when there is one; otherwise falls back to ``impl`` over ``facts.graph``"""
+        logger.debug(f"rule: {self.name}")
+        if any(arg is None for arg in [facts]):
+            raise ValueError("missing required arg")
 
-    if( first_vertex.vertex_type is VertexType.ROAM_PAGE):
+        if self.fused_impl is None:
+            return self.validate(facts.graph)
+
+        return self.fused_impl(self, facts)
+
+
+def _failure(rule: ValidationRule, failure_message: str) -> ValidationResult:
+    return [ValidationFailure(rule, failure_message)]
+
+
+def _root_page_result(rule: ValidationRule, first_vertex: Optional[RoamVertex]) -> ValidationResult:
+    logger.debug(f"first_node: {first_vertex}")
+    if first_vertex is not None and first_vertex.vertex_type is VertexType.ROAM_PAGE:
         return None
     
-    failure_message: str = f"is not {VertexType.ROAM_PAGE}; first vertex: {first_vertex}"
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, f"is not {VertexType.ROAM_PAGE}; first vertex: {first_vertex}")
+
+
+def validate_root_page(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    first_vertex: Optional[RoamVertex] = next(iter(graph.values()), None)
+    return _root_page_result(rule, first_vertex)
+
+
+def validate_root_page_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _root_page_result(rule, facts.first_vertex)
 
 
 ROOT_PAGE_RULE: Final[ValidationRule] = ValidationRule(
     'RootPageRule', 
     'first RoamVertex in the map is a PageNode; the root of the graph', 
-    validate_root_page
+    validate_root_page,
+    validate_root_page_facts
 )
 
 
-def validate_children_exist(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    node_children: list[Uid] = all_linked_uids('children', graph)
-    dangling_children: list[Uid] = list(filter(lambda uid: not uid in graph, node_children))
-    logger.debug(f"dangling_children: {dangling_children}")
+def _links_exist_result(rule: ValidationRule, link_name: str, linked_uids: Iterable[Uid], graph: VertexMap
+    ) -> ValidationResult:
 
-    if not dangling_children:
+    dangling: list[Uid] = [uid for uid in linked_uids if uid not in graph]
+    logger.debug(f"dangling_{link_name}: {dangling}")
+    if not dangling:
         return None
     
     # N.B. parens are just for formatting long lines-- PEP 8
     failure_message: str = (
-        f"Uids found in ``children`` attributes are not vertices of ``graph``; dangling_children: {dangling_children}"
+        f"Uids found in ``{link_name}`` attributes are not vertices of ``graph``; dangling_{link_name}: {dangling}"
     )
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, failure_message)
+
+
+def validate_children_exist(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    return _links_exist_result(rule, 'children', iter_linked_uids('children', graph), graph)
+
+
+def validate_children_exist_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _links_exist_result(rule, 'children', facts.linked_uids('children'), facts.graph)
 
 
 CHILDREN_EXIST_RULE: Final[ValidationRule] = ValidationRule(
     'ChildrenExistRule', 
     'all ``Uid`` values appearing in ``children`` have corresponding entry in VertexMap', 
-    validate_children_exist
+    validate_children_exist,
+    validate_children_exist_facts
 )
 
 
 def validate_references_exist(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    node_references: list[Uid] = all_linked_uids('references', graph)
-    dangling_references: list[Uid] = list(filter(lambda uid: not uid in graph, node_references))
-    logger.debug(f"dangling_references: {dangling_references}")
+    return _links_exist_result(rule, 'references', iter_linked_uids('references', graph), graph)
 
-    if not dangling_references:
-        return None
-    
-    # N.B. parens are just for formatting long lines-- PEP 8
-    failure_message: str = (
-        f"Uids found in ``references`` attributes are not vertices of ``graph``; dangling_references: {dangling_references}"
-    )
-    return [ValidationFailure(rule, failure_message)]
+
+def validate_references_exist_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _links_exist_result(rule, 'references', facts.linked_uids('references'), facts.graph)
 
 
 REFERENCES_EXIST_RULE: Final[ValidationRule] = ValidationRule(
     'ReferencesExistRule', 
     'all ``Uid`` values appearing in ``references`` have corresponding entry in VertexMap', 
-    validate_references_exist
+    validate_references_exist,
+    validate_references_exist_facts
 )
 
 
-def validate_block_parents_exist(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    all_block_nodes: list[RoamVertex] = (
-        list(filter(lambda v: v.vertex_type in [VertexType.ROAM_BLOCK_HEADING, VertexType.ROAM_BLOCK_CONTENT], 
-                    graph.values()
-                )
-        )
-    )
-    logger.log(TRACE, f"all_block_nodes: {all_block_nodes}")
+def _block_parents_result(rule: ValidationRule, block_uids: set[Uid], parent_counts: dict[Uid, int]
+    ) -> ValidationResult:
 
-    if not all_block_nodes:
-        return None
-    
-    all_block_uids: list[Uid] = list(map(lambda b: b.uid, all_block_nodes))
-    all_children_uids: list[Uid] = all_linked_uids('children', graph)
-    children_counter: Counter[Uid] = Counter(all_children_uids)
-    logger.log(TRACE, f"children_counter: {children_counter}")
-    invalids: dict[Uid, int] = {k:v for (k,v) in children_counter.items() if ((k in all_block_uids) and (v > 1))}
+    logger.log(TRACE, f"parent_counts: {parent_counts}")
+    invalids: dict[Uid, int] = {k:v for (k,v) in parent_counts.items() if ((v > 1) and (k in block_uids))}
     logger.log(logging.WARN if invalids else TRACE, f"invalids: {invalids}")
     if not invalids:
         return None    
 
-    failure_message: str = (
-        f"block ``Uids`` with invalid number of parents: {invalids}"
-    )
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, f"block ``Uids`` with invalid number of parents: {invalids}")
+
+
+def validate_block_parents_exist(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    all_block_uids: set[Uid] = {v.uid for v in graph.values() if v.vertex_type in BLOCK_VERTEX_TYPES}
+    logger.log(TRACE, f"all_block_uids: {all_block_uids}")
+    if not all_block_uids:
+        return None
+    
+    return _block_parents_result(rule, all_block_uids, LinkIndex(graph, ('children',)).in_degrees('children'))
+
+
+def validate_block_parents_exist_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _block_parents_result(rule, facts.block_uids, facts.child_counts)
 
 
 BLOCK_PARENTS_EXIST_RULE: Final[ValidationRule] = ValidationRule(
     'BlockParentsExistRule', 
     'every (BlockHeadingNode | BlockContentNode) ``Uid`` must appear in exactly 1 ``children`` lists', 
-    validate_block_parents_exist
+    validate_block_parents_exist,
+    validate_block_parents_exist_facts
 )
 
 
-def validate_children_vertex_types(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    all_children_uids: list[Uid] = all_linked_uids('children', graph)
-    if not all_children_uids:
-        return None
+def _children_vertex_types_result(rule: ValidationRule, children_uids: Iterable[Uid], graph: VertexMap
+    ) -> ValidationResult:
 
-    invalid_children_vertices: list[RoamVertex] = (
-        [
-            graph[uid] 
-            for uid in all_children_uids 
-            if graph[uid].vertex_type in [VertexType.ROAM_PAGE, VertexType.ROAM_FILE]
-        ]
-    )
+    # N.B. dangling children are skipped; they are reported by ``CHILDREN_EXIST_RULE``
+    invalid_types: tuple[VertexType, ...] = (VertexType.ROAM_PAGE, VertexType.ROAM_FILE)
+    children_vertices: Iterator[RoamVertex] = (graph[uid] for uid in children_uids if uid in graph)
+    invalid_children_vertices: list[RoamVertex] = [v for v in children_vertices if v.vertex_type in invalid_types]
     logger.log(
         logging.WARN if invalid_children_vertices else TRACE, 
         f"invalid_children_vertices: {invalid_children_vertices}"
@@ -431,54 +957,72 @@ def validate_children_vertex_types(rule: ValidationRule, graph: VertexMap) -> Va
     if not invalid_children_vertices:
         return None    
 
-    failure_message: str = (
-        f"(PageNode | FileVertex)s appearing as children: {invalid_children_vertices}"
-    )
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, f"(PageNode | FileVertex)s appearing as children: {invalid_children_vertices}")
+
+
+def validate_children_vertex_types(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    return _children_vertex_types_result(rule, iter_linked_uids('children', graph), graph)
+
+
+def validate_children_vertex_types_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _children_vertex_types_result(rule, facts.linked_uids('children'), facts.graph)
 
 
 CHILDREN_VERTEX_TYPES_RULE: Final[ValidationRule] = ValidationRule(
     'ChildrenVertexTypesRule', 
     'no (PageNode | FileVertex) ``Uid`` can appear in any ``children`` lists', 
-    validate_children_vertex_types
+    validate_children_vertex_types,
+    validate_children_vertex_types_facts
 )
 
 
+def _node_children_result(
+        rule: ValidationRule, valid_children_types: list[VertexType], target_children: Iterable[Uid], 
+        graph: VertexMap
+    ) -> ValidationResult:
+
+    logger.log(TRACE, f"valid_children_types: {valid_children_types}")
+    # N.B. dangling children are skipped; they are reported by ``CHILDREN_EXIST_RULE``
+    invalid_children: list[Uid] = (
+        [
+            child_id for child_id in target_children 
+            if child_id in graph and graph[child_id].vertex_type not in valid_children_types
+        ]
+    )
+    logger.log(TRACE, f"invalid_children: {invalid_children}")
+    if not invalid_children:
+        return None  
+
+    return _failure(rule, f"invalid_children: {invalid_children}")
+
+
 def _validate_node_children(
         rule: ValidationRule, node_type: VertexType, valid_children_types: list[VertexType], graph: VertexMap
     ) -> ValidationResult:
 
-    logger.log(TRACE, f"node_type: {node_type}, valid_children_types: {valid_children_types}")
+    logger.log(TRACE, f"node_type: {node_type}")
     target_nodes: list[RoamNode] = (
         cast(list[RoamNode], [v for v in graph.values() if v.vertex_type is node_type])
     )
     logger.log(TRACE, f"target_nodes: {target_nodes}")
-    all_target_children: list[list[Uid]] = (
+    all_target_children: list[Iterable[Uid]] = (
         [node.children for node in target_nodes if node.children is not None]
     )
     logger.log(TRACE, f"all_target_children: {all_target_children}")
-    flat_target_children: list[Uid] = list(reduce(lambda accum, iter_val: accum + iter_val, all_target_children, [])) 
-    logger.log(TRACE, f"flat_target_children: {flat_target_children}")
-    invalid_children: list[Uid] = (
-        [
-            child_id for child_id in flat_target_children 
-            if graph[child_id].vertex_type not in valid_children_types
-        ]
-    )
-    logger.log(TRACE, f"invalid_children: {invalid_children}")
-    if not invalid_children:
-        return None  
+    return _node_children_result(rule, valid_children_types, chain.from_iterable(all_target_children), graph)
 
-    failure_message: str = (
-        f"invalid_children: {invalid_children}"
-    )
-    return [ValidationFailure(rule, failure_message)]
+
+PAGE_NODE_VALID_CHILDREN_TYPES: Final[list[VertexType]] = [VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING]
 
 
 def validate_page_node_children(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    return _validate_node_children(rule, VertexType.ROAM_PAGE, PAGE_NODE_VALID_CHILDREN_TYPES, graph)
+
+
+def validate_page_node_children_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
     return (
-        _validate_node_children(
-            rule, VertexType.ROAM_PAGE, [VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING], graph
+        _node_children_result(
+            rule, PAGE_NODE_VALID_CHILDREN_TYPES, facts.children_of_type(VertexType.ROAM_PAGE), facts.graph
         )
     )
 
@@ -486,14 +1030,27 @@ def validate_page_node_children(rule: ValidationRule, graph: VertexMap) -> Valid
 PAGE_NODE_CHILDREN_RULE: Final[ValidationRule] = ValidationRule(
     'PageNodeChildrenRule', 
     'all ``children`` of ``PageNode`` are (BlockHeadingNode | BlockContentNode)', 
-    validate_page_node_children
+    validate_page_node_children,
+    validate_page_node_children_facts
+)
+
+
+BLOCK_HEADING_VALID_CHILDREN_TYPES: Final[list[VertexType]] = (
+    [VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING]
 )
 
 
 def validate_block_heading_children(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
     return (
-        _validate_node_children(
-            rule, VertexType.ROAM_BLOCK_HEADING, [VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING], graph
+        _validate_node_children(rule, VertexType.ROAM_BLOCK_HEADING, BLOCK_HEADING_VALID_CHILDREN_TYPES, graph)
+    )
+
+
+def validate_block_heading_children_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return (
+        _node_children_result(
+            rule, BLOCK_HEADING_VALID_CHILDREN_TYPES, facts.children_of_type(VertexType.ROAM_BLOCK_HEADING), 
+            facts.graph
         )
     )
 
@@ -501,59 +1058,75 @@ def validate_block_heading_children(rule: ValidationRule, graph: VertexMap) -> V
 BLOCK_HEADING_CHILDREN_RULE: Final[ValidationRule] = ValidationRule(
     'BlockHeadingChildrenRule', 
     'all ``children`` of ``BlockHeadingNode`` are (BlockHeadingNode | BlockContentNode)', 
-    validate_block_heading_children
+    validate_block_heading_children,
+    validate_block_heading_children_facts
 )
 
 
-def _validate_attribute_appearance(
-        rule: ValidationRule, attribute_name: str, valid_carrier_types: list[VertexType], graph: VertexMap
+def _attribute_appearance_result(
+        rule: ValidationRule, valid_carrier_types: list[VertexType], carrier_nodes: Iterable[RoamVertex]
     ) -> ValidationResult:
 
-    logger.log(TRACE, f"attribute_name: {attribute_name}, valid_carrier_types: {valid_carrier_types}")
-    carrier_nodes: list[RoamNode] = (
-        cast(list[RoamNode], [v for v in graph.values() if has_attribute_value(v, attribute_name)])
-    )
-    logger.log(TRACE, f"carrier_nodes: {carrier_nodes}")
-    invalid_carrier_nodes: list[RoamNode] = (
+    logger.log(TRACE, f"valid_carrier_types: {valid_carrier_types}")
+    invalid_carrier_nodes: list[RoamVertex] = (
         [ node for node in carrier_nodes if node.vertex_type not in valid_carrier_types ]
     )
     logger.log(TRACE, f"invalid_carrier_nodes: {invalid_carrier_nodes}")
     if not invalid_carrier_nodes:
         return None  
 
-    failure_message: str = (
-        f"invalid_carrier_nodes: {invalid_carrier_nodes}"
-    )
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, f"invalid_carrier_nodes: {invalid_carrier_nodes}")
+
+
+def _validate_attribute_appearance(
+        rule: ValidationRule, attribute_name: str, valid_carrier_types: list[VertexType], graph: VertexMap
+    ) -> ValidationResult:
+
+    logger.log(TRACE, f"attribute_name: {attribute_name}")
+    carrier_nodes: list[RoamVertex] = [v for v in graph.values() if has_attribute_value(v, attribute_name)]
+    logger.log(TRACE, f"carrier_nodes: {carrier_nodes}")
+    return _attribute_appearance_result(rule, valid_carrier_types, carrier_nodes)
+
+
+CHILDREN_VALID_CARRIER_TYPES: Final[list[VertexType]] = (
+    [VertexType.ROAM_PAGE, VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING]
+)
 
 
 def validate_children_attribute_appearance(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    return (
-        _validate_attribute_appearance(
-            rule, 'children', 
-            [VertexType.ROAM_PAGE, VertexType.ROAM_BLOCK_CONTENT, VertexType.ROAM_BLOCK_HEADING], 
-            graph
-        )
-    )
+    return _validate_attribute_appearance(rule, 'children', CHILDREN_VALID_CARRIER_TYPES, graph)
+
+
+def validate_children_attribute_appearance_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    invalid_carrier_nodes: list[RoamVertex] = [facts.graph[uid] for uid in facts.invalid_carriers('children')]
+    return _attribute_appearance_result(rule, CHILDREN_VALID_CARRIER_TYPES, invalid_carrier_nodes)
 
 
 CHILDREN_ATTRIBUTE_APPEARANCE_RULE: Final[ValidationRule] = ValidationRule(
     'ChildrenAttributeAppearanceRule', 
     '``children`` attribute can only appear on (PageNode | BlockHeadingNode | BlockContentNode)', 
-    validate_children_attribute_appearance
+    validate_children_attribute_appearance,
+    validate_children_attribute_appearance_facts
 )
 
 
+REFERENCES_VALID_CARRIER_TYPES: Final[list[VertexType]] = [VertexType.ROAM_BLOCK_CONTENT]
+
+
 def validate_references_attribute_appearance(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    return (
-        _validate_attribute_appearance(rule, 'references', [VertexType.ROAM_BLOCK_CONTENT], graph)
-    )
+    return _validate_attribute_appearance(rule, 'references', REFERENCES_VALID_CARRIER_TYPES, graph)
+
+
+def validate_references_attribute_appearance_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    invalid_carrier_nodes: list[RoamVertex] = [facts.graph[uid] for uid in facts.invalid_carriers('references')]
+    return _attribute_appearance_result(rule, REFERENCES_VALID_CARRIER_TYPES, invalid_carrier_nodes)
 
 
 REFERENCES_ATTRIBUTE_APPEARANCE_RULE: Final[ValidationRule] = ValidationRule(
     'ReferencesAttributeAppearanceRule', 
     '``references`` attribute can only appear on (BlockContentNode)', 
-    validate_references_attribute_appearance
+    validate_references_attribute_appearance,
+    validate_references_attribute_appearance_facts
 )
 
 
@@ -570,13 +1143,63 @@ def content_contains_reference(target: str, ref: Uid) -> bool:
     return contains
 
 
+@unique
+class ReferenceKind(StrEnum):
+    """the kinds of Roam reference that can appear in ``BlockContentNode.content``; values are the opening delimiters"""
+    PAGE = '[['
+    BLOCK = '(('
+    FILE = '<<'
+
+    def __str__(self):
+        return f"{self.__class__.__name__}.{self._name_}"
+
+
+class ReferenceSpan(NamedTuple):
+    kind: ReferenceKind
+    uid: Uid
+    start: int
+    """offset of the opening delimiter"""
+    end: int
+    """offset just past the closing delimiter; i.e. ``content[start:end] == '[[uid]]'``"""
+
+
+# N.B. a lookahead matches at every offset, so nested/overlapping references (e.g. "[[((uid))]]") are all found
+REFERENCE_PATTERN: Final[re.Pattern] = re.compile(r"(?=\[\[([^\[\]]+)\]\]|\(\(([^()]+)\)\)|<<([^<>]+)>>)")
+_REFERENCE_KINDS: Final[tuple[ReferenceKind, ...]] = (ReferenceKind.PAGE, ReferenceKind.BLOCK, ReferenceKind.FILE)
+_REFERENCE_DELIMITERS: Final[frozenset[str]] = frozenset('[]()<>')
+
+
+def scan_references(content: str) -> list[ReferenceSpan]:
+    """
+    Scans ``content`` once, for all of the ``[[uid]]``, ``((uid))`` and ``<<uid>>`` references in it.
+
+    Returns:
+        the references, ordered by ``start``
+    """
+    if any(arg is None for arg in [content]):
+        raise ValueError("missing required arg")
+
+    spans: list[ReferenceSpan] = []
+    for match in REFERENCE_PATTERN.finditer(content):
+        group: int = next(i for i, uid in enumerate(match.groups()) if uid is not None)
+        uid: Uid = match.group(group + 1)
+        spans.append(ReferenceSpan(_REFERENCE_KINDS[group], uid, match.start(), match.start() + len(uid) + 4))
+    return spans
+
+
 def dangling_references(target: BlockContentNode) -> Optional[list[Uid]]:
-    logger.log(TRACE, f"target: {target}")
+    logger.log(TRACE, f"target: {target.uid}")
 
     if not target.references:
         return None
     
-    dangling_refs: list[Uid] = [r for r in target.references if not content_contains_reference(target.content, r)]
+    referenced: set[Uid] = {span.uid for span in target.reference_spans()}
+    # N.B. the scan can't see a ``Uid`` containing delimiter characters; those fall back to a substring search
+    dangling_refs: list[Uid] = [
+        r for r in target.references 
+        if r not in referenced 
+        and (_REFERENCE_DELIMITERS.isdisjoint(r) or not content_contains_reference(target.content, r))
+    ]
     logger.log(TRACE, f"dangling_refs: {dangling_refs}")
 
     if not dangling_refs:
@@ -585,34 +1208,42 @@ def dangling_references(target: BlockContentNode) -> Optional[list[Uid]]:
     return dangling_refs
 
 
-def validate_references_appear_in_content(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
-    all_referencing: list[BlockContentNode] = cast(list[BlockContentNode], 
-        [v for v in graph.values() if has_attribute_value(v, 'references')]
-    )
-    logger.log(TRACE, f"all_referencing: {all_referencing}")
-
-    if not all_referencing:
-        return None
+def _reference_danglers(all_referencing: Iterable[RoamVertex]) -> dict[Uid, list[Uid]]:
+    # N.B. only ``BlockContentNode``s have ``content``; other carriers are reported by 
+    # ``REFERENCES_ATTRIBUTE_APPEARANCE_RULE``
+    danglers: dict[Uid, list[Uid]] = {}
+    for node in all_referencing:
+        if not isinstance(node, BlockContentNode):
+            continue
+        dangling_refs: Optional[list[Uid]] = dangling_references(node)
+        if dangling_refs is not None:
+            danglers[node.uid] = dangling_refs
+    return danglers
 
-    danglers: dict[Uid, list[Uid]] = (
-        {
-            node.uid: dangling_references(node) 
-            for node in all_referencing
-            if dangling_references(node) is not None
-        }
-    ) # type: ignore
 
+def _references_appear_in_content_result(rule: ValidationRule, danglers: dict[Uid, list[Uid]]) -> ValidationResult:
+    logger.log(TRACE, f"danglers: {danglers}")
     if not danglers:
         return None
     
-    failure_message: str = f"references not appearing in content: {danglers}"
-    return [ValidationFailure(rule, failure_message)]
+    return _failure(rule, f"references not appearing in content: {danglers}")
+
+
+def validate_references_appear_in_content(rule: ValidationRule, graph: VertexMap) -> ValidationResult:
+    all_referencing: list[RoamVertex] = [v for v in graph.values() if has_attribute_value(v, 'references')]
+    logger.log(TRACE, f"all_referencing: {all_referencing}")
+    return _references_appear_in_content_result(rule, _reference_danglers(all_referencing))
+
+
+def validate_references_appear_in_content_facts(rule: ValidationRule, facts: ValidationFacts) -> ValidationResult:
+    return _references_appear_in_content_result(rule, facts.reference_danglers)
 
 
 REFERENCES_APPEAR_IN_CONTENT_RULE: Final[ValidationRule] = ValidationRule(
     'ReferencesAppearInContentRules', 
     'all ``references`` of BlockContentNode appear in the ``content``, each formatted as a valid ref format type', 
-    validate_references_appear_in_content
+    validate_references_appear_in_content,
+    validate_references_appear_in_content_facts
 )
 
 
@@ -631,7 +1262,7 @@ ALL_RULES: Final[list[ValidationRule]] = [
 ]
 
 
-def validate(graph: VertexMap) -> ValidationResult: 
+def validate(graph: VertexMap, processes: Optional[int] = None) -> ValidationResult: 
     """Checks all of the invariants that should hold for a Roam/PageDump graph
 
     validations:
@@ -645,11 +1276,20 @@ def validate(graph: VertexMap) -> ValidationResult:
     - ``children`` attribute can only appear on (PageNode | BlockHeadingNode | BlockContentNode)
     - ``references`` attribute can only appear on (BlockContentNode)
     - all ``references`` of BlockContentNode appear in the ``content``, each formatted as a valid ref format type
+
+    The graph is scanned once, into ``ValidationFacts``, from which each rule in ``ALL_RULES`` is evaluated (see 
+    ``ValidationRule.validate_facts``). The result is the same as running each ``rule.validate(graph)`` in turn.
+
+    With ``processes``, the scan is split into that many contiguous shards of the graph, each scanned by a forked 
+    worker process that inherits the graph; only the facts that can fail a rule are sent back. The result is the 
+    same. Where fork isn't available, the graph is scanned in this process.
     
     Parameters
     ----------
     graph : VertexMap
         the graph to check
+    processes : Optional[int]
+        optional; the number of worker processes to scan the graph with
 
     Returns
     -------
@@ -657,20 +1297,313 @@ def validate(graph: VertexMap) -> ValidationResult:
     - None: if there are no validation failures
     - list[ValidationFailure] === list[description of validation failure encountered]
     """
-    logger.debug(f"graph: {graph}")
-    results: list[ValidationResult] = [rule.validate(graph) for rule in ALL_RULES]
+    if graph is None:
+        return None
+    logger.debug(f"len(graph): {len(graph)}, processes: {processes}")
+    if processes is not None and processes < 1:
+        raise ValueError(f"processes must be positive; processes: {processes}")
+    if processes is not None and processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        logger.warning("fork isn't available; validating in this process")
+        processes = None
+    if processes is not None and processes > 1 and not is_vertex_map(graph):
+        raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+
+    facts: ValidationFacts = (
+        _sharded_facts(graph, processes) if processes is not None and processes > 1 else ValidationFacts(graph)
+    )
+    results: list[ValidationResult] = [rule.validate_facts(facts) for rule in ALL_RULES]
     logger.debug(f"results: {results}")
     results: list[ValidationResult] = list(filter(lambda x: x is not None, results))
 
     if not results:
         return None
     
-    flat_result: list[ValidationFailure] = (
-        list(reduce(lambda accum, iter_val: accum + iter_val, results, []))  # type: ignore
-    )
+    flat_result: list[ValidationFailure] = list(chain.from_iterable(results))  # type: ignore
 
     if not flat_result:
         return None
     
     return flat_result
 
+
+class _VertexSnapshot(NamedTuple):
+    """what ``IncrementalValidator`` last indexed for a vertex; needed to un-index it after it has been changed"""
+    vertex_type: VertexType
+    children: Optional[tuple[Uid, ...]]
+    references: Optional[tuple[Uid, ...]]
+
+
+class IncrementalValidator:
+    """
+    Validates a graph, then re-validates it after edits, re-checking only the vertices that changed and their 
+    neighbors (parents, children). The derived indexes (a ``LinkIndex``, the offenders of each rule) are kept up to 
+    date across calls.
+
+    After changing ``graph`` (adding, removing or replacing vertices, or changing a node's ``children``/``references``
+    in place), pass the ``Uid``s of every vertex that was added, removed or changed to ``revalidate``.
+
+    The failures are for the same rules, with the same offenders, as ``validate(graph)``; but the offenders within a 
+    ``failure_message`` are listed in the order that they were indexed, which may differ from graph order. Rules in 
+    ``ALL_RULES`` that this class doesn't know are run in full, with ``rule.validate(graph)``.
+    """
+
+    def __init__(self: Any, graph: VertexMap):
+        if any(arg is None for arg in [graph]):
+            raise ValueError("missing required arg")
+        if not is_vertex_map(graph):
+            raise TypeError(f"is not instanceof {VertexMap}; graph: {graph}")
+        logger.debug(f"len(graph): {len(graph)}")
+
+        # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
+        self._graph: VertexMap = graph
+        self._link_index: LinkIndex = LinkIndex(OrderedDict())
+        self._snapshots: dict[Uid, _VertexSnapshot] = {}
+        # N.B. the dicts with ``None`` values below are insertion ordered sets
+        self._uids_by_type: dict[VertexType, dict[Uid, None]] = {vertex_type: {} for vertex_type in VertexType}
+        # link_name -> linked uids that are not vertices of the graph
+        self._dangling: dict[str, dict[Uid, None]] = {link_name: {} for link_name in LINK_NAMES}
+        # uids that appear in more than 1 ``children`` list
+        self._multi_parented: dict[Uid, None] = {}
+        # parent vertex_type -> parent uid -> its children that are not valid children for the parent's type
+        self._invalid_children: dict[VertexType, dict[Uid, list[Uid]]] = (
+            {VertexType.ROAM_PAGE: {}, VertexType.ROAM_BLOCK_HEADING: {}}
+        )
+        self._invalid_carriers: dict[str, dict[Uid, None]] = {link_name: {} for link_name in LINK_NAMES}
+        self._reference_danglers: dict[Uid, list[Uid]] = {}
+
+        for uid in graph:
+            self._add(uid)
+        for uid in chain(self._uids_by_type[VertexType.ROAM_PAGE], self._uids_by_type[VertexType.ROAM_BLOCK_HEADING]):
+            self._check_children_types(uid)
+
+
+    @property
+    def graph(self) -> VertexMap:
+        """is read-only"""
+        return self._graph
+
+
+    @property
+    def link_index(self) -> LinkIndex:
+        """is read-only; up to date as of the last ``revalidate``"""
+        return self._link_index
+
+
+    def revalidate(self, changed_uids: Iterable[Uid]) -> ValidationResult:
+        """
+        Args:
+            changed_uids: the ``Uid``s of every vertex that was added to, removed from, or changed in ``graph`` since 
+                this validator was created, or last revalidated
+
+        Returns:
+            same as ``validate(graph)``; see the class docstring for ordering
+        """
+        if any(arg is None for arg in [changed_uids]):
+            raise ValueError("missing required arg")
+
+        changed: list[Uid] = list(dict.fromkeys(changed_uids))
+        logger.debug(f"changed: {changed}")
+        previous_types: dict[Uid, Optional[VertexType]] = {}
+        # un-index every changed vertex before re-indexing any, so that membership is consistent
+        for uid in changed:
+            snapshot: Optional[_VertexSnapshot] = self._snapshots.get(uid)
+            previous_types[uid] = None if snapshot is None else snapshot.vertex_type
+            if snapshot is not None:
+                self._remove(uid)
+        for uid in changed:
+            if uid in self._graph:
+                self._add(uid)
+        # only once every changed vertex is re-indexed; a changed parent's children may be changed too
+        for uid in changed:
+            self._check_children_types(uid)
+
+        # a parent's children are only re-checked when a child's type (or existence) changed
+        for uid in changed:
+            snapshot = self._snapshots.get(uid)
+            if previous_types[uid] is not (None if snapshot is None else snapshot.vertex_type):
+                for parent in self._link_index.parents(uid):
+                    self._check_children_types(parent)
+
+        return self.result()
+
+
+    def result(self) -> ValidationResult:
+        """the ``ValidationResult`` as of the last ``revalidate`` (or construction); doesn't look for changes"""
+        results: list[ValidationResult] = []
+        for rule in ALL_RULES:
+            check: Optional[Callable[[IncrementalValidator, ValidationRule], ValidationResult]] = (
+                _INCREMENTAL_CHECKS.get(rule.name)
+            )
+            results.append(rule.validate(self._graph) if check is None else check(self, rule))
+        logger.debug(f"results: {results}")
+
+        flat_result: list[ValidationFailure] = list(chain.from_iterable(r for r in results if r is not None))
+        if not flat_result:
+            return None
+
+        return flat_result
+
+
+    def _add(self, uid: Uid) -> None:
+        vertex: RoamVertex = self._graph[uid]
+        children: Optional[Iterable[Uid]] = getattr(vertex, 'children', None)
+        references: Optional[Iterable[Uid]] = getattr(vertex, 'references', None)
+        snapshot: _VertexSnapshot = _VertexSnapshot(
+            vertex.vertex_type, 
+            None if children is None else tuple(children), 
+            None if references is None else tuple(references)
+        )
+        self._snapshots[uid] = snapshot
+        self._uids_by_type[snapshot.vertex_type][uid] = None
+
+        for link_name, targets in [('children', snapshot.children), ('references', snapshot.references)]:
+            self._dangling[link_name].pop(uid, None)
+            if targets is None:
+                continue
+            self._link_index.add_links(link_name, uid, targets)
+            for target in targets:
+                self._link_count_changed(link_name, target)
+
+        if children is not None and snapshot.vertex_type not in CHILDREN_VALID_CARRIER_TYPES:
+            self._invalid_carriers['children'][uid] = None
+        if references is not None:
+            if snapshot.vertex_type not in REFERENCES_VALID_CARRIER_TYPES:
+                self._invalid_carriers['references'][uid] = None
+            if isinstance(vertex, BlockContentNode):
+                dangling_refs: Optional[list[Uid]] = dangling_references(vertex)
+                if dangling_refs is not None:
+                    self._reference_danglers[uid] = dangling_refs
+
+
+
+    def _remove(self, uid: Uid) -> None:
+        snapshot: _VertexSnapshot = self._snapshots.pop(uid)
+        del self._uids_by_type[snapshot.vertex_type][uid]
+
+        for link_name, targets in [('children', snapshot.children), ('references', snapshot.references)]:
+            if targets is not None:
+                self._link_index.remove_links(link_name, uid, targets)
+                for target in targets:
+                    self._link_count_changed(link_name, target)
+            if uid not in self._graph and self._link_index.in_degree(link_name, uid):
+                self._dangling[link_name][uid] = None
+
+        for link_name in LINK_NAMES:
+            self._invalid_carriers[link_name].pop(uid, None)
+        self._reference_danglers.pop(uid, None)
+
+        self._invalid_children[VertexType.ROAM_PAGE].pop(uid, None)
+        self._invalid_children[VertexType.ROAM_BLOCK_HEADING].pop(uid, None)
+
+
+    def _link_count_changed(self, link_name: str, target: Uid) -> None:
+        count: int = self._link_index.in_degree(link_name, target)
+        if count and target not in self._graph:
+            self._dangling[link_name][target] = None
+        else:
+            self._dangling[link_name].pop(target, None)
+
+        if link_name != 'children':
+            return
+        if count > 1:
+            self._multi_parented[target] = None
+        else:
+            self._multi_parented.pop(target, None)
+
+
+    def _check_children_types(self, parent: Uid) -> None:
+        snapshot: Optional[_VertexSnapshot] = self._snapshots.get(parent)
+        if snapshot is None or snapshot.vertex_type not in self._invalid_children:
+            return
+
+        valid_children_types: list[VertexType] = (
+            PAGE_NODE_VALID_CHILDREN_TYPES if snapshot.vertex_type is VertexType.ROAM_PAGE 
+            else BLOCK_HEADING_VALID_CHILDREN_TYPES
+        )
+        # N.B. dangling children are skipped; as in ``_node_children_result``
+        invalid_children: list[Uid] = [
+            child for child in (snapshot.children or ())
+            if child in self._snapshots and self._snapshots[child].vertex_type not in valid_children_types
+        ]
+        if invalid_children:
+            self._invalid_children[snapshot.vertex_type][parent] = invalid_children
+        else:
+            self._invalid_children[snapshot.vertex_type].pop(parent, None)
+
+
+    def _repeat_linked(self, link_name: str, uids: Iterable[Uid]) -> list[Uid]:
+        """each of ``uids``, repeated once per ``link_name`` link to it; as ``all_linked_uids`` would list them"""
+        return [uid for uid in uids for _ in range(self._link_index.in_degree(link_name, uid))]
+
+
+    def _check_root_page(self, rule: ValidationRule) -> ValidationResult:
+        return _root_page_result(rule, next(iter(self._graph.values()), None))
+
+
+    def _check_children_exist(self, rule: ValidationRule) -> ValidationResult:
+        dangling: list[Uid] = self._repeat_linked('children', self._dangling['children'])
+        return _links_exist_result(rule, 'children', dangling, self._graph)
+
+
+    def _check_references_exist(self, rule: ValidationRule) -> ValidationResult:
+        dangling: list[Uid] = self._repeat_linked('references', self._dangling['references'])
+        return _links_exist_result(rule, 'references', dangling, self._graph)
+
+
+    def _check_block_parents_exist(self, rule: ValidationRule) -> ValidationResult:
+        parent_counts: dict[Uid, int] = (
+            {uid: self._link_index.in_degree('children', uid) for uid in self._multi_parented}
+        )
+        block_uids: set[Uid] = (
+            {uid for uid in self._multi_parented if uid in self._snapshots 
+             and self._snapshots[uid].vertex_type in BLOCK_VERTEX_TYPES}
+        )
+        return _block_parents_result(rule, block_uids, parent_counts)
+
+
+    def _check_children_vertex_types(self, rule: ValidationRule) -> ValidationResult:
+        candidates: Iterable[Uid] = (
+            chain(self._uids_by_type[VertexType.ROAM_PAGE], self._uids_by_type[VertexType.ROAM_FILE])
+        )
+        return _children_vertex_types_result(rule, self._repeat_linked('children', candidates), self._graph)
+
+
+    def _check_page_node_children(self, rule: ValidationRule) -> ValidationResult:
+        invalid_children: Iterable[Uid] = chain.from_iterable(self._invalid_children[VertexType.ROAM_PAGE].values())
+        return _node_children_result(rule, PAGE_NODE_VALID_CHILDREN_TYPES, invalid_children, self._graph)
+
+
+    def _check_block_heading_children(self, rule: ValidationRule) -> ValidationResult:
+        invalid_children: Iterable[Uid] = (
+            chain.from_iterable(self._invalid_children[VertexType.ROAM_BLOCK_HEADING].values())
+        )
+        return _node_children_result(rule, BLOCK_HEADING_VALID_CHILDREN_TYPES, invalid_children, self._graph)
+
+
+    def _check_children_attribute_appearance(self, rule: ValidationRule) -> ValidationResult:
+        invalid_carrier_nodes: list[RoamVertex] = [self._graph[uid] for uid in self._invalid_carriers['children']]
+        return _attribute_appearance_result(rule, CHILDREN_VALID_CARRIER_TYPES, invalid_carrier_nodes)
+
+
+    def _check_references_attribute_appearance(self, rule: ValidationRule) -> ValidationResult:
+        invalid_carrier_nodes: list[RoamVertex] = [self._graph[uid] for uid in self._invalid_carriers['references']]
+        return _attribute_appearance_result(rule, REFERENCES_VALID_CARRIER_TYPES, invalid_carrier_nodes)
+
+
+    def _check_references_appear_in_content(self, rule: ValidationRule) -> ValidationResult:
+        return _references_appear_in_content_result(rule, self._reference_danglers)
+
+
+_INCREMENTAL_CHECKS: Final[dict[str, Callable[[IncrementalValidator, ValidationRule], ValidationResult]]] = {
+    ROOT_PAGE_RULE.name: IncrementalValidator._check_root_page,
+    CHILDREN_EXIST_RULE.name: IncrementalValidator._check_children_exist,
+    REFERENCES_EXIST_RULE.name: IncrementalValidator._check_references_exist,
+    BLOCK_PARENTS_EXIST_RULE.name: IncrementalValidator._check_block_parents_exist,
+    CHILDREN_VERTEX_TYPES_RULE.name: IncrementalValidator._check_children_vertex_types,
+    PAGE_NODE_CHILDREN_RULE.name: IncrementalValidator._check_page_node_children,
+    BLOCK_HEADING_CHILDREN_RULE.name: IncrementalValidator._check_block_heading_children,
+    CHILDREN_ATTRIBUTE_APPEARANCE_RULE.name: IncrementalValidator._check_children_attribute_appearance,
+    REFERENCES_ATTRIBUTE_APPEARANCE_RULE.name: IncrementalValidator._check_references_attribute_appearance,
+    REFERENCES_APPEAR_IN_CONTENT_RULE.name: IncrementalValidator._check_references_appear_in_content,
+}
+"""``IncrementalValidator`` check for each of the known rules, by ``ValidationRule.name``"""
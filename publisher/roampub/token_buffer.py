@@ -0,0 +1,228 @@
+""" compact, array-backed (struct-of-arrays) store for a stream of markdown_it ``Token``s
+
+Each ``Token`` costs an object, plus an ``attrs`` dict, a ``meta`` dict, a ``map`` list and (for ``inline`` tokens) a
+``children`` list. ``TokenBuffer`` instead keeps one slot per token in parallel ``array``s: the repetitive strings
+(``type``, ``tag``, ``markup``, ``info``) are interned to ``int`` ids, ``nesting``/``level``/``map`` are ``int``s,
+all ``content`` lives in a single arena ``str``, and ``children`` are (start, end) ranges of slots. The rare non-empty
+``attrs`` and ``meta`` are kept sparse. (The same layout as ``VertexStore``, for vertices.)
+
+``TokenBuffer`` is a read-only ``Sequence[Token]`` of the top-level tokens; a ``Token`` (with its children) is only
+created when a consumer indexes or iterates, and each access creates new ``Token``s. It pickles as its arrays and
+arena, so it is also compact to cache, or to ship between processes.
+
+
+Classes:
+
+    TokenBuffer
+
+"""
+from typing import Any, Optional, Iterable, Iterator, Final
+from array import array
+from collections.abc import Sequence
+import logging
+
+from markdown_it.token import Token
+
+logger = logging.getLogger(__name__)
+
+
+# ``_flags`` bits
+_BLOCK: Final[int] = 0x1
+_HIDDEN: Final[int] = 0x2
+_HAS_MAP: Final[int] = 0x4
+# distinguishes ``children is None`` from an empty list
+_HAS_CHILDREN: Final[int] = 0x8
+
+
+class TokenBuffer(Sequence):
+    """
+    Append-only; see ``extend``.
+    """
+
+    def __init__(self: Any, tokens: Iterable[Token] = ()):
+        if any(arg is None for arg in [tokens]):
+            raise ValueError("missing required arg")
+
+        # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        # slots of the top-level tokens, in order; children occupy the other slots
+        self._top: array = array('i')
+
+        # all indexed by slot
+        self._types: array = array('i')
+        self._tags: array = array('i')
+        self._markups: array = array('i')
+        self._infos: array = array('i')
+        self._nestings: array = array('b')
+        self._levels: array = array('h')
+        self._flags: array = array('B')
+        self._map_starts: array = array('i')
+        self._map_ends: array = array('i')
+        self._content_starts: array = array('q')
+        self._content_ends: array = array('q')
+        self._children_starts: array = array('i')
+        self._children_ends: array = array('i')
+
+        # only a few tokens (links, images, fences, ...) have ``attrs`` or ``meta``, so they're kept sparse
+        self._attrs: dict[int, tuple[tuple[str, Any], ...]] = {}
+        self._metas: dict[int, dict] = {}
+
+        # the arena is built from parts as tokens are appended, and joined on the first read after an append
+        self._text_parts: list[str] = []
+        self._text_length: int = 0
+        self._text: str = ''
+        # an ``inline`` token's content is often repeated by its (single) ``text`` child; which is appended next
+        self._last_text: str = ''
+        self._last_text_range: tuple[int, int] = (0, 0)
+
+        self.extend(tokens)
+
+
+    def extend(self, tokens: Iterable[Token]) -> None:
+        """appends ``tokens`` (and their children) as top-level tokens; ``tokens`` may be a lazy stream"""
+        if any(arg is None for arg in [tokens]):
+            raise ValueError("missing required arg")
+
+        for token in tokens:
+            if not isinstance(token, Token):
+                raise TypeError(f"is not instanceof {Token}; token: {token}")
+            slot: int = self._reserve(1)
+            self._top.append(slot)
+            self._fill(slot, token)
+
+
+    def _intern(self, string: str) -> int:
+        id: Optional[int] = self._string_ids.get(string)
+        if id is None:
+            id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = id
+        return id
+
+
+    def _reserve(self, count: int) -> int:
+        """appends ``count`` empty slots; returns the first"""
+        start: int = len(self._types)
+        for slot_array in (
+            self._types, self._tags, self._markups, self._infos, self._nestings, self._levels, self._flags,
+            self._map_starts, self._map_ends, self._content_starts, self._content_ends, self._children_starts,
+            self._children_ends
+        ):
+            slot_array.frombytes(bytes(count * slot_array.itemsize))
+        return start
+
+
+    def _append_text(self, text: str) -> tuple[int, int]:
+        if text == self._last_text:
+            return self._last_text_range
+        start: int = self._text_length
+        self._text_parts.append(text)
+        self._text_length += len(text)
+        self._last_text = text
+        self._last_text_range = (start, self._text_length)
+        return self._last_text_range
+
+
+    def _fill(self, slot: int, token: Token) -> None:
+        self._types[slot] = self._intern(token.type)
+        self._tags[slot] = self._intern(token.tag)
+        self._markups[slot] = self._intern(token.markup)
+        self._infos[slot] = self._intern(token.info)
+        self._nestings[slot] = token.nesting
+        self._levels[slot] = token.level
+        self._content_starts[slot], self._content_ends[slot] = self._append_text(token.content)
+
+        flags: int = (_BLOCK if token.block else 0) | (_HIDDEN if token.hidden else 0)
+        if token.map is not None:
+            flags |= _HAS_MAP
+            self._map_starts[slot], self._map_ends[slot] = token.map
+        if token.attrs:
+            self._attrs[slot] = tuple(token.attrs.items())
+        if token.meta:
+            self._metas[slot] = dict(token.meta)
+
+        if token.children is not None:
+            flags |= _HAS_CHILDREN
+            # siblings occupy contiguous slots; grandchildren follow them
+            children_start: int = self._reserve(len(token.children))
+            self._children_starts[slot] = children_start
+            self._children_ends[slot] = children_start + len(token.children)
+            for offset, child in enumerate(token.children):
+                self._fill(children_start + offset, child)
+        self._flags[slot] = flags
+
+
+    def _arena(self) -> str:
+        if len(self._text) != self._text_length:
+            self._text = self._text + ''.join(self._text_parts)
+            self._text_parts = []
+        return self._text
+
+
+    def _token_at(self, slot: int, arena: str) -> Token:
+        flags: int = self._flags[slot]
+        children: Optional[list[Token]] = None
+        if flags & _HAS_CHILDREN:
+            children = [
+                self._token_at(child_slot, arena)
+                for child_slot in range(self._children_starts[slot], self._children_ends[slot])
+            ]
+        attrs: Optional[tuple[tuple[str, Any], ...]] = self._attrs.get(slot)
+        meta: Optional[dict] = self._metas.get(slot)
+        return Token(
+            type=self._strings[self._types[slot]],
+            tag=self._strings[self._tags[slot]],
+            nesting=self._nestings[slot],
+            attrs=dict(attrs) if attrs else {},
+            map=[self._map_starts[slot], self._map_ends[slot]] if flags & _HAS_MAP else None,
+            level=self._levels[slot],
+            children=children,
+            content=arena[self._content_starts[slot]:self._content_ends[slot]],
+            markup=self._strings[self._markups[slot]],
+            info=self._strings[self._infos[slot]],
+            meta=dict(meta) if meta else {},
+            block=bool(flags & _BLOCK),
+            hidden=bool(flags & _HIDDEN),
+        )
+
+
+    def __getitem__(self, index: int | slice) -> Token | list[Token]:
+        arena: str = self._arena()
+        if isinstance(index, slice):
+            return [self._token_at(slot, arena) for slot in self._top[index]]
+        return self._token_at(self._top[index], arena)
+
+
+    def __iter__(self) -> Iterator[Token]:
+        arena: str = self._arena()
+        return (self._token_at(slot, arena) for slot in self._top)
+
+
+    def __len__(self) -> int:
+        return len(self._top)
+
+
+    def to_tokens(self) -> list[Token]:
+        return list(self)
+
+
+    def __getstate__(self) -> dict[str, Any]:
+        # pickle the joined arena, not its parts; and not the lookup-only ``_string_ids``
+        self._arena()
+        state: dict[str, Any] = self.__dict__.copy()
+        del state['_string_ids']
+        return state
+
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._string_ids = {string: id for id, string in enumerate(self._strings)}
+
+
+    def __repr__(self):
+        clsname: str = type(self).__name__
+        return (
+            f"{clsname}(len: {len(self)}, slots: {len(self._types)}, strings: {len(self._strings)}, "
+            f"text: {self._text_length})"
+        )
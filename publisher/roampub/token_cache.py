@@ -0,0 +1,294 @@
+""" content-addressed cache of markdown_it ``Token``s; lets a rebuild skip re-tokenizing unchanged blocks
+
+Entries are keyed by a hash of the block content, plus everything else that determines its tokens (see
+``token_cache_key``), so an edited block simply misses; nothing ever has to be invalidated. Entries are held as pickled
+``EncodedToken``s (see ``encode_tokens``; the same format in which ``page_dump_tokenize``'s workers send back tokens), 
+in a bounded in-memory LRU, and (optionally) in one file per entry under ``cache_dir``. Every hit decodes a fresh list 
+of ``Token``s, so callers are free to mutate what they get.
+
+N.B. entries aren't ``TokenBuffer``s: its parallel arrays pay off over a long stream, but cost more than they save for
+the few tokens of a single block.
+
+N.B. entry files are written with ``pickle``; only point ``cache_dir`` at directories you trust.
+
+Types:
+
+    TokenCacheKey
+    EncodedToken
+
+
+Classes:
+
+    TokenCache
+
+
+Functions:
+
+    token_cache_key(str, str) -> TokenCacheKey
+    encode_tokens(list[Token]) -> list[EncodedToken]
+    decode_tokens(list[EncodedToken]) -> list[Token]
+
+"""
+from typing import Any, Optional, TypeAlias, Final, BinaryIO, cast
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+
+from markdown_it.token import Token
+
+from common.log import TRACE
+
+logger = logging.getLogger(__name__)
+
+
+TOKEN_CACHE_FORMAT_VERSION: Final[int] = 2
+"""
+bump whenever the format of the entries changes (e.g. how the ``Token``s are pickled)
+
+2: entries are pickled ``EncodedToken``s, rather than pickled ``Token``s
+"""
+
+TOKENIZER_VERSION: Final[int] = 2
+"""
+bump whenever the tokens change, for the same content and options; i.e. whenever the semantics of
+``page_dump_tokenize``, or of a markdown-it plugin that it uses (e.g. ``roam_markdown``, ``block_budget``), change.
+Part of the options that ``page_dump_tokenize`` passes to ``token_cache_key``; which only names the plugins, so can't
+see an edit to one.
+
+2: ``roam_markdown.roam_plugin`` parses the Roam syntax, rather than ``commonmark_normalize`` rewriting it
+"""
+
+TOKEN_FILE_SUFFIX: Final[str] = '.tokens'
+
+DEFAULT_MAX_ENTRIES: Final[int] = 100_000
+
+
+TokenCacheKey: TypeAlias = str
+"""
+hex SHA-256 digest; see ``token_cache_key``
+"""
+
+
+def token_cache_key(content: str, options: str) -> TokenCacheKey:
+    """
+    Args:
+        options (str): a stable rendering of everything, besides ``content``, that determines the tokens (e.g. the
+        parser config, and the normalization rules)
+    """
+    if any(arg is None for arg in [content, options]):
+        raise ValueError("missing required arg")
+
+    prefix: bytes = f"{TOKEN_CACHE_FORMAT_VERSION}\0{options}\0".encode()
+    return hashlib.sha256(prefix + content.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+EncodedToken: TypeAlias = tuple
+"""
+a ``Token``, as a plain tuple of its fields, in ``Token`` field order: (type, tag, nesting, attrs, map, level, 
+children, content, markup, info, meta, block, hidden); where ``attrs`` is a tuple of (name, value) pairs, ``map`` a 
+tuple, ``children`` encoded in turn, and empty ``attrs``/``meta`` are ``None``. Pickles to a fraction of the size of 
+the ``Token`` (no class reference, nor field names, per token), and decodes faster.
+"""
+
+
+def encode_tokens(tokens: list[Token]) -> list[EncodedToken]:
+    return [
+        (
+            token.type, token.tag, token.nesting, tuple(token.attrs.items()) or None, 
+            None if token.map is None else tuple(token.map), token.level, 
+            None if token.children is None else encode_tokens(token.children), 
+            token.content, token.markup, token.info, token.meta or None, token.block, token.hidden
+        )
+        for token in tokens
+    ]
+
+
+def decode_tokens(encoded_tokens: list[EncodedToken]) -> list[Token]:
+    """the inverse of ``encode_tokens``; every call returns new ``Token``s"""
+    return [
+        Token(
+            token_type, tag, nesting, dict(attrs) if attrs else {}, None if token_map is None else list(token_map), 
+            level, None if children is None else decode_tokens(children), 
+            content, markup, info, dict(meta) if meta else {}, block, hidden
+        )
+        for token_type, tag, nesting, attrs, token_map, level, children, content, markup, info, meta, block, hidden 
+        in encoded_tokens
+    ]
+
+
+
+class TokenCache:
+    """
+    Thread safe; one ``TokenCache`` can be shared by all of the threads tokenizing a dump.
+    """
+
+    def __init__(self: Any, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            max_entries (int): the in-memory LRU holds at most this many entries; the on-disk store is unbounded
+            cache_dir (Path): if given, entries are also read from (and written to) files in this directory
+        """
+        if any(arg is None for arg in [max_entries]):
+            raise ValueError("missing required arg")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive; max_entries: {max_entries}")
+        if cache_dir is not None and not isinstance(cache_dir, Path):
+            raise TypeError(f"is not instanceof {Path}; cache_dir: {cache_dir}")
+
+        self._max_entries: int = max_entries
+        self._cache_dir: Optional[Path] = cache_dir
+        self._entries: OrderedDict[TokenCacheKey, bytes] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._disk_hits: int = 0
+        self._misses: int = 0
+
+
+    @property
+    def max_entries(self) -> int:
+        """is read-only"""
+        return self._max_entries
+
+
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        """is read-only"""
+        return self._cache_dir
+
+
+    @property
+    def hits(self) -> int:
+        """is read-only; includes ``disk_hits``"""
+        return self._hits
+
+
+    @property
+    def disk_hits(self) -> int:
+        """is read-only; the hits that missed the in-memory LRU, but were found under ``cache_dir``"""
+        return self._disk_hits
+
+
+    @property
+    def misses(self) -> int:
+        """is read-only"""
+        return self._misses
+
+
+    @property
+    def hit_rate(self) -> float:
+        """is read-only; 0.0 if there have been no lookups"""
+        lookups: int = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+
+    def get(self, key: TokenCacheKey) -> Optional[list[Token]]:
+        """
+        Returns:
+            ``None`` on a miss; otherwise, a fresh copy of the cached tokens
+        """
+        logger.log(TRACE, f"key: {key}")
+        if any(arg is None for arg in [key]):
+            raise ValueError("missing required arg")
+
+        with self._lock:
+            entry: Optional[bytes] = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        if entry is not None:
+            return decode_tokens(pickle.loads(entry))
+
+        entry = self._read_entry(key)
+        tokens: Optional[list[Token]] = None
+        if entry is not None:
+            try:
+                tokens = decode_tokens(pickle.loads(entry))
+            except Exception as e:
+                logger.warning(f"ignoring unreadable entry; key: {key}, error: {e!r}")
+        with self._lock:
+            if tokens is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._remember(key, cast(bytes, entry))
+        return tokens
+
+
+    def put(self, key: TokenCacheKey, tokens: list[Token]) -> None:
+        logger.log(TRACE, f"key: {key}")
+        if any(arg is None for arg in [key, tokens]):
+            raise ValueError("missing required arg")
+
+        entry: bytes = pickle.dumps(encode_tokens(tokens), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, entry)
+        self._write_entry(key, entry)
+
+
+    def clear(self) -> None:
+        """empties the in-memory LRU, and resets the counters; the on-disk store is left alone"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._disk_hits = self._misses = 0
+
+
+    def _remember(self, key: TokenCacheKey, entry: bytes) -> None:
+        """N.B. caller holds ``_lock``"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+    def _entry_path(self, key: TokenCacheKey) -> Path:
+        # fan out on the leading hex digits, so no single directory holds every block of a large graph
+        return cast(Path, self._cache_dir).joinpath(key[:2], f"{key}{TOKEN_FILE_SUFFIX}")
+
+
+    def _read_entry(self, key: TokenCacheKey) -> Optional[bytes]:
+        if self._cache_dir is None:
+            return None
+        path: Path = self._entry_path(key)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"ignoring unreadable entry; path: {path}, error: {e!r}")
+            return None
+
+
+    def _write_entry(self, key: TokenCacheKey, entry: bytes) -> None:
+        """
+        as with ``store_cached_vertex_map``, written to a temporary file, then moved into place; and a failed write is 
+        logged (and the temporary file removed), not raised
+        """
+        if self._cache_dir is None:
+            return
+        path: Path = self._entry_path(key)
+        temp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer: BinaryIO
+            with open(temp_path, "wb") as writer:
+                writer.write(entry)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"not caching on disk; entry can't be written; path: {path}, error: {e!r}")
+            try:
+                temp_path.unlink(missing_ok=True)
+            except OSError as unlink_error:
+                logger.warning(f"temp file can't be removed; temp_path: {temp_path}, error: {unlink_error!r}")
+
+
+    def __repr__(self):
+        clsname: str = type(self).__name__
+        return (
+            f"{clsname}(entries: {len(self._entries)}/{self._max_entries}, cache_dir: {self._cache_dir}, "
+            f"hits: {self._hits}, disk_hits: {self._disk_hits}, misses: {self._misses})"
+        )
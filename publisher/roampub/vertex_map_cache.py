@@ -0,0 +1,155 @@
+""" persistent, binary sidecar cache for the ``VertexMap`` built from a PageDump generated .zip archive
+
+A sidecar file holds a small header (format version + ``CacheKey`` + the names of the validation rules), followed by
+the pickled ``VertexMap`` and its validation verdict. The header is unpickled on its own, so a stale sidecar is 
+detected without decoding the payload. The verdict is only for the rules named in the header; once
+``roam_model.ALL_RULES`` changes, the ``VertexMap`` is still loaded, but as not yet validated.
+
+N.B. sidecars are written with ``pickle``; only point ``cache_dir`` at directories you trust.
+
+Types:
+
+    CacheKey
+
+
+Classes:
+
+    CachedVertexMap
+
+
+Functions:
+
+    cache_key(ZipInfo) -> CacheKey
+    sidecar_path(Path, Path) -> Path
+    load_cached_vertex_map(Path, CacheKey) -> Optional[CachedVertexMap]
+    store_cached_vertex_map(Path, CacheKey, CachedVertexMap) -> None
+
+"""
+from typing import Any, Optional, NamedTuple, TypeAlias, Final, BinaryIO
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from zipfile import ZipInfo
+
+from roampub import roam_model
+from roampub.roam_model import VertexMap, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_FORMAT_VERSION: Final[int] = 3
+"""
+bump whenever the pickled representation of the model classes (or the header) changes shape
+
+3: the header names the validation rules
+"""
+
+SIDECAR_SUFFIX: Final[str] = '.vertex-map'
+
+
+CacheKey: TypeAlias = tuple[int, int, tuple[int, int, int, int, int, int]]
+"""
+(CRC-32, uncompressed size, mtime) of the PageDump.json zip member
+"""
+
+
+class CachedVertexMap(NamedTuple):
+    vertex_map: VertexMap
+    is_validated: bool
+    """
+    ``False`` if the ``VertexMap`` was cached without being validated, or was validated with other rules than the 
+    current ``roam_model.ALL_RULES``; ``validation_result`` is meaningless
+    """
+    validation_result: ValidationResult
+
+
+def cache_key(json_zipinfo: ZipInfo) -> CacheKey:
+    if any(arg is None for arg in [json_zipinfo]):
+        raise ValueError("missing required arg")
+    if not isinstance(json_zipinfo, ZipInfo):
+        raise TypeError(f"is not instanceof {ZipInfo}; json_zipinfo: {json_zipinfo}")
+
+    return (json_zipinfo.CRC, json_zipinfo.file_size, json_zipinfo.date_time)
+
+
+def sidecar_path(zip_path: Path, cache_dir: Path) -> Path:
+    """
+    Returns:
+        the sidecar for ``zip_path`` in ``cache_dir``; named for the stem and a digest of the resolved path, so that
+        same-named archives in different directories don't overwrite each other's sidecar
+    """
+    if any(arg is None for arg in [zip_path, cache_dir]):
+        raise ValueError("missing required arg")
+
+    path_digest: str = hashlib.sha256(str(zip_path.resolve()).encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+    return cache_dir.joinpath(f"{zip_path.stem}.{path_digest}{SIDECAR_SUFFIX}")
+
+
+def _rule_names() -> tuple[str, ...]:
+    # N.B. looked up on each call; ``ALL_RULES`` is meant to be edited (e.g. to disable a rule)
+    return tuple(rule.name for rule in roam_model.ALL_RULES)
+
+
+def load_cached_vertex_map(path: Path, key: CacheKey) -> Optional[CachedVertexMap]:
+    """
+    Returns:
+        ``None``: if there is no sidecar at ``path``, or it was written for a different ``key`` (or format version),
+        or it can't be read. If it was validated with other rules than the current ``roam_model.ALL_RULES``, it is 
+        returned as not validated.
+    """
+    logger.debug(f"path: {path}, key: {key}")
+    if any(arg is None for arg in [path, key]):
+        raise ValueError("missing required arg")
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "rb") as reader:
+            header: Any = pickle.load(reader)
+            logger.debug(f"header: {header}")
+            if not isinstance(header, tuple) or header[:2] != (CACHE_FORMAT_VERSION, key):
+                return None
+            cached: Any = pickle.load(reader)
+    # N.B. unpickling a corrupt payload can raise almost anything (e.g. ``ValueError``, ``KeyError``, ``TypeError``)
+    except Exception as e:
+        logger.warning(f"ignoring unreadable sidecar; path: {path}, error: {e!r}")
+        return None
+
+    if not isinstance(cached, CachedVertexMap):
+        logger.warning(f"ignoring sidecar with unexpected payload; path: {path}")
+        return None
+
+    if cached.is_validated and header[2:] != (_rule_names(),):
+        logger.info(f"validation rules have changed; ignoring cached validation_result; path: {path}")
+        return cached._replace(is_validated=False, validation_result=None)
+    return cached
+
+
+def store_cached_vertex_map(path: Path, key: CacheKey, cached: CachedVertexMap) -> None:
+    """
+    The sidecar is written to a temporary file, then moved into place; so a concurrent reader sees either the old
+    sidecar or the new one, never a partial write. The cache is only an optimization; so a failed write is logged
+    (and the temporary file removed), not raised.
+    """
+    logger.debug(f"path: {path}, key: {key}")
+    if any(arg is None for arg in [path, key, cached]):
+        raise ValueError("missing required arg")
+    if not isinstance(cached, CachedVertexMap):
+        raise TypeError(f"is not instanceof {CachedVertexMap}; cached: {cached}")
+
+    temp_path: Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer: BinaryIO
+        with open(temp_path, "wb") as writer:
+            pickle.dump((CACHE_FORMAT_VERSION, key, _rule_names()), writer, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(cached, writer, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except Exception as e:
+        logger.warning(f"not caching; sidecar can't be written; path: {path}, error: {e!r}")
+        try:
+            temp_path.unlink(missing_ok=True)
+        except OSError as unlink_error:
+            logger.warning(f"temp file can't be removed; temp_path: {temp_path}, error: {unlink_error!r}")
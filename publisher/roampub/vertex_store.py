@@ -0,0 +1,293 @@
+""" columnar (struct-of-arrays) backing store for a Roam graph; an alternative to the object-per-vertex ``VertexMap``
+
+Every ``Uid`` (vertex, or link target) is interned to a dense ``int`` id. All per-vertex scalars live in ``array``s
+indexed by that id, ``children`` and ``references`` are CSR-style (start, end) ranges into shared id arrays, and all
+text lives in a single arena ``str``. ``VertexStore`` is a read-only ``VertexMapping``; each lookup returns
+a lightweight flyweight proxy, which is an instance of the corresponding ``roam_model`` class, so any code that reads
+a ``VertexMap`` (e.g. ``page_dump_export``, ``page_dump_tokenize``, ``roam_model.validate``) works unchanged.
+
+N.B. proxies are created on every lookup: they are equal in content, but not identical (``is``), across lookups; and
+mutating a proxy's ``children`` or ``references`` list does not change the store.
+
+
+Classes:
+
+    VertexStore
+
+"""
+from typing import Any, Optional, Iterable, Iterator, Callable, Final, cast
+from array import array
+import logging
+
+from common.types import Url
+from common.introspect import get_attributes, get_property_names
+from roampub.roam_model import (
+    Uid, VertexType, MediaType, VertexMapping, RoamVertex, RoamNode, PageNode, BlockHeadingNode, BlockContentNode, 
+    FileVertex, ReferenceSpan, scan_references
+)
+
+logger = logging.getLogger(__name__)
+
+
+_VERTEX_TYPES: Final[tuple[VertexType, ...]] = tuple(VertexType)
+_MEDIA_TYPES: Final[tuple[MediaType, ...]] = tuple(MediaType)
+
+# ``_vertex_types`` code for interned ids that are only link targets (i.e. not vertices of the graph)
+_NOT_A_VERTEX: Final[int] = -1
+
+# ``_flags`` bits; distinguish an absent (``None``) link list from an empty one
+_HAS_CHILDREN: Final[int] = 0x1
+_HAS_REFERENCES: Final[int] = 0x2
+
+
+class VertexStore(VertexMapping):
+    """
+    Iteration order is the order in which the vertices were supplied (as with ``VertexMap``). As with
+    ``create_vertex_map``, a repeated ``Uid`` replaces the earlier vertex, but keeps its position.
+    """
+
+    def __init__(self: Any, vertices: Iterable[RoamVertex]):
+        if any(arg is None for arg in [vertices]):
+            raise ValueError("missing required arg")
+
+        # PEP 8: "Use one leading underscore only for non-public methods and instance variables."
+        self._uids: list[Uid] = []
+        self._ids: dict[Uid, int] = {}
+        # interned ids of the vertices, in graph order
+        self._order: array = array('i')
+
+        # all indexed by interned id
+        self._vertex_types: array = array('b')
+        self._media_types: array = array('b')
+        self._flags: array = array('b')
+        self._levels: array = array('b')
+        self._text_starts: array = array('q')
+        self._text_ends: array = array('q')
+        self._children_starts: array = array('i')
+        self._children_ends: array = array('i')
+        self._references_starts: array = array('i')
+        self._references_ends: array = array('i')
+
+        # interned ids of link targets; sliced by the (start, end) ranges above
+        self._children: array = array('i')
+        self._references: array = array('i')
+        # only ``FileVertex``s have a ``source``, so it's kept sparse
+        self._sources: dict[int, Url] = {}
+        # ``BlockContentNode.reference_spans()``, by id; kept here, as the proxies don't outlive a lookup
+        self._reference_spans: dict[int, tuple[ReferenceSpan, ...]] = {}
+
+        text_parts: list[str] = []
+        text_length: int = 0
+        for vertex in vertices:
+            text: str = self._add_vertex(vertex, text_length)
+            text_parts.append(text)
+            text_length += len(text)
+
+        self._text: str = ''.join(text_parts)
+        logger.debug(f"len(_order): {len(self._order)}, len(_uids): {len(self._uids)}, len(_text): {len(self._text)}")
+
+
+    def _intern(self, uid: Uid) -> int:
+        id: Optional[int] = self._ids.get(uid)
+        if id is not None:
+            return id
+
+        id = len(self._uids)
+        self._uids.append(uid)
+        self._ids[uid] = id
+        self._vertex_types.append(_NOT_A_VERTEX)
+        self._media_types.append(0)
+        self._flags.append(0)
+        self._levels.append(0)
+        self._text_starts.append(0)
+        self._text_ends.append(0)
+        self._children_starts.append(0)
+        self._children_ends.append(0)
+        self._references_starts.append(0)
+        self._references_ends.append(0)
+        return id
+
+
+    def _add_vertex(self, vertex: RoamVertex, text_start: int) -> str:
+        """returns the vertex's text, which the caller appends to the arena at ``text_start``"""
+        if not isinstance(vertex, RoamVertex):
+            raise TypeError(f"is not instanceof {RoamVertex}; vertex: {vertex}")
+
+        id: int = self._intern(vertex.uid)
+        if self._vertex_types[id] == _NOT_A_VERTEX:
+            self._order.append(id)
+        self._vertex_types[id] = _VERTEX_TYPES.index(vertex.vertex_type)
+        self._media_types[id] = _MEDIA_TYPES.index(vertex.media_type)
+
+        text: str
+        match vertex.vertex_type:
+            case VertexType.ROAM_PAGE:
+                text = cast(PageNode, vertex).title
+            case VertexType.ROAM_BLOCK_HEADING:
+                text = cast(BlockHeadingNode, vertex).heading
+                self._levels[id] = cast(BlockHeadingNode, vertex).level
+            case VertexType.ROAM_BLOCK_CONTENT:
+                text = cast(BlockContentNode, vertex).content
+            case VertexType.ROAM_FILE:
+                text = cast(FileVertex, vertex).file_name
+                self._sources[id] = cast(FileVertex, vertex).source
+            case _:
+                raise ValueError(f"unrecognized vertex_type: {vertex.vertex_type}")
+        self._text_starts[id] = text_start
+        self._text_ends[id] = text_start + len(text)
+
+        flags: int = 0
+        if isinstance(vertex, RoamNode):
+            node: RoamNode = cast(RoamNode, vertex)
+            if node.children is not None:
+                flags |= _HAS_CHILDREN
+                self._children_starts[id] = len(self._children)
+                self._children.extend(self._intern(uid) for uid in node.children)
+                self._children_ends[id] = len(self._children)
+            if node.references is not None:
+                flags |= _HAS_REFERENCES
+                self._references_starts[id] = len(self._references)
+                self._references.extend(self._intern(uid) for uid in node.references)
+                self._references_ends[id] = len(self._references)
+        self._flags[id] = flags
+
+        return text
+
+
+    def _vertex_id(self, uid: Uid) -> Optional[int]:
+        id: Optional[int] = self._ids.get(uid)
+        if id is None or self._vertex_types[id] == _NOT_A_VERTEX:
+            return None
+        return id
+
+
+    def _text_of(self, id: int) -> str:
+        return self._text[self._text_starts[id]:self._text_ends[id]]
+
+
+    def _reference_spans_of(self, id: int) -> tuple[ReferenceSpan, ...]:
+        # the store is read-only; so, unlike ``BlockContentNode``'s, this cache never goes stale
+        spans: Optional[tuple[ReferenceSpan, ...]] = self._reference_spans.get(id)
+        if spans is None:
+            spans = tuple(scan_references(self._text_of(id)))
+            self._reference_spans[id] = spans
+        return spans
+
+
+    def _children_of(self, id: int) -> Optional[list[Uid]]:
+        if not self._flags[id] & _HAS_CHILDREN:
+            return None
+        return [self._uids[c] for c in self._children[self._children_starts[id]:self._children_ends[id]]]
+
+
+    def _references_of(self, id: int) -> Optional[list[Uid]]:
+        if not self._flags[id] & _HAS_REFERENCES:
+            return None
+        return [self._uids[r] for r in self._references[self._references_starts[id]:self._references_ends[id]]]
+
+
+    def __getitem__(self, key: Uid) -> RoamVertex:
+        id: Optional[int] = self._vertex_id(key)
+        if id is None:
+            raise KeyError(key)
+
+        proxy_class: type[_StoredVertex] = _PROXY_CLASSES[_VERTEX_TYPES[self._vertex_types[id]]]
+        proxy: _StoredVertex = proxy_class.__new__(proxy_class)
+        proxy._store = self
+        proxy._id = id
+        return cast(RoamVertex, proxy)
+
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._vertex_id(key) is not None
+
+
+    def __iter__(self) -> Iterator[Uid]:
+        return (self._uids[id] for id in self._order)
+
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+    def __repr__(self):
+        clsname: str = type(self).__name__
+        return f"{clsname}(len: {len(self)}, interned: {len(self._uids)}, text: {len(self._text)})"
+
+
+class _StoredVertex:
+    """
+    Mixin for the flyweight proxies. A proxy holds only (store, id); the ``roam_model`` classes' read-only properties
+    read private attributes (``_uid``, ``_children``, ...), which ``__getattr__`` resolves against the store.
+    """
+    _store: VertexStore
+    _id: int
+    _FIELDS: dict[str, Callable[[VertexStore, int], Any]] = {}
+
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when normal lookup fails; guard against recursion before ``_store`` is assigned
+        if name in ('_store', '_id', '_FIELDS'):
+            raise AttributeError(name)
+        field: Optional[Callable[[VertexStore, int], Any]] = type(self)._FIELDS.get(name)
+        if field is None:
+            raise AttributeError(name)
+        return field(self._store, self._id)
+
+
+    def __repr__(self):
+        # present as the model class (e.g. ``PageNode<...>``), with the same properties as ``RoamVertex.__repr__``
+        model_class: type = type(self).__bases__[1]
+        uid: Uid = self._store._uids[self._id]
+        uid_string: str = uid[-9:] if len(uid) > 9 else uid
+        property_values: dict[str, Any] = get_attributes(self, get_property_names(model_class, True))
+        property_values = {k:v for k,v in property_values.items() if k not in ['uid', 'vertex_type', 'media_type']}
+        vertex: RoamVertex = cast(RoamVertex, self)
+        return f"{model_class.__name__}<{uid_string}>({vertex.vertex_type}, {vertex.media_type}, {property_values})"
+
+
+_VERTEX_FIELDS: Final[dict[str, Callable[[VertexStore, int], Any]]] = {
+    '_uid': lambda store, id: store._uids[id],
+    '_media_type': lambda store, id: _MEDIA_TYPES[store._media_types[id]],
+}
+
+_NODE_FIELDS: Final[dict[str, Callable[[VertexStore, int], Any]]] = _VERTEX_FIELDS | {
+    '_children': VertexStore._children_of,
+    '_references': VertexStore._references_of,
+}
+
+
+# N.B. ``_StoredVertex`` comes first in the bases, so that its ``__repr__`` overrides ``RoamVertex.__repr__``
+class _StoredPageNode(_StoredVertex, PageNode):
+    _FIELDS = _NODE_FIELDS | {'_title': VertexStore._text_of}
+
+
+class _StoredBlockHeadingNode(_StoredVertex, BlockHeadingNode):
+    _FIELDS = _NODE_FIELDS | {
+        '_heading': VertexStore._text_of,
+        '_level': lambda store, id: store._levels[id],
+    }
+
+
+class _StoredBlockContentNode(_StoredVertex, BlockContentNode):
+    _FIELDS = _NODE_FIELDS | {'_content': VertexStore._text_of}
+
+
+    def reference_spans(self) -> tuple[ReferenceSpan, ...]:
+        """see ``BlockContentNode.reference_spans``; cached by the store, so shared by every proxy for this vertex"""
+        return self._store._reference_spans_of(self._id)
+
+
+class _StoredFileVertex(_StoredVertex, FileVertex):
+    _FIELDS = _VERTEX_FIELDS | {
+        '_file_name': VertexStore._text_of,
+        '_source': lambda store, id: store._sources[id],
+    }
+
+
+_PROXY_CLASSES: Final[dict[VertexType, type[_StoredVertex]]] = {
+    VertexType.ROAM_PAGE: _StoredPageNode,
+    VertexType.ROAM_BLOCK_HEADING: _StoredBlockHeadingNode,
+    VertexType.ROAM_BLOCK_CONTENT: _StoredBlockContentNode,
+    VertexType.ROAM_FILE: _StoredFileVertex,
+}
@@ -0,0 +1,161 @@
+from typing import cast
+import logging
+import time
+import unittest
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump_tokenize import *
+from roampub.token_cache import TokenCache
+from roampub.block_budget import *
+import roampub.commonmark_normalize as norm
+
+
+# known pathological inputs; each stalls an unguarded build for seconds (or, for the larger sizes, minutes)
+PATHOLOGICAL_INPUTS: dict[str, Callable[[int], str]] = {
+    # ``balance_pairs`` is quadratic in the number of delimiters
+    'nested emphasis': lambda n: '*' * n + 'a' + '*' * n,
+    'nested roam italics': lambda n: '__*' * n,
+    # each label is scanned to the end of the content
+    'unclosed links': lambda n: '[a](' * n,
+    'unclosed page references': lambda n: '[[a' * n,
+    # ``PARA_BREAK_PATTERN`` backtracks through the whole run, from every offset in it
+    'blank lines before a space': lambda n: '>a' + '\n' * n + ' b',
+}
+
+
+class BlockBudgetTests(unittest.TestCase):
+
+    def test_tokenize_pathological_inputs(self):
+        budget: BlockBudget = BlockBudget(max_seconds=0.5)
+        config: ParserConfig = DEFAULT_PARSER_CONFIG._replace(budget=budget)
+        for name, create_content in PATHOLOGICAL_INPUTS.items():
+            node: BlockContentNode = BlockContentNode(
+                'pathological', MediaType.TEXT_PLAIN, create_content(20_000), [], None
+            )
+            for normalize_to_cm in (False, True):
+                start: float = time.perf_counter()
+                tokens: list[Token] = tokenize_block_content_node(node, normalize_to_cm, config)
+                elapsed: float = time.perf_counter() - start
+                logging.info(f"name: {name}, normalize_to_cm: {normalize_to_cm}, elapsed: {elapsed:.3f}")
+                # the deadline is only checked between rules; so allow for the one in progress
+                self.assertLess(elapsed, budget.max_seconds + 0.5, name)
+                self.assertTrue(tokens)
+
+        # over budget: the content as one paragraph of literal text, and the uid is reported
+        node = BlockContentNode('pathological', MediaType.TEXT_PLAIN, PATHOLOGICAL_INPUTS['nested emphasis'](5_000))
+        with self.assertLogs('roampub.page_dump_tokenize', logging.WARNING) as logs:
+            tokens = tokenize_block_content_node(node, True)
+        self.assertIn('uid: pathological', logs.output[0])
+        self.assertIn('max_delimiters', logs.output[0])
+        self.assertEqual(
+            [(t.type, t.content) for t in tokens],
+            [('paragraph_open', ''), ('inline', node.content), ('paragraph_close', '')]
+        )
+        self.assertEqual(cast(list[Token], tokens[1].children)[0].content, node.content)
+
+        node = BlockContentNode('huge', MediaType.TEXT_PLAIN, 'a *b*\n' * 20_000)
+        with self.assertLogs('roampub.page_dump_tokenize', logging.WARNING) as logs:
+            tokens = tokenize_block_content_node(node)
+        self.assertIn('uid: huge', logs.output[0])
+        self.assertIn('max_size', logs.output[0])
+        self.assertEqual(tokens[0].map, [0, 20_001])
+
+        # within budget, the budget doesn't change the tokens
+        content: str = "__Roam__ *MarkDown*, [[with]] a [link](http://x.org)\n\n- and\n- a list"
+        node = BlockContentNode('fine', MediaType.TEXT_PLAIN, content)
+        for normalize_to_cm in (False, True):
+            self.assertEqual(
+                [t.as_dict() for t in tokenize_block_content_node(node, normalize_to_cm, config)],
+                [t.as_dict() for t in tokenize_block_content_node(
+                    node, normalize_to_cm, DEFAULT_PARSER_CONFIG._replace(budget=None)
+                )]
+            )
+
+
+    def test_tokenize_node_over_budget(self):
+        """over-budget blocks are reported, and not cached, on every path; serial, batch, and parallel"""
+        graph: VertexMap = OrderedDict((vertex.uid, vertex) for vertex in [
+            PageNode('page', MediaType.TEXT_PLAIN, 'Page', ['fine', 'pathological'], None),
+            BlockContentNode('fine', MediaType.TEXT_PLAIN, 'some *content*', [], None),
+            BlockContentNode('pathological', MediaType.TEXT_PLAIN, '*' * 5_000 + 'a' + '*' * 5_000, [], None),
+        ])
+        cache: TokenCache = TokenCache()
+        unbudgeted_config: ParserConfig = DEFAULT_PARSER_CONFIG._replace(budget=None)
+        expected: list[dict] = [
+            t.as_dict() for t in tokenize_node(cast(RoamNode, graph['page']), graph, False, unbudgeted_config)
+        ]
+        # reported again on the second pass; so the fallback wasn't cached
+        for executor in (None, ThreadPoolExecutor(max_workers=2)):
+            with self.assertLogs('roampub.page_dump_tokenize', logging.WARNING) as logs:
+                tokens: list[Token] = tokenize_node(
+                    cast(RoamNode, graph['page']), graph, False, cache=cache, executor=executor
+                )
+            self.assertEqual(len(logs.output), 1)
+            self.assertIn('uid: pathological', logs.output[0])
+            # the heading, and the 'fine' block, are as parsed; the pathological block is literal text
+            self.assertEqual([t.as_dict() for t in tokens[:6]], expected[:6])
+            self.assertEqual([t.type for t in tokens[6:]], ['paragraph_open', 'inline', 'paragraph_close'])
+        with self.assertLogs('roampub.page_dump_tokenize', logging.WARNING) as logs:
+            tokenize_block_content_nodes([cast(BlockContentNode, graph['pathological'])])
+        self.assertIn('uid: pathological', logs.output[0])
+
+
+    def test_normalize_pathological_inputs(self):
+        content: str = PATHOLOGICAL_INPUTS['blank lines before a space'](5_000)
+        with self.assertLogs('roampub.commonmark_normalize', logging.WARNING) as logs:
+            normalized_content: str = norm.normalize_block_content(
+                content, budget=BlockBudget(max_seconds=0.01), uid='slow'
+            )
+        self.assertIn('uid: slow', logs.output[0])
+        self.assertEqual(normalized_content, content)
+
+        content = '__a__ ' * 20_000
+        with self.assertLogs('roampub.commonmark_normalize', logging.WARNING) as logs:
+            normalized_content = norm.normalize_block_content(content, budget=BlockBudget(max_size=1_000), uid='huge')
+        self.assertIn('uid: huge', logs.output[0])
+        self.assertEqual(normalized_content, content)
+
+        self.assertEqual(norm.normalize_block_content('__a__', budget=DEFAULT_BLOCK_BUDGET), '*a*')
+        with self.assertRaises(TypeError):
+            norm.normalize_block_content('__a__', budget=1.0) # type: ignore
+
+
+    def test_budget_plugin(self):
+        parser: MarkdownIt = MarkdownIt('commonmark').use(budget_plugin)
+        content: str = PATHOLOGICAL_INPUTS['unclosed links'](20_000)
+        with self.assertRaises(BlockBudgetExceeded):
+            parser.parse(content, budget_env(BlockBudget(max_seconds=0.1)))
+        with self.assertRaises(BlockBudgetExceeded):
+            parser.parse(PATHOLOGICAL_INPUTS['nested emphasis'](100), budget_env(BlockBudget(max_delimiters=10)))
+        # the time limit is opt-in; so, by default, only the size and delimiter limits apply
+        self.assertIsNone(DEFAULT_BLOCK_BUDGET.max_seconds)
+        self.assertEqual(
+            [t.as_dict() for t in parser.parse('*a* [b](c)', budget_env(DEFAULT_BLOCK_BUDGET))],
+            [t.as_dict() for t in MarkdownIt('commonmark').parse('*a* [b](c)')]
+        )
+        check_elapsed(0.0, DEFAULT_BLOCK_BUDGET)
+        # without a budget in the env, the rules do nothing
+        self.assertEqual(
+            [t.as_dict() for t in parser.parse('*a* [b](c)')],
+            [t.as_dict() for t in MarkdownIt('commonmark').parse('*a* [b](c)')]
+        )
+
+        with self.assertRaises(TypeError):
+            budget_env((1, 2, 3)) # type: ignore
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 from typing import Any, TextIO
 import re
+import random
 import logging
 import unittest
 
@@ -299,6 +300,75 @@ class CommonMarkNormalizeTests(unittest.TestCase):
 
 
 
+    def test_normalization_pipeline(self):
+        pipeline: norm.NormalizationPipeline = norm.NormalizationPipeline(norm.ALL_RULES)
+        self.assertTrue(pipeline.is_fused)
+
+        # a para break, inside italics; run sequentially, the para break is rewritten first, so the italics don't match
+        input: str = ">__a??b__ __c__"
+        output: str = ">__a\n>\n>b* *c__"
+        self.assertEqual(norm._normalize_sequentially(norm.ALL_RULES, input), output)
+        self.assertEqual(pipeline.normalize(input), output)
+        self.assertEqual(pipeline.normalize("__a??b__ __c__"), "*a??b* *c*")
+
+        # identical to the rules run sequentially
+        random.seed(0)
+        alphabet: str = ">_?\r\n \t`ab*"
+        for _ in range(5000):
+            input = ''.join(random.choice(alphabet) for _ in range(random.randint(0, 16)))
+            self.assertEqual(pipeline.normalize(input), norm._normalize_sequentially(norm.ALL_RULES, input), input)
+
+        # recompiled when ALL_RULES changes
+        input = ">hello\n\n__cruel__ world"
+        self.assertEqual(norm.normalize_block_content(input), ">hello\n>\n>*cruel* world")
+        norm.ALL_RULES.remove(norm.ITALICS_RULE)
+        try:
+            self.assertEqual(norm.normalize_block_content(input), ">hello\n>\n>__cruel__ world")
+            # a rule without a fused form is run sequentially, with the others
+            norm.ALL_RULES.append(norm.NormalizationRule(
+                'UpperRule', 'upper-cases everything', lambda rule, content: norm.NormalizationResult(content.upper(), False)
+            ))
+            self.assertEqual(norm.normalize_block_content(input), ">HELLO\n>\n>__CRUEL__ WORLD")
+            del norm.ALL_RULES[-1]
+        finally:
+            norm.ALL_RULES.append(norm.ITALICS_RULE)
+        self.assertEqual(norm.normalize_block_content(input), ">hello\n>\n>*cruel* world")
+
+
+    def test_normalization_cache(self):
+        cache: norm.NormalizationCache = norm.NormalizationCache(max_entries=2)
+        input: str = ">hello\n\n__cruel__ world"
+        self.assertEqual(norm.normalize_block_content(input, cache), ">hello\n>\n>*cruel* world")
+        self.assertEqual(norm.normalize_block_content(input, cache), ">hello\n>\n>*cruel* world")
+        self.assertEqual((cache.hits, cache.misses, cache.hit_rate, len(cache)), (1, 1, 0.5, 1))
+
+        # least recently used is evicted
+        norm.normalize_block_content("__a__", cache)
+        norm.normalize_block_content(input, cache)
+        norm.normalize_block_content("__b__", cache)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 3, 2))
+        norm.normalize_block_content("__a__", cache)
+        self.assertEqual(cache.misses, 4)
+
+        # dropped when ALL_RULES changes
+        norm.ALL_RULES.remove(norm.ITALICS_RULE)
+        try:
+            self.assertEqual(norm.normalize_block_content(input, cache), ">hello\n>\n>__cruel__ world")
+            self.assertEqual((cache.invalidations, len(cache)), (1, 1))
+        finally:
+            norm.ALL_RULES.append(norm.ITALICS_RULE)
+        self.assertEqual(norm.normalize_block_content(input, cache), ">hello\n>\n>*cruel* world")
+        self.assertEqual(cache.invalidations, 2)
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, cache.invalidations, len(cache)), (0, 0, 0, 0))
+
+        with self.assertRaises(ValueError):
+            norm.NormalizationCache(max_entries=0)
+        with self.assertRaises(TypeError):
+            norm.normalize_block_content(input, {}) # type: ignore
+
+
     def setUp(self):
         configure_logging(logging.DEBUG)
         logging.debug("logging configured")
@@ -0,0 +1,35 @@
+""" synthetic graphs, shared by the tests
+
+Functions:
+
+    synthetic_vertex_map(int) -> VertexMap
+    deep_vertex_map(int) -> VertexMap
+
+"""
+from collections import OrderedDict
+
+from roampub.roam_model import Uid, MediaType, VertexMap, RoamVertex, PageNode, BlockContentNode
+
+
+def synthetic_vertex_map(block_count: int) -> VertexMap:
+    """a page, with ``block_count`` one-line blocks; the typical shape of a Roam outline"""
+    block_uids: list[Uid] = [f"b{i}" for i in range(block_count)]
+    vertices: list[RoamVertex] = [PageNode('page', MediaType.TEXT_PLAIN, 'Synthetic', block_uids, None)]
+    vertices += [
+        BlockContentNode(
+            uid, MediaType.TEXT_PLAIN,
+            f"block {i}, with *emphasis*, __italics__, a [link](https://x.org/{i}) and [[page]]", [], None
+        )
+        for i, uid in enumerate(block_uids)
+    ]
+    return OrderedDict((v.uid, v) for v in vertices)
+
+
+def deep_vertex_map(depth: int) -> VertexMap:
+    """a page, with a chain of ``depth`` nested blocks"""
+    vertices: list[RoamVertex] = [PageNode('page', MediaType.TEXT_PLAIN, 'Deep', ['b0'], None)]
+    vertices += [
+        BlockContentNode(f"b{i}", MediaType.TEXT_PLAIN, f"block {i}", [f"b{i+1}"] if i < depth - 1 else [], None)
+        for i in range(depth)
+    ]
+    return OrderedDict((v.uid, v) for v in vertices)
@@ -0,0 +1,131 @@
+import logging
+import pickle
+import timeit
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.page_dump_export import export_node_str
+from roampub.frozen_model import *
+from roampub.frozen_model import _freeze_links
+
+class FrozenModelTests(unittest.TestCase):
+
+
+    def test_freeze_vertex_map(self):
+        for json_path in [Path('./tests/data/Creative Brief.json'), Path('./tests/data/Page 3.json')]:
+            vertex_map: VertexMap = load_json_dump(json_path)
+            frozen_map: VertexMap = freeze_vertex_map(vertex_map)
+            self.assertEqual(list(frozen_map), list(vertex_map))
+            self.assertIsNone(validate(frozen_map))
+            root: RoamNode = cast(RoamNode, get_first_value(frozen_map))
+            self.assertEqual(export_node_str(root, frozen_map), export_node_str(root, vertex_map))
+
+            for uid, vertex in vertex_map.items():
+                frozen: RoamVertex = frozen_map[uid]
+                self.assertIsInstance(frozen, FrozenRoamVertex)
+                self.assertIsInstance(frozen, type(vertex))
+                self.assertIs(freeze_vertex(frozen), frozen)
+                self.assertEqual(frozen.vertex_type, vertex.vertex_type)
+                self.assertTrue(repr(frozen).startswith(f"Frozen{type(vertex).__name__}<"))
+                if isinstance(vertex, RoamNode):
+                    frozen_node: RoamNode = cast(RoamNode, frozen)
+                    self.assertEqual(frozen_node.children, _freeze_links(vertex.children))
+                    self.assertEqual(frozen_node.references, _freeze_links(vertex.references))
+
+        with self.assertRaises(TypeError):
+            freeze_vertex_map(dict())  # type: ignore
+        with self.assertRaises(TypeError):
+            freeze_vertex('not a vertex')  # type: ignore
+
+
+    def test_immutable_hashable(self):
+        node: FrozenBlockContentNode = FrozenBlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'content', ['uid.1'])
+        self.assertEqual(node.children, ('uid.1',))
+        # omitted links are empty, as with ``RoamNode``; ``None`` only if passed
+        self.assertEqual(node.references, ())
+        self.assertEqual(BlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'content', ['uid.1']).references, [])
+        self.assertIsNone(FrozenBlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'content', None, None).references)
+        for frozen_node in [
+            FrozenPageNode('page', MediaType.TEXT_PLAIN, 'Page'),
+            FrozenBlockHeadingNode('heading', MediaType.TEXT_PLAIN, 'heading', 1),
+        ]:
+            self.assertEqual((frozen_node.children, frozen_node.references), ((), ()))
+        with self.assertRaises(AttributeError):
+            node._content = 'changed'  # type: ignore
+        with self.assertRaises(AttributeError):
+            setattr(node, 'children', ['uid.2'])
+        with self.assertRaises(AttributeError):
+            del node._uid
+        self.assertFalse(hasattr(node, '__dict__'))
+
+        same: FrozenBlockContentNode = FrozenBlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'content', ('uid.1',))
+        other: FrozenBlockContentNode = FrozenBlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'other', ('uid.1',))
+        self.assertEqual(node, same)
+        self.assertEqual(hash(node), hash(same))
+        self.assertNotEqual(node, other)
+        self.assertNotEqual(node, FrozenPageNode('uid.0', MediaType.TEXT_PLAIN, 'content', ('uid.1',)))
+        self.assertEqual(len({node, same, other}), 2)
+
+        heading: FrozenBlockHeadingNode = FrozenBlockHeadingNode('uid.2', MediaType.TEXT_PLAIN, 'heading', 2)
+        file_vertex: FrozenFileVertex = FrozenFileVertex('uid.3', MediaType.IMAGE_JPEG, 'flower.jpeg', 'https://x')
+        for vertex in [node, other, heading, file_vertex]:
+            self.assertEqual(pickle.loads(pickle.dumps(vertex)), vertex)
+
+        with self.assertRaises(ValueError):
+            FrozenPageNode('uid.4', MediaType.TEXT_PLAIN, None)  # type: ignore
+        with self.assertRaises(TypeError):
+            FrozenPageNode('uid.4', 'text/plain', 'title')  # type: ignore
+        # abstract; as is ``RoamVertex``
+        with self.assertRaises(TypeError):
+            FrozenRoamVertex('uid.4', MediaType.TEXT_PLAIN)  # type: ignore
+        with self.assertRaises(TypeError):
+            FrozenRoamNode('uid.4', MediaType.TEXT_PLAIN)  # type: ignore
+
+
+    def test_benchmark(self):
+        """
+        measures memory and attribute-access time of the ``Frozen*`` classes against the ``roam_model`` classes
+        """
+        count: int = 20000
+        uids: list[Uid] = [f"block-{i:07d}" for i in range(count)]
+        contents: list[str] = [f"content of block {i}" for i in range(count)]
+
+        tracemalloc.start()
+        nodes: list[RoamNode] = [
+            BlockContentNode(uid, MediaType.TEXT_PLAIN, content, [uid], None) for uid, content in zip(uids, contents)
+        ]
+        nodes_size: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        frozen_nodes: list[FrozenRoamNode] = [
+            FrozenBlockContentNode(uid, MediaType.TEXT_PLAIN, content, [uid], None) 
+            for uid, content in zip(uids, contents)
+        ]
+        frozen_size: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        access_seconds: float = timeit.timeit(lambda: [(n.uid, n.children, n.content) for n in nodes], number=5)  # type: ignore
+        frozen_access_seconds: float = (
+            timeit.timeit(lambda: [(n.uid, n.children, n.content) for n in frozen_nodes], number=5)  # type: ignore
+        )
+        logging.info(
+            f"count: {count}, nodes_size: {nodes_size}, frozen_size: {frozen_size}, "
+            f"access_seconds: {access_seconds:.4f}, frozen_access_seconds: {frozen_access_seconds:.4f}"
+        )
+        self.assertLess(frozen_size, nodes_size)
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
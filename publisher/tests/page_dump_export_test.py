@@ -1,3 +1,4 @@
+import io
 import logging
 import unittest
 from collections.abc import Mapping
@@ -13,6 +14,8 @@ from roampub.roam_model import *
 from roampub.page_dump import *
 from roampub.page_dump_export import *
 
+from tests.data.graph_fixtures import deep_vertex_map
+
 class PageDumpExportTests(unittest.TestCase):
 
 
@@ -57,6 +60,41 @@ class PageDumpExportTests(unittest.TestCase):
         self.assertEqual(export_md, expected_md)
 
 
+    def test_export_node(self):
+        class WriteRecorder(io.StringIO):
+            def __init__(self):
+                super().__init__()
+                self.largest_write: int = 0
+
+            def write(self, s: str) -> int:
+                self.largest_write = max(self.largest_write, len(s))
+                return super().write(s)
+
+        path: Path = Path('./tests/data/Creative Brief.zip')
+        brief_dump: PageDump = PageDump(path)
+        expected_md_path: Path = Path(f"./tests/data/{brief_dump.dump_name}-export-expected.md")
+        expected_md: str = expected_md_path.read_text()
+
+        out: WriteRecorder = WriteRecorder()
+        export_node(brief_dump.root_page, brief_dump.vertex_map, out)
+        self.assertEqual(out.getvalue(), expected_md)
+        # written a block at a time
+        longest_block: int = max(
+            len(cast(BlockContentNode, v).content.strip()) for v in brief_dump.vertex_map.values() 
+            if v.vertex_type is VertexType.ROAM_BLOCK_CONTENT
+        )
+        self.assertLessEqual(out.largest_write, longest_block)
+
+        dest_path: Path = Path("./out", f"{brief_dump.dump_name}-export.md")
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        with dest_path.open("wt") as dest_writer:
+            export_node(brief_dump.root_page, brief_dump.vertex_map, dest_writer)
+        self.assertEqual(dest_path.read_text(), expected_md)
+
+        with self.assertRaises(ValueError):
+            export_node(brief_dump.root_page, brief_dump.vertex_map, None) # type: ignore
+
+
     def test_export_block_content_node(self):
         node: BlockContentNode = BlockContentNode('uid.0', MediaType.TEXT_PLAIN, 'block.content')
         vertex_map: VertexMap = OrderedDict([(v.uid, v) for v in [node]])
@@ -68,6 +106,15 @@ class PageDumpExportTests(unittest.TestCase):
         self.assertEqual(from_export_node,from_export)
 
 
+    def test_export_deep(self):
+        # e.g. a generated 1,200 level outline; recursion would exceed the interpreter's recursion limit
+        vertex_map: VertexMap = deep_vertex_map(1200)
+        export_md: str = export_node_str(cast(RoamNode, vertex_map['page']), vertex_map)
+        expected_md: str = '\n\n'.join(['# Deep'] + [f"block {i}" for i in range(1200)]) + '\n'
+        self.assertEqual(export_md, expected_md)
+        self.assertEqual(export_node_str(cast(RoamNode, vertex_map['b1198']), vertex_map), 'block 1198\n\nblock 1199')
+
+
     def setUp(self):
         configure_logging(logging.INFO)
         logging.debug("logging configured")
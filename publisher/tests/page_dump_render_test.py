@@ -1,9 +1,34 @@
 import logging
+import tempfile
+import tracemalloc
 import unittest
+from io import BytesIO
 from pathlib import Path
 
+from lxml import etree
+from markdown_it.token import Token
+
 from common.log import configure_logging
 
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.page_dump_tokenize import *
+from roampub.page_dump_render import *
+from roampub.roam_markdown import roam_plugin
+
+from tests.data.graph_fixtures import synthetic_vertex_map
+
+
+def _canonical(element: etree._Element) -> etree._Element:
+    """``element``, without the whitespace-only text between elements (which the renderers place differently)"""
+    for descendant in element.iter():
+        if descendant.text is not None and not descendant.text.strip() and len(descendant):
+            descendant.text = None
+        if descendant.tail is not None and not descendant.tail.strip():
+            descendant.tail = None
+    return element
+
+
 class PageDumpRenderTests(unittest.TestCase):
 
 
@@ -11,11 +36,90 @@ class PageDumpRenderTests(unittest.TestCase):
         pass
 
 
+    def test_render_node(self):
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        out: BytesIO = BytesIO()
+        render_node(brief_dump.root_page, brief_dump.vertex_map, out)
+        logging.debug(f"out: {out.getvalue()!r}")
+
+        document: etree._Element = etree.fromstring(out.getvalue())
+        self.assertEqual(document.tag, f"{{{XHTML_NAMESPACE}}}html")
+        self.assertEqual(document.findtext(f"{{{XHTML_NAMESPACE}}}head/{{{XHTML_NAMESPACE}}}title"), 'Creative Brief')
+
+        # the same body as markdown-it's own (X)HTML renderer gives for the same tokens
+        config: ParserConfig = DEFAULT_PARSER_CONFIG._replace(plugins=(roam_plugin,))
+        tokens: list[Token] = tokenize_node(brief_dump.root_page, brief_dump.vertex_map, True)
+        expected_html: str = get_parser(config).renderer.render(tokens, get_parser(config).options, {})
+        expected_body: etree._Element = etree.fromstring(
+            f"<body xmlns=\"{XHTML_NAMESPACE}\">{expected_html}</body>".encode()
+        )
+        body: etree._Element = document[1]
+        self.assertEqual(etree.tostring(_canonical(body)), etree.tostring(_canonical(expected_body)))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path: Path = Path(temp_dir, 'chapter.xhtml')
+            render_node(brief_dump.root_page, brief_dump.vertex_map, path)
+            self.assertEqual(path.read_bytes(), out.getvalue())
+
+        with self.assertRaises(ValueError):
+            render_node(brief_dump.root_page, brief_dump.vertex_map, None) # type: ignore
+        with self.assertRaises(TypeError):
+            render_node(brief_dump.root_page, brief_dump.vertex_map, 'chapter.xhtml') # type: ignore
+
+
+    def test_render_tokens(self):
+        config: ParserConfig = DEFAULT_PARSER_CONFIG._replace(plugins=(roam_plugin,))
+        content: str = (
+            "see [[Page]] and ((abc123))\x0b, a `code < span` and ![an *image*](i.png \"title\")\n\n"
+            "1. one\n2. two\n\n---\n\n```python\nx = '<&>'\n```"
+        )
+        out: BytesIO = BytesIO()
+        render_tokens(
+            get_parser(config).parse(content), out, 'Title', False,
+            lambda kind, uid: f"{uid}.xhtml" if kind is ReferenceKind.PAGE else None
+        )
+        html: str = out.getvalue().decode()
+        logging.info(f"html: {html}")
+        etree.fromstring(out.getvalue())
+        # the page reference is linked, the block reference isn't; and the invalid char is replaced
+        self.assertIn(
+            '<p>see <a href="Page.xhtml">[[Page]]</a> and ((abc123))\ufffd, a <code>code &lt; span</code>', html
+        )
+        self.assertIn('<img src="i.png" alt="an image" title="title"/>', html)
+        self.assertIn('<ol><li>one</li>\n<li>two</li>\n</ol>\n<hr/>\n', html)
+        self.assertIn('<pre><code class="language-python">x = \'&lt;&amp;&gt;\'\n</code></pre>', html)
+
+        out = BytesIO()
+        render_tokens(get_parser().parse("a\nb"), out, 'Title', True)
+        self.assertIn('<p>a<br/>\nb</p>', out.getvalue().decode())
+
+
+    def test_render_memory(self):
+        """the peak memory of rendering is flat in the length of the page"""
+        peaks: list[int] = []
+        block_counts: tuple[int, ...] = (500, 2_000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # untraced; creates the parser, and fills the interpreter's free lists (e.g. of the tuples that the link
+            # rule allocates per link), whose one-off growth would otherwise be counted against the first pages
+            warm_up: VertexMap = synthetic_vertex_map(block_counts[-1])
+            render_node(cast(RoamNode, warm_up['page']), warm_up, Path(temp_dir, 'warm_up.xhtml'))
+        for block_count in block_counts:
+            graph: VertexMap = synthetic_vertex_map(block_count)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path: Path = Path(temp_dir, 'chapter.xhtml')
+                tracemalloc.start()
+                render_node(cast(RoamNode, graph['page']), graph, path)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                self.assertEqual(len(etree.parse(str(path)).getroot()[1]), block_count + 1)
+        logging.info(f"peaks: {peaks}")
+        self.assertLess(peaks[1], peaks[0] * 2)
+
+
     def setUp(self):
         configure_logging(logging.INFO)
         logging.debug("logging configured")
 
 
-
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,5 +1,8 @@
 from typing import Callable, cast
+import io
+import json
 import logging
+import tempfile
 import unittest
 from zipfile import BadZipFile
 
@@ -8,6 +11,7 @@ from common.collect import get_first_value, get_last_value
 
 from roampub.roam_model import *
 from roampub.page_dump import *
+from roampub.vertex_map_cache import sidecar_path
 
 class PageDumpTests(unittest.TestCase):
 
@@ -60,6 +64,84 @@ class PageDumpTests(unittest.TestCase):
         self.assertEqual(file[1], expected_content)
 
 
+    def test_cache_dir(self):
+        path: Path = Path('./tests/data/Page 3.zip')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir: Path = Path(temp_dir)
+            built_dump: PageDump = PageDump(path, cache_dir)
+            cache_path: Path = sidecar_path(path, cache_dir)
+            self.assertTrue(cache_path.exists())
+            self._validate_page3_map(built_dump.vertex_map)
+
+            cached_dump: PageDump = PageDump(path, cache_dir)
+            self.assertIsNot(cached_dump.vertex_map, built_dump.vertex_map)
+            self._validate_page3_map(cached_dump.vertex_map)
+            self.assertEqual(str(cached_dump), str(built_dump))
+
+        with self.assertRaises(TypeError):
+            PageDump(path, 'out')  # type: ignore
+
+
+    def test_validation_mode(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bad_path: Path = self._write_double_parent_dump(Path(temp_dir))
+            with self.assertRaises(BadPageDump):
+                PageDump(bad_path)
+
+            lazy_dump: PageDump = PageDump(bad_path, validation_mode=ValidationMode.LAZY)
+            self.assertIsNone(lazy_dump._vertex_map)
+            self.assertFalse(lazy_dump.is_validated)
+            self.assertEqual(lazy_dump.dump_name, 'Bad')
+            with self.assertRaises(BadPageDump) as raised:
+                lazy_dump.vertex_map
+            self.assertTrue(lazy_dump.is_validated)
+            self.assertIs(raised.exception.validation_failures[0].rule, BLOCK_PARENTS_EXIST_RULE)
+            with self.assertRaises(BadPageDump):
+                lazy_dump.root_page
+
+            trusted_dump: PageDump = PageDump(bad_path, validation_mode=ValidationMode.TRUSTED)
+            self.assertEqual(len(trusted_dump), 2)
+            self.assertFalse(trusted_dump.is_validated)
+            with self.assertRaises(BadPageDump):
+                trusted_dump.validate()
+            self.assertTrue(trusted_dump.is_validated)
+
+            # the verdict travels with the sidecar
+            cache_dir: Path = Path(temp_dir, 'cache')
+            trusted_dump = PageDump(bad_path, cache_dir, ValidationMode.TRUSTED)
+            self.assertEqual(len(trusted_dump), 2)
+            self.assertFalse(trusted_dump.is_validated)
+            with self.assertRaises(BadPageDump):
+                PageDump(bad_path, cache_dir)
+            trusted_dump = PageDump(bad_path, cache_dir, ValidationMode.TRUSTED)
+            self.assertEqual(len(trusted_dump), 2)
+            self.assertTrue(trusted_dump.is_validated)
+
+        path: Path = Path('./tests/data/Page 3.zip')
+        lazy_dump: PageDump = PageDump(path, validation_mode=ValidationMode.LAZY)
+        self.assertFalse(lazy_dump.is_validated)
+        self.assertEqual(len(lazy_dump), 30)
+        self.assertTrue(lazy_dump.is_validated)
+        lazy_dump.validate()
+
+        with self.assertRaises(TypeError):
+            PageDump(path, validation_mode='lazy')  # type: ignore
+
+
+    def _write_double_parent_dump(self, dir: Path) -> Path:
+        zip_path: Path = dir.joinpath('Bad.zip')
+        vertices: list[dict[str, Any]] = [
+            {'uid': 'page', 'text': 'Bad', 'children': ['block', 'block'], 
+             'vertex-type': VertexType.ROAM_PAGE.value, 'media-type': MediaType.TEXT_PLAIN.value},
+            {'uid': 'block', 'text': 'Block', 
+             'vertex-type': VertexType.ROAM_BLOCK_CONTENT.value, 'media-type': MediaType.TEXT_PLAIN.value},
+        ]
+        with ZipFile(zip_path, 'w') as zip_file:
+            zip_file.writestr('Bad/', '')
+            zip_file.writestr('Bad/Bad.json', json.dumps(vertices))
+        return zip_path
+
+
     def test_get_items(self):
         path: Path = Path('./tests/data/Creative Brief.zip')
         brief_dump: PageDump = PageDump(path)
@@ -311,6 +393,28 @@ class PageDumpTests(unittest.TestCase):
         self.assertIsNone(last.get('refs'))
 
 
+    def test_iter_page_dump_json(self):
+        for json_path in [Path('./tests/data/Creative Brief.json'), Path('./tests/data/Page 3.json')]:
+            expected: list[dict[str, Any]] = read_page_dump_json(json_path)
+            # tiny chunks force every element to be split across reads
+            for chunk_size in [1, 7, 64, JSON_READ_CHUNK_SIZE]:
+                with open(json_path, encoding="utf-8") as reader:
+                    streamed: list[dict[str, Any]] = list(iter_page_dump_json(reader, chunk_size))
+                self.assertEqual(streamed, expected)
+
+        self.assertEqual(list(iter_page_dump_json(io.StringIO(' [ ] '))), [])
+        self.assertEqual(list(iter_page_dump_json(io.StringIO('[1, 22,333]'), 2)), [1, 22, 333])
+        self.assertEqual(list(iter_page_dump_json(io.StringIO('[{"a": [1, 2]} ,\n{"b": "]"}]'), 3)), 
+                         [{'a': [1, 2]}, {'b': ']'}])
+
+        for malformed in ['', '{}', '[{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": 1},]', '[{"a": ']:
+            with self.assertRaises(JSONDecodeError):
+                list(iter_page_dump_json(io.StringIO(malformed), 4))
+
+        with self.assertRaises(ValueError):
+            list(iter_page_dump_json(io.StringIO('[]'), 0))
+
+
     def test_create_roam_vertex(self):
        self._test_create_file_vertex(create_roam_vertex)
        self._test_create_block_content_node(create_roam_vertex)
@@ -1,6 +1,12 @@
 import logging
+import os
+import random
+import threading
+import timeit
 import unittest
+from unittest import mock
 from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 from markdown_it import MarkdownIt as MDParser
@@ -12,6 +18,10 @@ from common.log import configure_logging, TRACE
 from roampub.roam_model import *
 from roampub.page_dump import *
 from roampub.page_dump_tokenize import *
+from roampub.token_cache import TokenCache
+from roampub.roam_markdown import roam_plugin
+
+from tests.data.graph_fixtures import synthetic_vertex_map, deep_vertex_map
 
 class PageDumpTokenizeTests(unittest.TestCase):
 
@@ -82,6 +92,211 @@ class PageDumpTokenizeTests(unittest.TestCase):
         self.assertEqual(rendered_md, expected_md)
 
 
+    def test_get_parser(self):
+        parser: MDParser = get_parser()
+        self.assertIs(get_parser(DEFAULT_PARSER_CONFIG), parser)
+        other_config: ParserConfig = ParserConfig('commonmark', (('breaks', False),))
+        self.assertIsNot(get_parser(other_config), parser)
+        self.assertIs(get_parser(other_config), get_parser(other_config))
+        self.assertFalse(get_parser(other_config).options['breaks'])
+
+        # each thread has its own
+        other_thread_parsers: list[MDParser] = []
+        thread: threading.Thread = threading.Thread(target=lambda: other_thread_parsers.append(get_parser()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_thread_parsers[0], parser)
+
+        with self.assertRaises(TypeError):
+            get_parser(('commonmark', {})) # type: ignore
+
+        # same tokens as a freshly constructed parser
+        brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
+        for vertex in brief_vertex_map.values():
+            if vertex.vertex_type is not VertexType.ROAM_BLOCK_CONTENT:
+                continue
+            content: str = cast(BlockContentNode, vertex).content
+            fresh_parser: MDParser = MDParser('commonmark', {'breaks':True,'html':False,'xhtmlOut': True})
+            self.assertEqual(
+                [t.as_dict() for t in tokenize_block_content_node(cast(BlockContentNode, vertex))], 
+                [t.as_dict() for t in fresh_parser.parse(content)]
+            )
+
+
+    def test_parser_pool_benchmark(self):
+        """blocks/second with a parser constructed per block (as before the pool), vs the pooled parser"""
+        vertex_map: VertexMap = synthetic_vertex_map(2000)
+        blocks: list[BlockContentNode] = [
+            cast(BlockContentNode, v) for v in vertex_map.values() if v.vertex_type is VertexType.ROAM_BLOCK_CONTENT
+        ]
+
+        def per_block_parser():
+            for block in blocks:
+                MDParser('commonmark', {'breaks':True,'html':False,'xhtmlOut': True}).parse(block.content)
+
+        def pooled_parser():
+            for block in blocks:
+                get_parser().parse(block.content)
+
+        per_block_seconds: float = min(timeit.repeat(per_block_parser, number=1, repeat=3))
+        pooled_seconds: float = min(timeit.repeat(pooled_parser, number=1, repeat=3))
+        tokenize_seconds: float = timeit.timeit(
+            lambda: tokenize_node(cast(RoamNode, vertex_map['page']), vertex_map, False), number=1
+        )
+        logging.info(
+            f"blocks: {len(blocks)}, per-block parser: {len(blocks)/per_block_seconds:.0f} blocks/s, "
+            f"pooled parser: {len(blocks)/pooled_seconds:.0f} blocks/s, "
+            f"tokenize_node: {len(blocks)/tokenize_seconds:.0f} blocks/s"
+        )
+        self.assertLess(pooled_seconds, per_block_seconds)
+
+
+    def test_tokenize_deep(self):
+        vertex_map: VertexMap = deep_vertex_map(1200)
+        tokens: list[Token] = tokenize_node(cast(RoamNode, vertex_map['page']), vertex_map, False)
+        # heading (3), then a paragraph (3) per block
+        self.assertEqual(len(tokens), 3 + 3*1200)
+        self.assertEqual(tokens[-2].children[0].content, 'block 1199') # type: ignore
+
+
+    def test_iter_tokens(self):
+        path: Path = Path('./tests/data/Creative Brief.zip')
+        brief_dump: PageDump = PageDump(path)
+        for normalize_to_cm in (False, True):
+            self.assertEqual(
+                [t.as_dict() for t in iter_tokens(brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm)],
+                [t.as_dict() for t in tokenize_node(brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm)]
+            )
+
+        # lazy: the blocks ahead of a dangling child are tokenized before it is looked up
+        vertex_map: VertexMap = synthetic_vertex_map(3)
+        cast(PageNode, vertex_map['page']).children.append('dangling') # type: ignore
+        tokens: Iterator[Token] = iter_tokens(cast(RoamNode, vertex_map['page']), vertex_map)
+        self.assertEqual(len([next(tokens) for _ in range(3 + 3*3)]), 12)
+        with self.assertRaises(KeyError):
+            next(tokens)
+
+        with self.assertRaises(TypeError):
+            iter_tokens(vertex_map['b0'], {'b0': 'not a vertex'}) # type: ignore
+
+
+    def test_tokenize_block_content_nodes(self):
+        brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
+        blocks: list[BlockContentNode] = [
+            cast(BlockContentNode, v) for v in brief_vertex_map.values() 
+            if v.vertex_type is VertexType.ROAM_BLOCK_CONTENT
+        ]
+        # with repeated content
+        blocks += blocks[:3]
+        for normalize_to_cm in (False, True):
+            batch_tokens: list[list[Token]] = tokenize_block_content_nodes(blocks, normalize_to_cm)
+            self.assertEqual(len(batch_tokens), len(blocks))
+            for block, tokens in zip(blocks, batch_tokens):
+                self.assertEqual(
+                    [t.as_dict() for t in tokens], 
+                    [t.as_dict() for t in tokenize_block_content_node(block, normalize_to_cm)]
+                )
+            self.assertIsNot(batch_tokens[0][0], batch_tokens[-3][0])
+
+        # the plain-text shortcut gives exactly the parser's tokens; with, and without, ``roam_plugin``
+        roam_config: ParserConfig = DEFAULT_PARSER_CONFIG._replace(plugins=(roam_plugin,))
+        random.seed(0)
+        alphabet: str = "aZé1 .,;'\"()?/>|!#*-_[]\\`<&~:\t\n=$%@^{}+"
+        for _ in range(2000):
+            content: str = ''.join(random.choice(alphabet) for _ in range(random.randint(1, 10)))
+            node: BlockContentNode = BlockContentNode('uid', MediaType.TEXT_PLAIN, content, [], None)
+            self.assertEqual(
+                [t.as_dict() for t in tokenize_block_content_nodes([node])[0]], 
+                [t.as_dict() for t in get_parser().parse(content)],
+                content
+            )
+            self.assertEqual(
+                [t.as_dict() for t in tokenize_block_content_nodes([node], True)[0]], 
+                [t.as_dict() for t in get_parser(roam_config).parse(content)],
+                content
+            )
+
+        # the node's cached ``reference_spans()`` are reused, rather than rescanned
+        referring_node: BlockContentNode = BlockContentNode('uid', MediaType.TEXT_PLAIN, 'see [[Page]] and ((abc))')
+        expected_tokens: list[Token] = get_parser(roam_config).parse(referring_node.content)
+        referring_node.reference_spans()
+        with mock.patch('roampub.roam_markdown.scan_references') as rescan:
+            self.assertEqual(
+                [t.as_dict() for t in tokenize_block_content_nodes([referring_node], True)[0]], 
+                [t.as_dict() for t in expected_tokens]
+            )
+        rescan.assert_not_called()
+
+        with self.assertRaises(TypeError):
+            tokenize_block_content_nodes([next(iter(brief_vertex_map.values()))]) # type: ignore
+
+
+    def test_batch_benchmark(self):
+        """
+        blocks/second for a page of one-line blocks: parsed one at a time, vs ``tokenize_block_content_nodes``; the
+        speedup depends on the host
+        """
+        blocks: list[BlockContentNode] = [
+            BlockContentNode(f"b{i}", MediaType.TEXT_PLAIN, f"block {i}, in plain text", [], None) for i in range(2000)
+        ]
+        per_block_seconds: float = min(timeit.repeat(
+            lambda: [get_parser().parse(block.content) for block in blocks], number=1, repeat=3
+        ))
+        batch_seconds: float = min(timeit.repeat(lambda: tokenize_block_content_nodes(blocks), number=1, repeat=3))
+        logging.info(
+            f"blocks: {len(blocks)}, per-block parse: {len(blocks)/per_block_seconds:.0f} blocks/s, "
+            f"batch: {len(blocks)/batch_seconds:.0f} blocks/s"
+        )
+        # the timings are only logged (they depend on the host); the batch must still give the same tokens
+        self.assertEqual(
+            [[t.as_dict() for t in tokens] for tokens in tokenize_block_content_nodes(blocks)],
+            [[t.as_dict() for t in get_parser().parse(block.content)] for block in blocks]
+        )
+
+
+    def test_tokenize_node_executor(self):
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        for normalize_to_cm in (False, True):
+            expected: list[dict] = [
+                t.as_dict() for t in tokenize_node(brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm)
+            ]
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                for shard_count in (1, 3, 100):
+                    tokens: list[Token] = tokenize_node(
+                        brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm, executor=executor, 
+                        shard_count=shard_count
+                    )
+                    self.assertEqual([t.as_dict() for t in tokens], expected)
+
+            # only the cache misses are sent to the workers
+            cache: TokenCache = TokenCache()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                for _ in range(2):
+                    tokens = tokenize_node(
+                        brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm, cache=cache, executor=executor
+                    )
+                    self.assertEqual([t.as_dict() for t in tokens], expected)
+            self.assertEqual(cache.hits, cache.misses)
+
+        with self.assertRaises(ValueError):
+            tokenize_node(brief_dump.root_page, brief_dump.vertex_map, executor=ThreadPoolExecutor(), shard_count=0)
+
+
+    def test_executor_benchmark(self):
+        """wall-time of serial, vs process pool, tokenization; the speedup depends on the host's core count"""
+        vertex_map: VertexMap = synthetic_vertex_map(4000)
+        page: RoamNode = cast(RoamNode, vertex_map['page'])
+        serial_seconds: float = timeit.timeit(lambda: tokenize_node(page, vertex_map), number=1)
+        with ProcessPoolExecutor() as executor:
+            parallel_seconds: float = timeit.timeit(lambda: tokenize_node(page, vertex_map, executor=executor), number=1)
+            tokens: list[Token] = tokenize_node(page, vertex_map, executor=executor)
+        logging.info(
+            f"blocks: {len(vertex_map) - 1}, cpu_count: {os.cpu_count()}, serial: {serial_seconds:.2f}s, "
+            f"process pool: {parallel_seconds:.2f}s"
+        )
+        self.assertEqual(len(tokens), 3 + 3*4000)
+
+
     def setUp(self):
         configure_logging(TRACE)
         logging.debug("logging configured")
@@ -1,13 +1,23 @@
 import unittest
+import timeit
+import sys
+import pickle
+import random
+import ast
+import re
 from operator import contains
+from collections import Counter
+from typing import Any
 from enum import Enum, StrEnum
 from logging import DEBUG
 
 from common.log import configure_logging, TRACE
-from common.collect import get_first
+from common.collect import get_first, get_first_value
 
 from roampub.roam_model import *
 from roampub.page_dump import *
+from roampub.vertex_store import VertexStore
+from roampub.frozen_model import freeze_vertex_map
 
 class Color(Enum):
     RED = 1
@@ -21,6 +31,20 @@ class StrColor(StrEnum):
     BLUE = 'blue'
 
 
+def _offenders(failure_message: str) -> Any:
+    """
+    the offenders listed in a ``failure_message``, in an order-insensitive form: a ``Counter`` of the list items, or 
+    of the (class name, ``Uid``) of the listed vertices; or the dict itself
+    """
+    offenders: str = failure_message.partition(': ')[2]
+    try:
+        value: Any = ast.literal_eval(offenders)
+    except (ValueError, SyntaxError):
+        # a list of vertices; each ``repr`` starts with ``ClassName<uid>(``
+        return Counter(re.findall(r"(\w+)<([^>]*)>\(", offenders)) or offenders
+    return Counter(value) if isinstance(value, list) else value
+
+
 class RoamModelTests(unittest.TestCase):
 
     def test_to_vertex_type_map(self):
@@ -34,6 +58,21 @@ class RoamModelTests(unittest.TestCase):
         self.assertEqual(len(vertex_type_map[VertexType.ROAM_FILE]), 0)
 
 
+    def test_default_links(self):
+        """omitted ``children``/``references`` are empty lists, of each node's own"""
+        nodes: list[RoamNode] = [
+            PageNode('page', MediaType.TEXT_PLAIN, 'Page'),
+            BlockHeadingNode('heading', MediaType.TEXT_PLAIN, 'heading', 1),
+            BlockContentNode('block', MediaType.TEXT_PLAIN, 'block'),
+            BlockContentNode('other', MediaType.TEXT_PLAIN, 'other'),
+        ]
+        nodes[0].children.append('heading') # type: ignore
+        nodes[2].references.append('page') # type: ignore
+        self.assertEqual([node.children for node in nodes], [['heading'], [], [], []])
+        self.assertEqual([node.references for node in nodes], [[], [], ['page'], []])
+        self.assertIsNone(PageNode('page', MediaType.TEXT_PLAIN, 'Page', None, None).children)
+
+
     def test_validate(self):
         brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
         logging.debug(f"brief_vertex_map: {brief_vertex_map}")
@@ -58,6 +97,253 @@ class RoamModelTests(unittest.TestCase):
         self.assertIn("9b673aae-8089-4a91-84df-9dac152a7f94", validation_result[1].failure_message)
 
 
+    def test_validate_facts(self):
+        def sequential_validate(graph: VertexMap) -> ValidationResult:
+            failures: list[ValidationFailure] = [f for rule in ALL_RULES for f in (rule.validate(graph) or [])]
+            return failures if failures else None
+
+        page3_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        facts: ValidationFacts = ValidationFacts(page3_vertex_map)
+        self.assertIs(facts.first_vertex, page3_vertex_map['hfm6NKq2c'])
+        self.assertEqual(facts.linked_uids('children'), all_linked_uids('children', page3_vertex_map))
+        self.assertEqual(facts.linked_uids('references'), all_linked_uids('references', page3_vertex_map))
+        self.assertEqual(facts.child_counts, LinkIndex(page3_vertex_map).in_degrees('children'))
+        self.assertEqual(facts.invalid_carriers('references'), [])
+        self.assertEqual(facts.reference_danglers, {})
+        self.assertIsNone(validate(page3_vertex_map))
+
+        # a FileVertex as a child of the root page
+        root: RoamNode = cast(RoamNode, page3_vertex_map['hfm6NKq2c'])
+        root.children.append('9b673aae-8089-4a91-84df-9dac152a7f94') # type: ignore
+        self.assertEqual(validate(page3_vertex_map), sequential_validate(page3_vertex_map))
+        self.assertEqual(validate(page3_vertex_map, processes=2), validate(page3_vertex_map))
+        # a block with 2 parents
+        root.children.append('IvK1p6Cqs') # type: ignore
+        self.assertEqual(validate(page3_vertex_map), sequential_validate(page3_vertex_map))
+        self.assertEqual(validate(page3_vertex_map, processes=2), validate(page3_vertex_map))
+        # a reference that doesn't appear in content
+        referring_node: BlockContentNode = cast(BlockContentNode, 
+            get_first([v for v in page3_vertex_map.values() if has_attribute_value(v, 'references')])
+        )
+        referring_node._content = referring_node.content.replace(get_first(referring_node.references), 'xxxxx') # type: ignore
+        self.assertEqual(validate(page3_vertex_map), sequential_validate(page3_vertex_map))
+        self.assertEqual(validate(page3_vertex_map, processes=2), validate(page3_vertex_map))
+        # dangling children and references
+        del page3_vertex_map['mvVww9zGd']
+        del page3_vertex_map['IO75SriD8']
+        result: list[ValidationFailure] = validate(page3_vertex_map) # type: ignore
+        logging.debug(f"result: {result}")
+        self.assertEqual(result, sequential_validate(page3_vertex_map))
+        self.assertEqual(validate(page3_vertex_map, processes=3), result)
+        self.assertEqual(
+            [f.rule for f in result], 
+            [CHILDREN_EXIST_RULE, REFERENCES_EXIST_RULE, BLOCK_PARENTS_EXIST_RULE, CHILDREN_VERTEX_TYPES_RULE, 
+             PAGE_NODE_CHILDREN_RULE, REFERENCES_APPEAR_IN_CONTENT_RULE]
+        )
+
+        # a rule without a ``fused_impl`` falls back to ``impl``
+        unfused_rule: ValidationRule = CHILDREN_EXIST_RULE._replace(fused_impl=None)
+        self.assertEqual(
+            unfused_rule.validate_facts(ValidationFacts(page3_vertex_map)), unfused_rule.validate(page3_vertex_map)
+        )
+
+        # an empty graph has no root page
+        empty_result: list[ValidationFailure] = validate(OrderedDict()) # type: ignore
+        self.assertEqual([f.rule for f in empty_result], [ROOT_PAGE_RULE])
+        self.assertEqual(validate(OrderedDict(), processes=2), empty_result)
+        with self.assertRaises(ValueError):
+            validate(page3_vertex_map, processes=0)
+        self.assertIsNone(validate(None)) # type: ignore
+        with self.assertRaises(TypeError):
+            validate(dict()) # type: ignore
+
+
+    def test_validate_processes(self):
+        """validating in forked worker processes, over shards of the graph, gives the same result as in this process"""
+        store: VertexStore = VertexStore(load_json_dump(Path('./tests/data/Page 3.json')).values())
+        self.assertIsNone(validate(store, processes=2))
+
+        rng: random.Random = random.Random(11)
+        uids: list[Uid] = [f"u{i}" for i in range(30)]
+        for _ in range(10):
+            graph: VertexMap = OrderedDict([('root', PageNode('root', MediaType.TEXT_PLAIN, 'Root', uids[:5], None))])
+            for uid in uids:
+                # now and then a dangling, repeated, or (PageNode | FileVertex) link
+                children: list[Uid] = rng.sample(uids + ['dangling', 'root'], rng.randint(0, 3))
+                references: list[Uid] = rng.sample(uids + ['dangling'], rng.randint(0, 2))
+                graph[uid] = (
+                    BlockHeadingNode(uid, MediaType.TEXT_PLAIN, uid, 1, children, references) if rng.random() < 0.2
+                    else BlockContentNode(
+                        uid, MediaType.TEXT_PLAIN, ' '.join(f"[[{ref}]]" for ref in references[1:]), children, 
+                        references
+                    )
+                )
+            expected: ValidationResult = validate(graph)
+            self.assertIsNotNone(expected)
+            for processes in (1, 2, 3, 7):
+                self.assertEqual(validate(graph, processes=processes), expected)
+
+
+    def test_validate_benchmark(self):
+        """
+        wall-time of the single pass ``validate``, vs running each rule's own scan of the graph, vs sharded over 
+        worker processes; the speedups depend on the host
+        """
+        block_count: int = 20_000
+        graph: VertexMap = OrderedDict([
+            ('page', PageNode('page', MediaType.TEXT_PLAIN, 'Page', [f"b{i}" for i in range(0, block_count, 10)], None))
+        ])
+        for i in range(block_count):
+            children: list[Uid] = [f"b{j}" for j in range(i + 1, min(i + 10, block_count))] if i % 10 == 0 else []
+            graph[f"b{i}"] = BlockContentNode(
+                f"b{i}", MediaType.TEXT_PLAIN, f"block {i}, see [[page]]", children, ['page']
+            )
+        # a dangling child, and a dangling reference that isn't in the content; so there are failures to compare
+        cast(RoamNode, graph['b0']).children.append('dangling') # type: ignore
+        cast(RoamNode, graph[f"b{block_count - 1}"]).references.append('dangling') # type: ignore
+
+        def sequential_validate() -> ValidationResult:
+            failures: list[ValidationFailure] = [f for rule in ALL_RULES for f in (rule.validate(graph) or [])]
+            return failures if failures else None
+
+        validate_seconds: float = min(timeit.repeat(lambda: validate(graph), number=1, repeat=3))
+        sequential_seconds: float = timeit.timeit(sequential_validate, number=1)
+        sharded_seconds: float = timeit.timeit(lambda: validate(graph, processes=2), number=1)
+        logging.info(
+            f"vertices: {len(graph)}, validate: {validate_seconds:.3f}s, per-rule scans: {sequential_seconds:.3f}s, "
+            f"2 processes: {sharded_seconds:.3f}s"
+        )
+        # the timings are only logged (they depend on the host); the results must still be the same
+        expected: ValidationResult = validate(graph)
+        self.assertEqual(
+            [f.rule for f in expected], # type: ignore
+            [CHILDREN_EXIST_RULE, REFERENCES_EXIST_RULE, REFERENCES_APPEAR_IN_CONTENT_RULE]
+        )
+        self.assertEqual(sequential_validate(), expected)
+        self.assertEqual(validate(graph, processes=2), expected)
+
+
+    def _assert_matches_validate(self, result: ValidationResult, graph: VertexMap):
+        expected: ValidationResult = validate(graph)
+        logging.debug(f"result: {result}, expected: {expected}")
+        if expected is None:
+            self.assertIsNone(result)
+            return
+        self.assertIsNotNone(result)
+        self.assertEqual([f.rule.name for f in result], [f.rule.name for f in expected]) # type: ignore
+        # same offenders, though maybe not in the same order
+        for failure, expected_failure in zip(result, expected): # type: ignore
+            self.assertEqual(_offenders(failure.failure_message), _offenders(expected_failure.failure_message))
+
+
+    def test_incremental_validator(self):
+        page3_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        validator: IncrementalValidator = IncrementalValidator(page3_vertex_map)
+        self.assertIsNone(validator.result())
+        self.assertIsNone(validator.revalidate([]))
+        self.assertEqual(validator.link_index.parents('IvK1p6Cqs'), LinkIndex(page3_vertex_map).parents('IvK1p6Cqs'))
+
+        # a FileVertex child, and a block with 2 parents
+        root: RoamNode = cast(RoamNode, page3_vertex_map['hfm6NKq2c'])
+        root.children.extend(['9b673aae-8089-4a91-84df-9dac152a7f94', 'IvK1p6Cqs']) # type: ignore
+        result: ValidationResult = validator.revalidate(['hfm6NKq2c'])
+        self.assertEqual(result, validate(page3_vertex_map))
+        self.assertEqual(len(validator.link_index.parents('IvK1p6Cqs')), 2)
+
+        # dangling children and references
+        del page3_vertex_map['mvVww9zGd']
+        del page3_vertex_map['IO75SriD8']
+        self._assert_matches_validate(validator.revalidate(['mvVww9zGd', 'IO75SriD8']), page3_vertex_map)
+
+        # a reference that doesn't appear in content, via a replaced vertex
+        referring_node: BlockContentNode = cast(BlockContentNode, 
+            get_first([v for v in page3_vertex_map.values() if has_attribute_value(v, 'references')])
+        )
+        page3_vertex_map[referring_node.uid] = BlockContentNode(
+            referring_node.uid, referring_node.media_type, 'no refs', referring_node.children, 
+            referring_node.references
+        )
+        self._assert_matches_validate(validator.revalidate([referring_node.uid]), page3_vertex_map)
+
+        # undo everything
+        root.children[-2:] = [] # type: ignore
+        page3_vertex_map[referring_node.uid] = referring_node
+        original_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        page3_vertex_map['mvVww9zGd'] = original_vertex_map['mvVww9zGd']
+        page3_vertex_map['IO75SriD8'] = original_vertex_map['IO75SriD8']
+        self.assertIsNone(
+            validator.revalidate(['hfm6NKq2c', referring_node.uid, 'mvVww9zGd', 'IO75SriD8', 'not-a-uid'])
+        )
+        self.assertEqual(validator.link_index.in_degrees('children'), LinkIndex(page3_vertex_map).in_degrees('children'))
+
+        # a new heading with a PageNode child; then the child becomes a block
+        page3_vertex_map['new-page'] = PageNode('new-page', MediaType.TEXT_PLAIN, 'new page', [], None)
+        page3_vertex_map['new-heading'] = (
+            BlockHeadingNode('new-heading', MediaType.TEXT_PLAIN, 'new heading', 2, ['new-page'], None)
+        )
+        root.children.append('new-heading') # type: ignore
+        result = validator.revalidate(['new-page', 'new-heading', 'hfm6NKq2c'])
+        self._assert_matches_validate(result, page3_vertex_map)
+        self.assertIn(BLOCK_HEADING_CHILDREN_RULE, [f.rule for f in result]) # type: ignore
+        page3_vertex_map['new-page'] = BlockContentNode('new-page', MediaType.TEXT_PLAIN, 'new block', [], None)
+        self.assertIsNone(validator.revalidate(['new-page']))
+        self.assertEqual(validator.link_index.parent('new-page'), 'new-heading')
+
+        with self.assertRaises(TypeError):
+            IncrementalValidator(dict()) # type: ignore
+
+
+    def test_incremental_validator_random_edits(self):
+        """random edits, revalidated with the changed uids in random order, give the same result as ``validate``"""
+        rng: random.Random = random.Random(7)
+        uids: list[Uid] = [f"u{i}" for i in range(12)]
+
+        def random_links() -> list[Uid]:
+            # now and then a dangling, or repeated, link
+            return rng.sample(uids + ['dangling'], rng.randint(0, 3))
+
+        def random_vertex(uid: Uid) -> RoamVertex:
+            references: list[Uid] = random_links()
+            match rng.randrange(3):
+                case 0:
+                    return PageNode(uid, MediaType.TEXT_PLAIN, uid, random_links(), references)
+                case 1:
+                    return BlockHeadingNode(uid, MediaType.TEXT_PLAIN, uid, 1, random_links(), references)
+                case _:
+                    # with some, but not always all, of its references in its content
+                    content: str = ' '.join(f"[[{reference}]]" for reference in references if rng.random() < 0.8)
+                    return BlockContentNode(uid, MediaType.TEXT_PLAIN, content, random_links(), references)
+
+        for _ in range(20):
+            graph: VertexMap = OrderedDict([('root', PageNode('root', MediaType.TEXT_PLAIN, 'Root', uids[:3], None))])
+            graph.update((uid, random_vertex(uid)) for uid in uids)
+            validator: IncrementalValidator = IncrementalValidator(graph)
+            self._assert_matches_validate(validator.result(), graph)
+            for _ in range(10):
+                changed: list[Uid] = rng.sample(uids, rng.randint(1, 4))
+                for uid in changed:
+                    if uid in graph and rng.random() < 0.2:
+                        del graph[uid]
+                    else:
+                        graph[uid] = random_vertex(uid)
+                rng.shuffle(changed)
+                self._assert_matches_validate(validator.revalidate(changed), graph)
+
+        # a heading made a parent of a page, while the page is replaced; in either order
+        for changed in (['u1', 'u4', 'u5'], ['u4', 'u1', 'u5']):
+            graph = OrderedDict((vertex.uid, vertex) for vertex in [
+                PageNode('root', MediaType.TEXT_PLAIN, 'Root', ['u1'], None),
+                BlockHeadingNode('u1', MediaType.TEXT_PLAIN, 'heading', 1, [], None),
+                PageNode('u4', MediaType.TEXT_PLAIN, 'Page', [], None),
+            ])
+            validator = IncrementalValidator(graph)
+            graph['u1'] = BlockHeadingNode('u1', MediaType.TEXT_PLAIN, 'heading', 1, ['u4', 'u1'], None)
+            graph['u4'] = PageNode('u4', MediaType.TEXT_PLAIN, 'Another Page', [], None)
+            result: ValidationResult = validator.revalidate(changed)
+            self._assert_matches_validate(result, graph)
+            self.assertIn(BLOCK_HEADING_CHILDREN_RULE, [f.rule for f in result]) # type: ignore
+
+
     def test_validate_references_appear_in_content(self):
         brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
         logging.debug(f"brief_vertex_map: {brief_vertex_map}")
@@ -93,6 +379,70 @@ class RoamModelTests(unittest.TestCase):
         self.assertIn("IO75SriD8", validation_result[0].failure_message)
 
 
+    def test_scan_references(self):
+        content: str = 'a [[x]] ((y)) <<z>> [[((w))]] [[[v]]] (()) <<u>'
+        spans: list[ReferenceSpan] = scan_references(content)
+        logging.debug(f"spans: {spans}")
+        self.assertEqual(
+            [(span.kind, span.uid) for span in spans], 
+            [(ReferenceKind.PAGE, 'x'), (ReferenceKind.BLOCK, 'y'), (ReferenceKind.FILE, 'z'), 
+             (ReferenceKind.PAGE, '((w))'), (ReferenceKind.BLOCK, 'w'), (ReferenceKind.PAGE, 'v')]
+        )
+        for span in spans:
+            self.assertEqual(content[span.start:span.end], f"{span.kind.value}{span.uid}{content[span.end-2:span.end]}")
+            self.assertTrue(content_contains_reference(content, span.uid))
+        self.assertEqual(scan_references(''), [])
+        with self.assertRaises(ValueError):
+            scan_references(None) # type: ignore
+
+        # same verdicts as searching for each reference format
+        page3_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        for node in [v for v in page3_vertex_map.values() if has_attribute_value(v, 'references')]:
+            content_node: BlockContentNode = cast(BlockContentNode, node)
+            for content in [content_node.content, content_node.content[:len(content_node.content)//2], '']:
+                candidate: BlockContentNode = BlockContentNode(
+                    content_node.uid, content_node.media_type, content, None, content_node.references + ['a(b)c']
+                )
+                expected: list[Uid] = [
+                    r for r in candidate.references if not content_contains_reference(content, r) # type: ignore
+                ]
+                self.assertEqual(dangling_references(candidate), expected if expected else None)
+        self.assertIsNone(
+            dangling_references(BlockContentNode('uid', MediaType.TEXT_PLAIN, '((a(b)c))', None, ['a(b)c']))
+        )
+
+
+    def test_reference_spans(self):
+        node: BlockContentNode = BlockContentNode('uid', MediaType.TEXT_PLAIN, 'see [[a]] and ((b)), [[((c))]]', None, 
+                                                  ['a', 'b', 'c'])
+        spans: tuple[ReferenceSpan, ...] = node.reference_spans()
+        self.assertEqual(list(spans), scan_references(node.content))
+        self.assertIs(node.reference_spans(), spans)
+        # the cache follows ``content``
+        node._content = 'only ((b))'
+        self.assertEqual([span.uid for span in node.reference_spans()], ['b'])
+        self.assertEqual(dangling_references(node), ['a', 'c'])
+        node._content = 'see [[a]] and ((b)), [[((c))]]'
+        self.assertNotIn('_reference_spans_cache', pickle.loads(pickle.dumps(node)).__dict__)
+
+        # also on the frozen and columnar backings
+        page3_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        store: VertexStore = VertexStore(page3_vertex_map.values())
+        frozen_map: VertexMap = freeze_vertex_map(page3_vertex_map)
+        for uid, vertex in page3_vertex_map.items():
+            if not isinstance(vertex, BlockContentNode):
+                continue
+            expected: tuple[ReferenceSpan, ...] = vertex.reference_spans()
+            self.assertEqual(cast(BlockContentNode, store[uid]).reference_spans(), expected)
+            # each lookup is a new proxy; but the spans are cached by the store
+            self.assertIs(
+                cast(BlockContentNode, store[uid]).reference_spans(), cast(BlockContentNode, store[uid]).reference_spans()
+            )
+            frozen: BlockContentNode = cast(BlockContentNode, frozen_map[uid])
+            self.assertEqual(frozen.reference_spans(), expected)
+            self.assertIs(frozen.reference_spans(), frozen.reference_spans())
+
+
     def test_content_contains_reference(self):
         content: str = "Block 1.2.1 -- block-ref-> ((IO75SriD8))"
         self.assertTrue(content_contains_reference(content, 'IO75SriD8'))
@@ -252,6 +602,102 @@ class RoamModelTests(unittest.TestCase):
         self.assertIn("{'C2uKKD4-b': 2, 'soJKEPwjQ': 2}", validation_result[0].failure_message)
 
 
+    def test_link_index(self):
+        page3_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        link_index: LinkIndex = LinkIndex(page3_vertex_map)
+        logging.debug(f"link_index: {link_index}")
+
+        # every child has exactly 1 parent, and the root has none
+        self.assertEqual(link_index.parents('hfm6NKq2c'), [])
+        self.assertIsNone(link_index.parent('hfm6NKq2c'))
+        for node in [v for v in page3_vertex_map.values() if isinstance(v, RoamNode)]:
+            self.assertEqual(link_index.out_degree('children', node.uid), len(node.children or []))
+            self.assertEqual(link_index.out_degree('references', node.uid), len(node.references or []))
+            for child in (node.children or []):
+                self.assertEqual(link_index.parent(child), node.uid)
+                self.assertEqual(link_index.in_degree('children', child), 1)
+
+        # Pvyh6q_ag is referenced twice
+        all_references: list[Uid] = all_linked_uids('references', page3_vertex_map)
+        self.assertEqual(link_index.in_degree('references', 'Pvyh6q_ag'), 2)
+        self.assertEqual(len(link_index.backlinks('Pvyh6q_ag')), 2)
+        self.assertEqual(list(link_index.in_degrees('references')), list(dict.fromkeys(all_references)))
+        for uid in all_references:
+            for backlink in link_index.backlinks(uid):
+                self.assertIn(uid, cast(RoamNode, page3_vertex_map[backlink]).references)
+        self.assertEqual(link_index.backlinks('hfm6NKq2c'), [])
+        self.assertEqual(link_index.out_degree('children', '9b673aae-8089-4a91-84df-9dac152a7f94'), 0)
+
+        # the index is a snapshot
+        cast(RoamNode, page3_vertex_map['hfm6NKq2c']).children.append('IvK1p6Cqs') # type: ignore
+        self.assertEqual(link_index.in_degree('children', 'IvK1p6Cqs'), 1)
+        link_index = LinkIndex(page3_vertex_map)
+        self.assertEqual(link_index.in_degree('children', 'IvK1p6Cqs'), 2)
+        self.assertIn('hfm6NKq2c', link_index.parents('IvK1p6Cqs'))
+        with self.assertRaises(ValueError):
+            link_index.parent('IvK1p6Cqs')
+
+        with self.assertRaises(ValueError):
+            link_index.in_degree('parents', 'IvK1p6Cqs')
+        with self.assertRaises(TypeError):
+            LinkIndex(dict())  # type: ignore
+
+        # only the given link kinds
+        children_index: LinkIndex = LinkIndex(page3_vertex_map, ('children',))
+        self.assertEqual(children_index.in_degrees('children'), link_index.in_degrees('children'))
+        self.assertEqual(children_index.parents('IvK1p6Cqs'), link_index.parents('IvK1p6Cqs'))
+        with self.assertRaises(ValueError):
+            children_index.backlinks('Pvyh6q_ag')
+        with self.assertRaises(ValueError):
+            children_index.out_degree('references', 'hfm6NKq2c')
+        with self.assertRaises(ValueError):
+            LinkIndex(page3_vertex_map, ('parents',))
+
+
+    def test_walk(self):
+        def recursive_steps(node: RoamNode, graph: VertexMap, depth: int) -> list[tuple[TraversalEvent, Uid, int]]:
+            steps: list[tuple[TraversalEvent, Uid, int]] = [(TraversalEvent.ENTER, node.uid, depth)]
+            for c_uid in (node.children or []):
+                steps += recursive_steps(cast(RoamNode, graph[c_uid]), graph, depth + 1)
+            return steps + [(TraversalEvent.EXIT, node.uid, depth)]
+
+        brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
+        root: RoamNode = cast(RoamNode, get_first_value(brief_vertex_map))
+        steps: list[tuple[TraversalEvent, Uid, int]] = (
+            [(step.event, step.node.uid, step.depth) for step in walk(root, brief_vertex_map)]
+        )
+        self.assertEqual(steps, recursive_steps(root, brief_vertex_map, 0))
+        self.assertEqual(
+            [(node.uid, depth) for node, depth in iter_preorder(root, brief_vertex_map)], 
+            [(uid, depth) for event, uid, depth in steps if event is TraversalEvent.ENTER]
+        )
+        self.assertEqual(
+            [(node.uid, depth) for node, depth in iter_postorder(root, brief_vertex_map)], 
+            [(uid, depth) for event, uid, depth in steps if event is TraversalEvent.EXIT]
+        )
+        self.assertEqual(len(list(iter_preorder(root, brief_vertex_map))), len(brief_vertex_map))
+
+        # deeper than the recursion limit
+        depth: int = sys.getrecursionlimit() + 200
+        chain_map: VertexMap = OrderedDict(
+            (f"b{i}", BlockContentNode(f"b{i}", MediaType.TEXT_PLAIN, f"{i}", [f"b{i+1}"] if i < depth else [], None)) 
+            for i in range(depth + 1)
+        )
+        postorder: list[tuple[RoamNode, int]] = list(iter_postorder(chain_map['b0'], chain_map))
+        self.assertEqual(postorder[0][0].uid, f"b{depth}")
+        self.assertEqual(postorder[0][1], depth)
+
+        # a cycle, and a dangling child
+        cast(RoamNode, chain_map[f"b{depth}"]).children.append('b5') # type: ignore
+        with self.assertRaises(ValueError):
+            list(walk(chain_map['b0'], chain_map))
+        cast(RoamNode, chain_map[f"b{depth}"]).children[-1] = 'xxxxx' # type: ignore
+        with self.assertRaises(KeyError):
+            list(walk(chain_map['b0'], chain_map))
+        with self.assertRaises(TypeError):
+            walk(chain_map['b0'], dict()) # type: ignore
+
+
     def test_validate_references_exist(self):
         brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
         logging.debug(f"brief_vertex_map: {brief_vertex_map}")
@@ -290,6 +736,30 @@ class RoamModelTests(unittest.TestCase):
         self.assertEqual(result, ['IO75SriD8', 'A_4nJQ1Y7', 'plH3eTesS', 'o2hTH3dbf', 'YMkrw0y7Y', '9b673aae-8089-4a91-84df-9dac152a7f94', 'Qb2JOnrUQ', 'Pvyh6q_ag', 'mvVww9zGd', 'Pvyh6q_ag', '81770416-701c-4099-b585-ff0988894cc9'])
 
 
+    def test_linked_uids_scaling(self):
+        """
+        benchmarks edge iteration at 10^4 and 10^5 ``children`` edges; with linear aggregation, 10x the edges should 
+        cost ~10x the time (quadratic aggregation would cost ~100x). The timings are only logged (they depend on the 
+        host)
+        """
+        children_per_node: int = 10
+        for edge_count in [10**4, 10**5]:
+            node_count: int = edge_count // children_per_node
+            graph: VertexMap = OrderedDict(
+                (f"n{i}", BlockContentNode(f"n{i}", MediaType.TEXT_PLAIN, '', 
+                                           [f"c{i}.{j}" for j in range(children_per_node)], None))
+                for i in range(node_count)
+            )
+            seconds: float = timeit.timeit(lambda: all_linked_uids('children', graph), number=1)
+            logging.info(f"edge_count: {edge_count}, all_linked_uids seconds: {seconds:.4f}")
+            expected_links: list[tuple[Uid, Uid]] = (
+                [(f"n{i}", f"c{i}.{j}") for i in range(node_count) for j in range(children_per_node)]
+            )
+            self.assertEqual(len(expected_links), edge_count)
+            self.assertEqual(list(iter_links('children', graph)), expected_links)
+            self.assertEqual(all_linked_uids('children', graph), [target for (_, target) in expected_links])
+
+
     def test_validate_children_exist(self):
         brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
         logging.debug(f"brief_vertex_map: {brief_vertex_map}")
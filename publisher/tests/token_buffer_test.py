@@ -0,0 +1,96 @@
+import logging
+import pickle
+import tracemalloc
+import unittest
+from collections.abc import Mapping
+from pathlib import Path
+
+from markdown_it.token import Token
+from mdformat.renderer import MDRenderer
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.page_dump_tokenize import *
+from roampub.token_buffer import *
+
+class TokenBufferTests(unittest.TestCase):
+
+
+    def test_token_buffer(self):
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        for normalize_to_cm in (False, True):
+            tokens: list[Token] = tokenize_node(brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm)
+            buffer: TokenBuffer = TokenBuffer(tokens)
+            logging.info(f"buffer: {buffer}")
+            self.assertEqual(len(buffer), len(tokens))
+            self.assertEqual([t.as_dict() for t in buffer], [t.as_dict() for t in tokens])
+            self.assertEqual([t.as_dict() for t in buffer[3:9:2]], [t.as_dict() for t in tokens[3:9:2]])
+            self.assertEqual(buffer[-1].as_dict(), tokens[-1].as_dict())
+
+            # pickles as its arrays and arena
+            unpickled_buffer: TokenBuffer = pickle.loads(pickle.dumps(buffer))
+            self.assertEqual([t.as_dict() for t in unpickled_buffer], [t.as_dict() for t in tokens])
+
+        # each access creates new ``Token``s
+        self.assertIsNot(buffer[0], buffer[0])
+        buffer[1].children[0].content = 'mutated' # type: ignore
+        self.assertEqual(buffer[1].children[0].content, tokens[1].children[0].content) # type: ignore
+
+        # append-only
+        buffer.extend(tokens[:3])
+        self.assertEqual(len(buffer), len(tokens) + 3)
+        self.assertEqual([t.as_dict() for t in buffer[-3:]], [t.as_dict() for t in tokens[:3]])
+
+        with self.assertRaises(TypeError):
+            TokenBuffer(['not a token']) # type: ignore
+        with self.assertRaises(ValueError):
+            TokenBuffer(None) # type: ignore
+
+
+    def test_tokenize_node_to_buffer(self):
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        buffer: TokenBuffer = tokenize_node_to_buffer(brief_dump.root_page, brief_dump.vertex_map, True)
+
+        renderer: MDRenderer = MDRenderer()
+        options: Mapping[str, Any] = {}
+        env: Mapping = {}
+        rendered_md: str = renderer.render(buffer.to_tokens(), options, env)
+        expected_md_path: Path = Path(f"./tests/data/{brief_dump.dump_name}-normalize-expected.md")
+        with open(expected_md_path, "rt") as expectedIO:
+            self.assertEqual(rendered_md, expectedIO.read())
+
+
+    def test_memory(self):
+        """bytes held by a book-sized stream (the Creative Brief, 200 times over): as ``Token``s, vs a ``TokenBuffer``"""
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        tokens_per_copy: list[Token] = tokenize_node(brief_dump.root_page, brief_dump.vertex_map, True)
+
+        tracemalloc.start()
+        try:
+            start_bytes: int = tracemalloc.get_traced_memory()[0]
+            tokens: list[Token] = [token for _ in range(200) for token in TokenBuffer(tokens_per_copy)]
+            token_bytes: int = tracemalloc.get_traced_memory()[0] - start_bytes
+            del tokens
+
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            buffer: TokenBuffer = TokenBuffer()
+            for _ in range(200):
+                buffer.extend(tokens_per_copy)
+            buffer[0]
+            buffer_bytes: int = tracemalloc.get_traced_memory()[0] - start_bytes
+        finally:
+            tracemalloc.stop()
+        logging.info(f"buffer: {buffer}, token_bytes: {token_bytes}, buffer_bytes: {buffer_bytes}")
+        self.assertLess(buffer_bytes * 2, token_bytes)
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
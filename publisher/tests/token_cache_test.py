@@ -0,0 +1,161 @@
+import logging
+import unittest
+import tempfile
+import pickle
+from pathlib import Path
+from unittest import mock
+
+from markdown_it.token import Token
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.page_dump_tokenize import *
+from roampub.token_cache import *
+
+
+class _Unpicklable:
+    """unpickling raises ``ValueError``; not one of the errors that a corrupt pickle raises"""
+
+    def __reduce__(self):
+        return (int, ('not an int',))
+
+
+class TokenCacheTests(unittest.TestCase):
+
+
+    def test_token_cache_key(self):
+        key: TokenCacheKey = token_cache_key('some content', 'options')
+        self.assertEqual(key, token_cache_key('some content', 'options'))
+        self.assertEqual(len(key), 64)
+        self.assertNotEqual(key, token_cache_key('some content.', 'options'))
+        self.assertNotEqual(key, token_cache_key('some content', 'other options'))
+
+        with self.assertRaises(ValueError):
+            token_cache_key(None, 'options') # type: ignore
+
+
+    def test_get_put(self):
+        cache: TokenCache = TokenCache(max_entries=2)
+        tokens: list[Token] = get_parser().parse('some *content*')
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', tokens)
+        cached_tokens: list[Token] = cache.get('a') # type: ignore
+        self.assertEqual([t.as_dict() for t in cached_tokens], [t.as_dict() for t in tokens])
+        # each hit is a fresh copy
+        self.assertIsNot(cached_tokens[0], tokens[0])
+        cached_tokens[0].content = 'mutated'
+        self.assertNotEqual(cache.get('a')[0].content, 'mutated') # type: ignore
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        # least recently used is evicted
+        cache.put('b', tokens)
+        cache.get('a')
+        cache.put('c', tokens)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, cache.hit_rate), (0, 0, 0.0))
+        self.assertIsNone(cache.get('a'))
+
+        with self.assertRaises(ValueError):
+            TokenCache(max_entries=0)
+        with self.assertRaises(TypeError):
+            TokenCache(cache_dir='./out') # type: ignore
+
+
+    def test_encode_tokens(self):
+        brief_vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
+        for vertex in brief_vertex_map.values():
+            if vertex.vertex_type is not VertexType.ROAM_BLOCK_CONTENT:
+                continue
+            tokens: list[Token] = get_parser().parse(cast(BlockContentNode, vertex).content)
+            encoded_tokens: list[EncodedToken] = encode_tokens(tokens)
+            self.assertEqual([t.as_dict() for t in decode_tokens(encoded_tokens)], [t.as_dict() for t in tokens])
+            # plain tuples; nothing but builtins to pickle
+            self.assertTrue(all(type(encoded) is tuple for encoded in encoded_tokens))
+
+
+    def test_disk_tier(self):
+        tokens: list[Token] = get_parser().parse('some *content*')
+        key: TokenCacheKey = token_cache_key('some *content*', 'options')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            TokenCache(cache_dir=Path(temp_dir)).put(key, tokens)
+            # a new cache (e.g. the next build) finds the entry on disk
+            cache: TokenCache = TokenCache(cache_dir=Path(temp_dir))
+            cached_tokens: list[Token] = cache.get(key) # type: ignore
+            self.assertEqual([t.as_dict() for t in cached_tokens], [t.as_dict() for t in tokens])
+            self.assertEqual((cache.hits, cache.disk_hits), (1, 1))
+            # now in memory
+            cache.get(key)
+            self.assertEqual((cache.hits, cache.disk_hits), (2, 1))
+
+            # corrupt entry is a miss, not an error
+            other_key: TokenCacheKey = token_cache_key('other content', 'options')
+            cache.put(other_key, tokens)
+            next(Path(temp_dir).rglob(f"{other_key}{TOKEN_FILE_SUFFIX}")).write_bytes(b'not a pickle')
+            self.assertIsNone(TokenCache(cache_dir=Path(temp_dir)).get(other_key))
+
+            # a pickle of something else, that fails to unpickle, is a miss too
+            next(Path(temp_dir).rglob(f"{other_key}{TOKEN_FILE_SUFFIX}")).write_bytes(pickle.dumps(_Unpicklable()))
+            self.assertIsNone(TokenCache(cache_dir=Path(temp_dir)).get(other_key))
+
+            # an unwritable cache_dir (here, a file) is logged, not raised; the entry is still cached in memory
+            not_a_dir: Path = Path(temp_dir, 'not-a-dir')
+            not_a_dir.write_bytes(b'')
+            file_cache: TokenCache = TokenCache(cache_dir=not_a_dir)
+            with self.assertLogs('roampub.token_cache', level='WARNING'):
+                file_cache.put(key, tokens)
+            self.assertEqual(repr(file_cache.get(key)), repr(tokens))
+
+
+    def test_rebuild_hit_rate(self):
+        brief_dump: PageDump = PageDump(Path('./tests/data/Creative Brief.zip'))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for normalize_to_cm in (False, True):
+                expected_tokens: list[Token] = tokenize_node(
+                    brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm
+                )
+                first_cache: TokenCache = TokenCache(cache_dir=Path(temp_dir))
+                tokenize_node(brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm, cache=first_cache)
+                self.assertEqual(first_cache.hits, 0)
+
+                # rebuild, with a fresh process' cache over the same directory
+                rebuild_cache: TokenCache = TokenCache(cache_dir=Path(temp_dir))
+                tokens: list[Token] = tokenize_node(
+                    brief_dump.root_page, brief_dump.vertex_map, normalize_to_cm, cache=rebuild_cache
+                )
+                logging.info(f"normalize_to_cm: {normalize_to_cm}, rebuild_cache: {rebuild_cache}")
+                self.assertEqual([t.as_dict() for t in tokens], [t.as_dict() for t in expected_tokens])
+                self.assertGreater(rebuild_cache.hit_rate, 0.95)
+
+        # an edited block misses
+        cache: TokenCache = TokenCache()
+        tokenize_node(brief_dump.root_page, brief_dump.vertex_map, cache=cache)
+        block: BlockContentNode = next(
+            cast(BlockContentNode, v) for v in brief_dump.vertex_map.values() 
+            if v.vertex_type is VertexType.ROAM_BLOCK_CONTENT
+        )
+        block._content = f"{block.content} (edited)" # type: ignore
+        misses: int = cache.misses
+        tokenize_node(brief_dump.root_page, brief_dump.vertex_map, cache=cache)
+        self.assertEqual(cache.misses, misses + 1)
+
+        # after the tokenizer's semantics change (and ``TOKENIZER_VERSION`` is bumped), every block misses
+        with mock.patch('roampub.page_dump_tokenize.TOKENIZER_VERSION', TOKENIZER_VERSION + 1):
+            hits: int = cache.hits
+            tokenize_node(brief_dump.root_page, brief_dump.vertex_map, cache=cache)
+        self.assertEqual(cache.hits, hits)
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
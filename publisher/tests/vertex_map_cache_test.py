@@ -0,0 +1,94 @@
+import logging
+import pickle
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+from zipfile import ZipFile, ZipInfo
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.vertex_map_cache import *
+
+
+class _RaisesOnLoad:
+    def __reduce__(self):
+        return (int, ('not an int',))
+
+
+class VertexMapCacheTests(unittest.TestCase):
+
+
+    def test_cache_key(self):
+        with ZipFile(Path('./tests/data/Page 3.zip')) as zip_file:
+            json_zipinfo: ZipInfo = zip_file.getinfo('Page 3/Page 3.json')
+            key: CacheKey = cache_key(json_zipinfo)
+            logging.debug(f"key: {key}")
+            self.assertEqual(key, (json_zipinfo.CRC, json_zipinfo.file_size, json_zipinfo.date_time))
+
+        with self.assertRaises(ValueError):
+            cache_key(None)  # type: ignore
+
+
+    def test_sidecar_path(self):
+        path: Path = sidecar_path(Path('./tests/data/Page 3.zip'), Path('./out'))
+        self.assertEqual(path.parent, Path('./out'))
+        self.assertTrue(path.name.startswith('Page 3.'))
+        self.assertTrue(path.name.endswith(SIDECAR_SUFFIX))
+        # the same archive, however it is named; but not a same-named archive elsewhere
+        self.assertEqual(sidecar_path(Path('./tests/../tests/data/Page 3.zip'), Path('./out')), path)
+        self.assertNotEqual(sidecar_path(Path('./tests/Page 3.zip'), Path('./out')), path)
+
+
+    def test_store_load_round_trip(self):
+        vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        key: CacheKey = (1234, 5678, (2023, 1, 2, 3, 4, 5))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path: Path = Path(temp_dir, 'nested', 'Page 3.vertex-map')
+            self.assertIsNone(load_cached_vertex_map(path, key))
+
+            store_cached_vertex_map(path, key, CachedVertexMap(vertex_map, True, None))
+            self.assertTrue(path.exists())
+            cached: CachedVertexMap = load_cached_vertex_map(path, key)  # type: ignore
+            self.assertIsNotNone(cached)
+            self.assertIsNone(cached.validation_result)
+            self.assertEqual(list(cached.vertex_map.keys()), list(vertex_map.keys()))
+            self.assertEqual([repr(v) for v in cached.vertex_map.values()], [repr(v) for v in vertex_map.values()])
+
+            # the verdict only holds for the rules it was validated with
+            validation_result: ValidationResult = [ValidationFailure(ROOT_PAGE_RULE, 'failure')]
+            store_cached_vertex_map(path, key, CachedVertexMap(vertex_map, True, validation_result))
+            self.assertEqual(load_cached_vertex_map(path, key).validation_result, validation_result)  # type: ignore
+            with mock.patch('roampub.roam_model.ALL_RULES', ALL_RULES[:-1]):
+                cached = load_cached_vertex_map(path, key)  # type: ignore
+            self.assertFalse(cached.is_validated)
+            self.assertIsNone(cached.validation_result)
+            self.assertEqual(list(cached.vertex_map.keys()), list(vertex_map.keys()))
+
+            # stale key
+            self.assertIsNone(load_cached_vertex_map(path, (1234, 5678, (2023, 1, 2, 3, 4, 6))))
+
+            # corrupt sidecar is a miss, not an error
+            path.write_bytes(b'not a pickle')
+            self.assertIsNone(load_cached_vertex_map(path, key))
+            path.write_bytes(pickle.dumps((CACHE_FORMAT_VERSION, key)) + pickle.dumps(_RaisesOnLoad()))
+            self.assertIsNone(load_cached_vertex_map(path, key))
+
+            # a failed write is logged, not raised; and leaves neither a sidecar nor a temp file behind
+            path.unlink()
+            with self.assertLogs('roampub.vertex_map_cache', logging.WARNING) as logs:
+                store_cached_vertex_map(path, key, CachedVertexMap(vertex_map, True, lambda: None))  # type: ignore
+            self.assertIn('not caching', logs.output[0])
+            self.assertEqual(list(path.parent.iterdir()), [])
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import logging
+import unittest
+import tracemalloc
+from collections.abc import Mapping
+from pathlib import Path
+
+from common.log import configure_logging
+
+from roampub.roam_model import *
+from roampub.page_dump import *
+from roampub.page_dump_export import export_node_str
+from roampub.vertex_store import *
+
+class VertexStoreTests(unittest.TestCase):
+
+
+    def test_mapping(self):
+        vertex_map: VertexMap = load_json_dump(Path('./tests/data/Page 3.json'))
+        store: VertexStore = VertexStore(vertex_map.values())
+        self.assertIsInstance(store, Mapping)
+        self.assertTrue(is_vertex_map(store))
+        self.assertEqual(len(store), len(vertex_map))
+        self.assertEqual(list(store), list(vertex_map))
+        self.assertIn('hfm6NKq2c', store)
+        self.assertNotIn('xxxxxx', store)
+        self.assertNotIn(None, store)
+        with self.assertRaises(KeyError):
+            store['xxxxxx']
+
+        for uid, vertex in vertex_map.items():
+            stored: RoamVertex = store[uid]
+            self.assertIsInstance(stored, type(vertex))
+            self.assertEqual(repr(stored), repr(vertex))
+
+        file_vertex: FileVertex = store['9b673aae-8089-4a91-84df-9dac152a7f94']  # type: ignore
+        self.assertEqual(file_vertex.file_name, 'flower.jpeg')
+        self.assertTrue(file_vertex.source.startswith('https://firebasestorage.googleapis.com/'))
+        self.assertFalse(hasattr(file_vertex, 'children'))
+        self.assertIsNone(cast(BlockContentNode, store['mvVww9zGd']).references)
+
+        with self.assertRaises(TypeError):
+            VertexStore(['not a vertex'])  # type: ignore
+
+
+    def test_heading_and_duplicates(self):
+        vertices: list[RoamVertex] = [
+            PageNode('p', MediaType.TEXT_PLAIN, 'page', ['h']),
+            BlockHeadingNode('h', MediaType.TEXT_PLAIN, 'heading', 2, [], None),
+            BlockContentNode('h', MediaType.TEXT_MARKDOWN, 'replaced', None, ['p']),
+        ]
+        store: VertexStore = VertexStore(vertices)
+        self.assertEqual(list(store), ['p', 'h'])
+        replaced: BlockContentNode = store['h']  # type: ignore
+        self.assertIsInstance(replaced, BlockContentNode)
+        self.assertEqual(replaced.content, 'replaced')
+        self.assertEqual(replaced.media_type, MediaType.TEXT_MARKDOWN)
+        self.assertIsNone(replaced.children)
+        self.assertEqual(replaced.references, ['p'])
+
+        heading: BlockHeadingNode = VertexStore(vertices[:2])['h']  # type: ignore
+        self.assertEqual(heading.level, 2)
+        self.assertEqual(heading.heading, 'heading')
+        self.assertEqual(heading.children, [])
+
+
+    def test_readers_unchanged(self):
+        vertex_map: VertexMap = load_json_dump(Path('./tests/data/Creative Brief.json'))
+        store: VertexStore = VertexStore(vertex_map.values())
+        root: RoamNode = cast(RoamNode, get_first_value(store))
+        self.assertEqual(export_node_str(root, store), export_node_str(root, vertex_map))
+        self.assertIsNone(validate(store))
+
+        page3_dump: PageDump = PageDump(Path('./tests/data/Page 3.zip'), columnar=True)
+        self.assertIsInstance(page3_dump.vertex_map, VertexStore)
+        self.assertEqual(len(page3_dump), 30)
+        self.assertEqual(page3_dump.root_page.title, 'Page 3')
+
+
+    def test_memory(self):
+        def build_vertices(count: int):
+            yield PageNode('root', MediaType.TEXT_PLAIN, 'root', [f"block-{i:07d}" for i in range(count)])
+            for i in range(count):
+                yield BlockContentNode(f"block-{i:07d}", MediaType.TEXT_PLAIN, f"content of block {i}", None, None)
+
+        count: int = 20000
+        tracemalloc.start()
+        vertex_map: VertexMap = create_vertex_map([])
+        vertex_map.update((v.uid, v) for v in build_vertices(count))
+        map_size: int = tracemalloc.get_traced_memory()[0]
+        del vertex_map
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        store: VertexStore = VertexStore(build_vertices(count))
+        store_size: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        logging.info(f"count: {count}, map_size: {map_size}, store_size: {store_size}")
+        self.assertEqual(len(store), count + 1)
+        self.assertLess(store_size, map_size / 2)
+
+
+    def setUp(self):
+        configure_logging(logging.INFO)
+        logging.debug("logging configured")
+
+
+
+if __name__ == '__main__':
+    unittest.main()